@@ -5,24 +5,95 @@ async-i18n: 异步国际化文件同步工具
 功能：
 1. 选择项目（支持多选）
 2. 自动切换到 main 分支并更新代码
-3. 将 source_path 中的 JSON 文件覆盖到 target_path
+3. 将 source_path 中的 JSON 文件覆盖到 target_path（可以是多个目标路径的列表）
+4. 多个项目并发处理（asyncio 子进程 + --jobs 并发上限）
 """
 
 import os
 import sys
 import json
-import shutil
+import time
+import asyncio
 import subprocess
 import argparse
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+# 共享模块位于仓库根目录
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sync_common.clone_cache import cache_path, ensure_clone
+from sync_common.copy_engine import STRATEGIES, CopyEngine
+from sync_common.git_objects import BlobReader, blob_id, list_tree, write_file_atomic
+from sync_common.mirror import MirrorCache
+
+
+# 默认同时处理的项目数量
+DEFAULT_JOBS = 4
+
+# 目标路径下的同步清单文件
+MANIFEST_FILE = '.async-i18n-manifest.json'
+MANIFEST_VERSION = 1
+
+# 配置了 remote 的项目由工具管理克隆，存放在这个目录中
+DEFAULT_CACHE_DIR = '~/.cache/async-i18n'
+
+# 同步模式：worktree 切换分支并拉取后从工作区复制；object 只 fetch，直接从对象库读取
+SYNC_MODES = ('worktree', 'object')
+
+# --serve 常驻进程监听的 Unix 套接字
+DEFAULT_SOCKET = '~/.cache/async-i18n/daemon.sock'
 
 
 class AsyncI18n:
-    def __init__(self, config_file: str = None):
+    def __init__(self, config_file: str = None, jobs: int = DEFAULT_JOBS, prune: bool = False,
+                 mode: str = 'worktree', cache_dir: str = DEFAULT_CACHE_DIR,
+                 copy_strategy: str = 'auto', mirror_dir: str = None):
         """初始化工具"""
         self.config_file = config_file or os.path.join(os.path.dirname(__file__), 'config.json')
         self.projects = self.load_projects()
+        self.config_mtime_ns = self.config_mtime()
+        self.jobs = max(1, jobs)
+        self.prune = prune
+        self.mode = mode
+        self.cache_dir = cache_dir
+        # 设置了 mirror_dir 时，配置了 remote 的项目使用共享 bare 镜像的 worktree
+        self.mirrors = MirrorCache(mirror_dir) if mirror_dir else None
+        self.copy_engine = CopyEngine(copy_strategy)
+        # dry_run 只比较不写入；update 为 False 时不执行 Git 操作，直接同步源路径的当前内容
+        self.dry_run = False
+        self.update = True
+        # 常驻进程中保持的状态：目标路径 -> (清单文件 mtime, 清单)，源路径 -> {目录: (mtime, JSON 文件, 子目录)}
+        self.manifests: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self.scan_cache: Dict[str, Dict[str, Tuple[int, List[str], List[str]]]] = {}
+        self.resolve_sources()
+    
+    def resolve_sources(self):
+        """配置了 remote 的项目使用缓存目录中的克隆（或镜像的 worktree）作为源路径"""
+        for project in self.projects:
+            if project.get('remote'):
+                if self.mirrors:
+                    project['source_path'] = str(self.mirrors.worktree_path(project['project_name']))
+                else:
+                    project['source_path'] = str(cache_path(self.cache_dir, project['project_name']))
+    
+    def config_mtime(self) -> Optional[int]:
+        """配置文件的 mtime，文件不存在时返回 None"""
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def reload_projects(self) -> bool:
+        """配置文件有变化时重新加载项目配置，返回是否重新加载"""
+        mtime = self.config_mtime()
+        if mtime == self.config_mtime_ns:
+            return False
+        self.config_mtime_ns = mtime
+        self.projects = self.load_projects()
+        self.resolve_sources()
+        return True
     
     def load_projects(self) -> List[Dict[str, Any]]:
         """加载项目配置"""
@@ -59,7 +130,8 @@ class AsyncI18n:
         for i, project in enumerate(self.projects, 1):
             print(f"{i:2d}. {project['project_name']}")
             print(f"    源路径: {project['source_path']}")
-            print(f"    目标路径: {project['target_path']}")
+            for target_path in self.target_paths(project):
+                print(f"    目标路径: {target_path}")
             print()
         
         print("选择方式:")
@@ -139,129 +211,638 @@ class AsyncI18n:
         
         return unique_projects
     
-    def run_git_command(self, path: str, command: str) -> bool:
-        """执行 Git 命令"""
+    async def git_output(self, path: str, args: List[str], log: List[str]) -> Optional[str]:
+        """执行 Git 命令（异步子进程，不阻塞其他项目），成功时返回标准输出"""
+        command = ' '.join(args)
         try:
-            result = subprocess.run(
-                command.split(),
+            process = await asyncio.create_subprocess_exec(
+                *args,
                 cwd=path,
-                capture_output=True,
-                text=True,
-                check=True
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Git 命令执行失败: {e}")
-            print(f"   命令: {command}")
-            print(f"   路径: {path}")
-            if e.stderr:
-                print(f"   错误: {e.stderr}")
-            return False
+            stdout, stderr = await process.communicate()
+        except OSError as e:
+            log.append(f"❌ Git 命令无法启动: {e}")
+            log.append(f"   命令: {command}")
+            return None
+        
+        if process.returncode != 0:
+            log.append(f"❌ Git 命令执行失败 (退出码 {process.returncode})")
+            log.append(f"   命令: {command}")
+            log.append(f"   路径: {path}")
+            error = stderr.decode('utf-8', errors='replace').strip()
+            if error:
+                log.append(f"   错误: {error}")
+            return None
+        return stdout.decode('utf-8', errors='replace')
+    
+    async def run_git_command(self, path: str, command: str, log: List[str]) -> bool:
+        """执行 Git 命令"""
+        return await self.git_output(path, command.split(), log) is not None
     
-    def update_git_repo(self, project: Dict[str, Any]) -> bool:
-        """更新 Git 仓库"""
+    async def rev_parse_head(self, path: str) -> Optional[str]:
+        """获取当前 HEAD 提交，仓库没有提交时返回 None"""
+        output = await self.git_output(path, ["git", "rev-parse", "--verify", "-q", "HEAD"], [])
+        return output.strip() if output else None
+    
+    async def update_git_repo(self, project: Dict[str, Any], log: List[str]) -> Optional[Dict[str, Optional[str]]]:
+        """
+        更新 Git 仓库
+        
+        成功时返回拉取前后的 HEAD 提交 {"before": ..., "after": ...}，失败返回 None
+        """
         source_path = project['source_path']
         project_name = project['project_name']
         
-        print(f"🔄 正在更新项目: {project_name}")
-        print(f"   路径: {source_path}")
+        log.append(f"🔄 正在更新项目: {project_name}")
+        log.append(f"   路径: {source_path}")
         
         # 检查路径是否存在
         if not os.path.exists(source_path):
-            print(f"❌ 源路径不存在: {source_path}")
-            return False
+            log.append(f"❌ 源路径不存在: {source_path}")
+            return None
         
         # 检查是否为 Git 仓库
         git_dir = os.path.join(source_path, '.git')
         if not os.path.exists(git_dir):
-            print(f"❌ 不是 Git 仓库: {source_path}")
-            return False
+            log.append(f"❌ 不是 Git 仓库: {source_path}")
+            return None
         
         # 切换到 main 分支
-        print("   📍 切换到 main 分支...")
-        if not self.run_git_command(source_path, "git checkout main"):
-            return False
+        log.append("   📍 切换到 main 分支...")
+        if not await self.run_git_command(source_path, "git checkout main", log):
+            return None
+        before = await self.rev_parse_head(source_path)
         
         # 拉取最新代码
-        print("   📥 拉取最新代码...")
-        if not self.run_git_command(source_path, "git pull origin main"):
-            return False
+        log.append("   📥 拉取最新代码...")
+        if not await self.run_git_command(source_path, "git pull origin main", log):
+            return None
+        after = await self.rev_parse_head(source_path)
         
-        print(f"✅ 项目 {project_name} 更新完成")
-        return True
+        self.log_heads(before, after, log)
+        log.append(f"✅ 项目 {project_name} 更新完成")
+        return {"before": before, "after": after}
+    
+    @staticmethod
+    def log_heads(before: Optional[str], after: Optional[str], log: List[str]):
+        """输出拉取前后的提交"""
+        if before == after:
+            log.append(f"   📌 无新提交: {(after or '-')[:10]}")
+        else:
+            log.append(f"   📌 {(before or '-')[:10]} → {(after or '-')[:10]}")
     
-    def sync_json_files(self, project: Dict[str, Any]) -> bool:
-        """同步 JSON 文件"""
+    async def update_cached_repo(self, project: Dict[str, Any], log: List[str]) -> Optional[Dict[str, Optional[str]]]:
+        """
+        创建或更新工具管理的缓存克隆（blobless + shallow + sparse，只检出 JSON 文件）；
+        设置了 --mirror-dir 时改为共享镜像的 worktree，同一个远程每次运行只 fetch 一次
+        
+        成功时返回更新前后的 HEAD 提交，失败返回 None
+        """
+        log.append(f"🔄 正在更新{'镜像工作区' if self.mirrors else '缓存克隆'}: {project['project_name']}")
+        log.append(f"   远程: {project['remote']}")
+        log.append(f"   缓存: {project['source_path']}")
+        
+        try:
+            if self.mirrors:
+                heads = await asyncio.to_thread(
+                    self.mirrors.ensure_worktree, project['remote'], project['source_path'], 'main', ['.json']
+                )
+            else:
+                heads = await asyncio.to_thread(
+                    ensure_clone, project['remote'], project['source_path'], 'main', ['.json']
+                )
+        except subprocess.CalledProcessError as e:
+            log.append(f"❌ Git 命令执行失败 (退出码 {e.returncode})")
+            log.append(f"   命令: {' '.join(e.cmd)}")
+            if e.stderr:
+                log.append(f"   错误: {e.stderr.strip()}")
+            return None
+        
+        self.log_heads(heads['before'], heads['after'], log)
+        return heads
+    
+    async def fetch_remote_head(self, project: Dict[str, Any], log: List[str]) -> Optional[str]:
+        """只执行 git fetch 并解析 origin/main，不切换分支也不修改工作区"""
         source_path = project['source_path']
+        project_name = project['project_name']
+        
+        log.append(f"🔄 正在获取项目: {project_name}")
+        log.append(f"   路径: {source_path}")
+        
+        if not os.path.exists(source_path):
+            log.append(f"❌ 源路径不存在: {source_path}")
+            return None
+        
+        log.append("   📥 获取 origin/main (不修改工作区)...")
+        if not await self.run_git_command(source_path, "git fetch origin main", log):
+            return None
+        output = await self.git_output(source_path, ["git", "rev-parse", "--verify", "origin/main^{commit}"], log)
+        if output is None:
+            return None
+        
+        head = output.strip()
+        log.append(f"   📌 origin/main: {head[:10]}")
+        return head
+    
+    async def diff_json_files(self, source_path: str, base: str, head: str) -> Optional[Dict[str, List[str]]]:
+        """
+        用 git diff 计算两个提交之间变化的 JSON 文件
+        
+        返回 {"updated": 新增/修改, "deleted": 删除}；base 不可用时返回 None
+        """
+        output = await self.git_output(
+            source_path,
+            ["git", "diff", "--name-status", "--no-renames", "-z", base, head, "--", "*.json"],
+            []
+        )
+        if output is None:
+            return None
+        
+        changes = {"updated": [], "deleted": []}
+        fields = output.split('\0')
+        for status, rel_path in zip(fields[0::2], fields[1::2]):
+            if status == 'D':
+                changes['deleted'].append(rel_path)
+            else:
+                changes['updated'].append(rel_path)
+        return changes
+    
+    def load_manifest(self, target_path: str) -> Dict[str, Any]:
+        """
+        加载目标路径下的同步清单
+        
+        清单文件的 mtime 与内存中的一致时直接使用内存中的清单，不重新解析
+        """
+        manifest_file = os.path.join(target_path, MANIFEST_FILE)
+        try:
+            mtime = os.stat(manifest_file).st_mtime_ns
+            cached = self.manifests.get(target_path)
+            if cached and cached[0] == mtime:
+                return dict(cached[1])
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                self.manifests[target_path] = (mtime, manifest)
+                return dict(manifest)
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            pass
+        return {"version": MANIFEST_VERSION, "files": {}}
+    
+    def save_manifest(self, target_path: str, manifest: Dict[str, Any]):
+        """原子写入同步清单，避免中断时留下半个文件"""
+        manifest_file = os.path.join(target_path, MANIFEST_FILE)
+        tmp_file = manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_file, manifest_file)
+        self.manifests[target_path] = (os.stat(manifest_file).st_mtime_ns, manifest)
+    
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """计算文件内容哈希（与 git blob 对象 ID 的算法相同）"""
+        return blob_id(file_path)
+    
+    @staticmethod
+    def _stat_matches(entry: Dict[str, Any], stat: os.stat_result) -> bool:
+        """清单记录与文件的 size/mtime 是否一致"""
+        return entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns
+    
+    def find_json_files(self, source_path: str) -> List[str]:
+        """
+        查找源路径下所有 JSON 文件，返回相对路径
+        
+        每个目录的列表按目录 mtime 缓存：目录中增删、重命名文件都会改变 mtime，
+        mtime 没变的目录只需要一次 stat，不重新列目录
+        """
+        cache = self.scan_cache.setdefault(source_path, {})
+        visited = set()
+        json_files = []
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            directory = os.path.join(source_path, rel_dir)
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            visited.add(rel_dir)
+            cached = cache.get(rel_dir)
+            if cached and cached[0] == mtime:
+                files, dirs = cached[1], cached[2]
+            else:
+                files, dirs = [], []
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            # 不进入 .git 目录
+                            if entry.name != '.git':
+                                dirs.append(os.path.join(rel_dir, entry.name))
+                        elif entry.name.endswith('.json'):
+                            files.append(os.path.join(rel_dir, entry.name))
+                cache[rel_dir] = (mtime, files, dirs)
+            json_files.extend(files)
+            stack.extend(dirs)
+        # 已不存在的目录不再保留
+        for rel_dir in set(cache) - visited:
+            del cache[rel_dir]
+        json_files.sort()
+        return json_files
+    
+    @staticmethod
+    def target_paths(project: Dict[str, Any]) -> List[str]:
+        """项目的所有目标路径（target_path 可以是字符串或列表）"""
         target_path = project['target_path']
+        return [target_path] if isinstance(target_path, str) else list(target_path)
+    
+    def open_targets(self, project: Dict[str, Any], log: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        加载每个目标路径的同步清单
+        
+        返回每个目标的同步状态 {path, manifest, old_entries, new_entries, deleted, counts}；
+        有目标路径不存在时返回 None
+        """
+        targets = []
+        for target_path in self.target_paths(project):
+            log.append(f"   目标路径: {target_path}")
+            if not os.path.exists(target_path):
+                log.append(f"❌ 目标路径不存在: {target_path}")
+                return None
+            manifest = self.load_manifest(target_path)
+            targets.append({
+                "path": target_path,
+                "manifest": manifest,
+                "old_entries": manifest['files'],
+                "new_entries": {},
+                "deleted": [],
+                "counts": {"copied": 0, "unchanged": 0, "removed": 0, "failed": 0},
+            })
+        return targets
+    
+    def write_target(self, target_file: str, source_hash: str, write) -> Any:
+        """
+        写入一个目标文件（可在线程池中执行）
+        
+        返回新的清单记录，失败时返回异常对象，不影响其他目标；dry_run 时不写入
+        """
+        if self.dry_run:
+            return {"size": None, "mtime_ns": None, "hash": source_hash, "copied": True}
+        try:
+            write(target_file)
+            target_stat = os.stat(target_file)
+        except Exception as e:
+            return e
+        return {"size": target_stat.st_size, "mtime_ns": target_stat.st_mtime_ns,
+                "hash": source_hash, "copied": True}
+    
+    def sync_file(self, source_file: str, targets: List[Tuple[str, Optional[Dict[str, Any]]]],
+                  executor: Optional[ThreadPoolExecutor] = None) -> List[Any]:
+        """
+        按清单把一个源文件增量同步到多个目标文件
+        
+        targets 为 [(目标文件, 清单记录)]；源文件只 stat、计算哈希一次，需要复制的目标并发写入。
+        返回与 targets 对应的新清单记录（copied 为 True 表示实际发生了复制），
+        某个目标失败时对应位置为异常对象
+        """
+        source_stat = os.stat(source_file)
+        source_hash = None
+        results: List[Any] = [None] * len(targets)
+        pending = []
+        
+        for index, (target_file, entry) in enumerate(targets):
+            try:
+                target_stat = os.stat(target_file)
+            except FileNotFoundError:
+                target_stat = None
+            
+            # 快速路径：源文件与目标文件都和清单一致，无需读取内容
+            if (entry and target_stat is not None
+                    and self._stat_matches(entry, source_stat)
+                    and self._stat_matches(entry, target_stat)):
+                results[index] = dict(entry, copied=False)
+                continue
+            
+            if source_hash is None:
+                source_hash = self.hash_file(source_file)
+            if target_stat is not None and target_stat.st_size == source_stat.st_size:
+                if entry and self._stat_matches(entry, target_stat):
+                    target_hash = entry.get('hash')
+                else:
+                    target_hash = self.hash_file(target_file)
+                if target_hash == source_hash:
+                    results[index] = {"size": target_stat.st_size, "mtime_ns": target_stat.st_mtime_ns,
+                                      "hash": source_hash, "copied": False}
+                    continue
+            pending.append(index)
+        
+        def copy(target_file: str):
+            if self.dry_run:
+                return
+            os.makedirs(os.path.dirname(target_file), exist_ok=True)
+            self.copy_engine.copy(source_file, target_file)
+        
+        target_files = [targets[index][0] for index in pending]
+        if executor is not None and len(pending) > 1:
+            entries = executor.map(lambda target_file: self.write_target(target_file, source_hash, copy), target_files)
+        else:
+            entries = [self.write_target(target_file, source_hash, copy) for target_file in target_files]
+        for index, entry in zip(pending, entries):
+            results[index] = entry
+        return results
+    
+    def record_entry(self, target: Dict[str, Any], rel_path: str, entry: Any, log: List[str], show_target: bool):
+        """记录单个文件在一个目标路径上的同步结果"""
+        label = f"{rel_path} → {target['path']}" if show_target else rel_path
+        if isinstance(entry, Exception):
+            target['counts']['failed'] += 1
+            log.append(f"   ❌ 同步失败: {label} - {entry}")
+            return
+        if entry.pop('copied'):
+            target['counts']['copied'] += 1
+            log.append(f"   🔍 将同步: {label}" if self.dry_run else f"   ✅ 同步: {label}")
+        else:
+            target['counts']['unchanged'] += 1
+        target['new_entries'][rel_path] = entry
+    
+    def sync_json_files(self, project: Dict[str, Any], log: List[str],
+                        commit: Optional[str] = None,
+                        changes: Optional[Dict[str, List[str]]] = None) -> bool:
+        """
+        增量同步 JSON 文件（在工作线程中执行）
+        
+        changes 为 git diff 得到的变更集合时只处理这些文件，为 None 时完整遍历源路径；
+        源路径只扫描一次，每个文件只计算一次哈希，再写入所有目标路径；
+        全部成功后把 commit 记录到每个目标的清单中，作为下一次 diff 的起点
+        """
+        source_path = project['source_path']
         project_name = project['project_name']
         
-        print(f"📁 正在同步 JSON 文件: {project_name}")
-        print(f"   源路径: {source_path}")
-        print(f"   目标路径: {target_path}")
+        log.append(f"📁 正在同步 JSON 文件: {project_name}")
+        log.append(f"   源路径: {source_path}")
         
         # 检查源路径
         if not os.path.exists(source_path):
-            print(f"❌ 源路径不存在: {source_path}")
+            log.append(f"❌ 源路径不存在: {source_path}")
             return False
         
         # 检查目标路径
-        if not os.path.exists(target_path):
-            print(f"❌ 目标路径不存在: {target_path}")
+        targets = self.open_targets(project, log)
+        if targets is None:
             return False
         
-        # 查找所有 JSON 文件
-        json_files = []
-        for root, dirs, files in os.walk(source_path):
-            for file in files:
-                if file.endswith('.json'):
-                    json_files.append(os.path.join(root, file))
+        if changes is None:
+            # 查找所有 JSON 文件
+            json_files = self.find_json_files(source_path)
+            
+            if not json_files:
+                log.append(f"⚠️  源路径中没有找到 JSON 文件: {source_path}")
+                return True
+            
+            log.append(f"   📄 找到 {len(json_files)} 个 JSON 文件")
+            for target in targets:
+                target['deleted'] = sorted(set(target['old_entries']) - set(json_files))
+        else:
+            json_files = changes['updated']
+            log.append(f"   📄 变更 {len(json_files)} 个 JSON 文件，删除 {len(changes['deleted'])} 个")
+            for target in targets:
+                target['new_entries'] = dict(target['old_entries'])
+                target['deleted'] = [rel_path for rel_path in changes['deleted'] if rel_path in target['old_entries']]
         
-        if not json_files:
-            print(f"⚠️  源路径中没有找到 JSON 文件: {source_path}")
-            return True
+        # 同步文件
+        show_target = len(targets) > 1
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            for rel_path in json_files:
+                try:
+                    entries = self.sync_file(
+                        os.path.join(source_path, rel_path),
+                        [(os.path.join(target['path'], rel_path), target['old_entries'].get(rel_path))
+                         for target in targets],
+                        executor
+                    )
+                except Exception as e:
+                    entries = [e] * len(targets)
+                for target, entry in zip(targets, entries):
+                    self.record_entry(target, rel_path, entry, log, show_target)
         
-        print(f"   📄 找到 {len(json_files)} 个 JSON 文件")
+        for target in targets:
+            self.remove_deleted_files(target, log)
+        return self.finish_sync(project, targets, commit, log)
+    
+    def remove_deleted_files(self, target: Dict[str, Any], log: List[str]):
+        """处理源路径中已删除的文件（只处理清单中记录过的文件）"""
+        for rel_path in target['deleted']:
+            if self.prune:
+                if not self.dry_run:
+                    try:
+                        os.remove(os.path.join(target['path'], rel_path))
+                    except FileNotFoundError:
+                        pass
+                target['new_entries'].pop(rel_path, None)
+                target['counts']['removed'] += 1
+                action = "🔍 将删除" if self.dry_run else "🗑️  删除"
+                log.append(f"   {action}: {os.path.join(target['path'], rel_path)}")
+            else:
+                target['new_entries'][rel_path] = target['old_entries'][rel_path]
+                log.append(f"   ⚠️  源路径中已不存在: {os.path.join(target['path'], rel_path)} (使用 --prune 删除)")
+    
+    def finish_sync(self, project: Dict[str, Any], targets: List[Dict[str, Any]],
+                    commit: Optional[str], log: List[str]) -> bool:
+        """保存每个目标的清单并分别输出统计（dry_run 时不保存）"""
+        for target in targets:
+            manifest = target['manifest']
+            counts = target['counts']
+            if not self.dry_run:
+                manifest['files'] = target['new_entries']
+                # 有失败的文件时不记录提交，下次完整遍历
+                manifest['commit'] = commit if counts['failed'] == 0 else None
+                self.save_manifest(target['path'], manifest)
+            
+            label = f"目标 {target['path']}" if len(targets) > 1 else f"项目 {project['project_name']}"
+            done = "预览完成" if self.dry_run else "同步完成"
+            log.append(
+                f"✅ {label} {done}: 复制 {counts['copied']}, "
+                f"未变化 {counts['unchanged']}, 删除 {counts['removed']}, 失败 {counts['failed']}"
+            )
+        return all(target['counts']['failed'] == 0 for target in targets)
+    
+    def sync_from_objects(self, project: Dict[str, Any], log: List[str], commit: str) -> bool:
+        """
+        直接从 Git 对象库同步 JSON 文件（在工作线程中执行）
         
-        # 同步文件
-        synced_count = 0
-        for json_file in json_files:
-            try:
-                # 计算相对路径
-                rel_path = os.path.relpath(json_file, source_path)
-                target_file = os.path.join(target_path, rel_path)
-                
-                # 确保目标目录存在
-                target_dir = os.path.dirname(target_file)
-                os.makedirs(target_dir, exist_ok=True)
-                
-                # 复制文件
-                shutil.copy2(json_file, target_file)
-                synced_count += 1
-                print(f"   ✅ 同步: {rel_path}")
+        git ls-tree 列出提交中的 JSON 文件，对象 ID 与清单中的哈希一致的文件跳过，
+        其余文件通过一个 git cat-file --batch 进程读取一次，再并发写入所有需要更新的目标路径
+        """
+        source_path = project['source_path']
+        
+        log.append(f"📁 正在从对象库同步 JSON 文件: {project['project_name']} @ {commit[:10]}")
+        
+        targets = self.open_targets(project, log)
+        if targets is None:
+            return False
+        
+        tree = list_tree(source_path, commit, include=lambda rel_path: rel_path.endswith('.json'))
+        log.append(f"   📄 提交中有 {len(tree)} 个 JSON 文件")
+        
+        to_write: Dict[str, List[Dict[str, Any]]] = {}
+        for rel_path, oid in tree.items():
+            for target in targets:
+                entry = target['old_entries'].get(rel_path)
+                target_file = os.path.join(target['path'], rel_path)
+                try:
+                    target_stat = os.stat(target_file)
+                except FileNotFoundError:
+                    target_stat = None
                 
-            except Exception as e:
-                print(f"   ❌ 同步失败: {rel_path} - {e}")
+                if target_stat is not None:
+                    if entry and self._stat_matches(entry, target_stat):
+                        target_hash = entry.get('hash')
+                    else:
+                        target_hash = self.hash_file(target_file)
+                    if target_hash == oid:
+                        target['counts']['unchanged'] += 1
+                        target['new_entries'][rel_path] = {"size": target_stat.st_size,
+                                                           "mtime_ns": target_stat.st_mtime_ns, "hash": oid}
+                        continue
+                to_write.setdefault(rel_path, []).append(target)
         
-        print(f"✅ 项目 {project_name} 同步完成，共同步 {synced_count} 个文件")
-        return True
+        show_target = len(targets) > 1
+        if to_write and self.dry_run:
+            for rel_path, pending in to_write.items():
+                for target in pending:
+                    self.record_entry(target, rel_path, self.write_target(None, tree[rel_path], None), log, show_target)
+        elif to_write:
+            with BlobReader(source_path) as reader, ThreadPoolExecutor(max_workers=len(targets)) as executor:
+                for rel_path, pending in to_write.items():
+                    try:
+                        data = reader.read(tree[rel_path])
+                    except Exception as e:
+                        entries = [e] * len(pending)
+                    else:
+                        def write(target: Dict[str, Any]) -> Any:
+                            return self.write_target(
+                                os.path.join(target['path'], rel_path), tree[rel_path],
+                                lambda target_file: write_file_atomic(target_file, data)
+                            )
+                        entries = executor.map(write, pending) if len(pending) > 1 else [write(pending[0])]
+                    for target, entry in zip(pending, entries):
+                        self.record_entry(target, rel_path, entry, log, show_target)
+        
+        for target in targets:
+            target['deleted'] = sorted(set(target['old_entries']) - set(tree))
+            self.remove_deleted_files(target, log)
+        return self.finish_sync(project, targets, commit, log)
     
-    def process_project(self, project: Dict[str, Any]) -> bool:
-        """处理单个项目"""
-        project_name = project['project_name']
-        print(f"\n🚀 开始处理项目: {project_name}")
-        print("=" * 50)
+    async def sync_current(self, project: Dict[str, Any], log: List[str]) -> bool:
+        """
+        不执行 Git 更新，直接同步源路径的当前内容（update 为 False 时使用）
         
-        # 更新 Git 仓库
-        if not self.update_git_repo(project):
-            return False
+        worktree 模式完整遍历工作区（包括未提交的改动），不记录提交，下一次正常同步会完整遍历；
+        object 模式同步本地已有的 origin/main
+        """
+        if project.get('mode', self.mode) == 'object':
+            output = await self.git_output(
+                project['source_path'], ["git", "rev-parse", "--verify", "origin/main^{commit}"], log
+            )
+            if output is None:
+                return False
+            return await asyncio.to_thread(self.sync_from_objects, project, log, output.strip())
+        return await asyncio.to_thread(self.sync_json_files, project, log, None, None)
+    
+    async def update_and_sync(self, project: Dict[str, Any], log: List[str]) -> bool:
+        """更新 Git 仓库，再根据提交差异在工作线程中同步 JSON 文件"""
+        if not self.update or self.dry_run:
+            return await self.sync_current(project, log)
         
-        # 同步 JSON 文件
-        if not self.sync_json_files(project):
+        mode = project.get('mode', self.mode)
+        if project.get('remote'):
+            heads = await self.update_cached_repo(project, log)
+        elif mode == 'object':
+            head = await self.fetch_remote_head(project, log)
+            heads = None if head is None else {"before": None, "after": head}
+        else:
+            heads = await self.update_git_repo(project, log)
+        if heads is None:
             return False
         
-        print(f"🎉 项目 {project_name} 处理完成")
-        return True
+        head = heads['after']
+        # 上一次成功同步到目标路径的提交，正常情况下就是拉取前的 HEAD；
+        # 多个目标路径记录的提交不同时没有共同的 diff 起点，改为完整遍历
+        target_paths = self.target_paths(project)
+        bases = {self.load_manifest(target_path).get('commit') for target_path in target_paths}
+        base = bases.pop() if head and len(bases) == 1 else None
+        if base and base == head and all(os.path.exists(target_path) for target_path in target_paths):
+            log.append(f"⏭️  目标路径已同步到 {head[:10]}，跳过文件同步")
+            return True
+        
+        if mode == 'object':
+            return await asyncio.to_thread(self.sync_from_objects, project, log, head)
+        
+        changes = None
+        if base:
+            changes = await self.diff_json_files(project['source_path'], base, head)
+            if changes is None:
+                log.append(f"   ⚠️  无法比较 {base[:10]}..{head[:10]}，改为完整遍历")
+        return await asyncio.to_thread(self.sync_json_files, project, log, head, changes)
+    
+    async def process_project(self, project: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """处理单个项目，输出收集到 log 中，返回处理结果"""
+        project_name = project['project_name']
+        log = []
+        
+        async with semaphore:
+            start = time.perf_counter()
+            log.append(f"\n🚀 开始处理项目: {project_name}")
+            log.append("=" * 50)
+            
+            try:
+                success = await self.update_and_sync(project, log)
+            except Exception as e:
+                log.append(f"❌ 项目 {project_name} 处理异常: {e}")
+                success = False
+            
+            if success:
+                log.append(f"🎉 项目 {project_name} 处理完成")
+            elapsed = time.perf_counter() - start
+        
+        return {
+            "project_name": project_name,
+            "success": success,
+            "elapsed": elapsed,
+            "log": log,
+        }
+    
+    async def process_projects(self, projects: List[Dict[str, Any]], echo: bool = True) -> List[Dict[str, Any]]:
+        """并发处理所有项目，按选择顺序输出每个项目的日志（echo 为 False 时只收集日志）"""
+        semaphore = asyncio.Semaphore(self.jobs)
+        if self.mirrors:
+            self.mirrors.start_run()
+        tasks = [asyncio.create_task(self.process_project(project, semaphore)) for project in projects]
+        
+        results = []
+        for task in tasks:
+            # 按顺序等待，前面的项目完成后立即输出，日志不会交错
+            result = await task
+            if echo:
+                print("\n".join(result["log"]))
+            results.append(result)
+        return results
+    
+    def print_summary(self, results: List[Dict[str, Any]], wall_time: float):
+        """输出每个项目的耗时汇总"""
+        print("\n" + "=" * 50)
+        print("⏱️  项目耗时:")
+        for result in results:
+            status = "✅" if result["success"] else "❌"
+            print(f"   {status} {result['project_name']:<30} {result['elapsed']:8.2f}s")
+        total = sum(result["elapsed"] for result in results)
+        print(f"   总耗时: {wall_time:.2f}s (串行合计 {total:.2f}s, 并发数 {self.jobs})")
+        
+        copy_lines = self.copy_engine.summary_lines()
+        if copy_lines:
+            print(f"📦 文件复制 (策略: {self.copy_engine.strategy}):")
+            for line in copy_lines:
+                print(f"   {line}")
     
     def run(self):
         """运行主程序"""
@@ -284,13 +865,14 @@ class AsyncI18n:
             print("❌ 用户取消操作")
             return
         
-        # 处理每个项目
-        success_count = 0
-        for project in selected_projects:
-            if self.process_project(project):
-                success_count += 1
+        # 并发处理所有项目
+        start = time.perf_counter()
+        results = asyncio.run(self.process_projects(selected_projects))
+        wall_time = time.perf_counter() - start
+        success_count = sum(1 for result in results if result["success"])
         
         # 输出结果
+        self.print_summary(results, wall_time)
         print("\n" + "=" * 50)
         print(f"📊 同步完成: {success_count}/{len(selected_projects)} 个项目成功")
         if success_count == len(selected_projects):
@@ -307,12 +889,60 @@ def main():
         type=str, 
         help='配置文件路径 (默认: config.json)'
     )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f'同时处理的项目数量 (默认: {DEFAULT_JOBS})'
+    )
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='删除目标路径中源路径已不存在的 JSON 文件 (默认只提示)'
+    )
+    parser.add_argument(
+        '--mode',
+        choices=SYNC_MODES,
+        default='worktree',
+        help='同步模式: worktree 切换分支并拉取后从工作区复制; object 只 fetch 并直接从 Git 对象库读取 (默认: worktree)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=DEFAULT_CACHE_DIR,
+        help=f'配置了 remote 的项目的克隆缓存目录 (默认: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--copy-strategy',
+        choices=STRATEGIES,
+        default='auto',
+        help='文件复制策略: reflink / hardlink / kernel / buffered，auto 自动检测 (默认: auto)'
+    )
+    parser.add_argument(
+        '--mirror-dir',
+        help='共享 bare 镜像目录: 配置了 remote 的项目改用镜像的 worktree，同一个远程只保存、fetch 一次'
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='以常驻进程运行，通过 Unix 套接字接收同步请求 (客户端: client.py)'
+    )
+    parser.add_argument(
+        '--socket',
+        default=DEFAULT_SOCKET,
+        help=f'--serve 监听的套接字路径 (默认: {DEFAULT_SOCKET})'
+    )
     
     args = parser.parse_args()
     
     try:
-        tool = AsyncI18n(args.config)
-        tool.run()
+        tool = AsyncI18n(args.config, jobs=args.jobs, prune=args.prune, mode=args.mode,
+                         cache_dir=args.cache_dir, copy_strategy=args.copy_strategy,
+                         mirror_dir=args.mirror_dir)
+        if args.serve:
+            from daemon import SyncDaemon
+            asyncio.run(SyncDaemon(tool, args.socket).serve())
+        else:
+            tool.run()
     except KeyboardInterrupt:
         print("\n❌ 用户中断操作")
         sys.exit(1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+async-i18n 常驻进程的命令行客户端
+
+只使用标准库的 socket / json，不导入同步工具本身，启动开销很小，
+适合在编辑器保存钩子或 pre-commit 钩子中调用
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+from typing import Any, Dict
+
+
+# 与 async_i18n.py 中的 DEFAULT_SOCKET 保持一致
+DEFAULT_SOCKET = '~/.cache/async-i18n/daemon.sock'
+
+
+def send_request(socket_path: str, payload: Dict[str, Any], timeout: float = None) -> Dict[str, Any]:
+    """发送一个请求并等待一行 JSON 响应"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(os.path.expanduser(socket_path))
+        sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode('utf-8'))
+        buffer = b''
+        while not buffer.endswith(b'\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            buffer += chunk
+    return json.loads(buffer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='async-i18n 常驻进程客户端')
+    parser.add_argument(
+        'action',
+        choices=['ping', 'projects', 'sync', 'shutdown'],
+        help='请求类型'
+    )
+    parser.add_argument(
+        'projects',
+        nargs='*',
+        help='sync 的项目名称 (默认: 所有项目)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='只比较并列出将要复制 / 删除的文件，不写入目标路径'
+    )
+    parser.add_argument(
+        '--no-update',
+        action='store_true',
+        help='不执行 git checkout / pull，直接同步源路径的当前内容 (包括未提交的改动)'
+    )
+    parser.add_argument(
+        '--socket',
+        default=DEFAULT_SOCKET,
+        help=f'常驻进程的套接字路径 (默认: {DEFAULT_SOCKET})'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        help='等待响应的超时时间（秒）'
+    )
+    parser.add_argument(
+        '--quiet', '-q',
+        action='store_true',
+        help='sync 只输出每个项目的结果，不输出详细日志'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='直接输出原始 JSON 响应'
+    )
+    
+    args = parser.parse_args()
+    
+    payload = {"action": args.action}
+    if args.action == 'sync':
+        payload.update(projects=args.projects, dry_run=args.dry_run, update=not args.no_update)
+    
+    try:
+        response = send_request(args.socket, payload, args.timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ 常驻进程未运行: {args.socket}")
+        print("   使用 python async_i18n.py --serve 启动")
+        sys.exit(2)
+    except socket.timeout:
+        print(f"❌ 等待响应超时: {args.timeout}s")
+        sys.exit(2)
+    
+    if args.json:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    elif not response.get('ok') and 'error' in response:
+        print(f"❌ {response['error']}")
+    elif args.action == 'ping':
+        print(f"🛰️  pid {response['pid']}, 已运行 {response['uptime']:.0f}s, 处理 {response['requests']} 个同步请求")
+    elif args.action == 'projects':
+        for project in response['projects']:
+            print(f"• {project['project_name']}")
+            for target_path in project['target_path']:
+                print(f"    目标路径: {target_path}")
+    elif args.action == 'sync':
+        for result in response['results']:
+            if not args.quiet:
+                print("\n".join(result['log']))
+        for result in response['results']:
+            status = "✅" if result['success'] else "❌"
+            print(f"{status} {result['project_name']:<30} {result['elapsed'] * 1000:8.1f} ms")
+        print(f"⏱️  总耗时: {response['elapsed'] * 1000:.1f} ms")
+    
+    sys.exit(0 if response.get('ok') else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+async-i18n 常驻进程
+
+通过 Unix 套接字接收 JSON 请求（每行一个请求，每个请求返回一行响应），
+所有请求在同一个 AsyncI18n 实例中执行：项目配置、同步清单和目录扫描结果都保留在内存中，
+重复同步不需要重新启动解释器、加载配置和重新列目录
+"""
+
+import os
+import json
+import time
+import socket
+import asyncio
+from typing import Any, Dict, List
+
+
+# 支持的请求
+ACTIONS = ('ping', 'projects', 'sync', 'shutdown')
+
+
+class SyncDaemon:
+    def __init__(self, tool, socket_path: str):
+        """tool 为 AsyncI18n 实例"""
+        self.tool = tool
+        self.socket_path = os.path.expanduser(socket_path)
+        self.started = time.time()
+        self.requests = 0
+        self.lock = None
+        self.stopped = None
+    
+    def socket_in_use(self) -> bool:
+        """套接字文件存在且有进程在监听"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                return False
+        return True
+    
+    async def serve(self):
+        """监听套接字，直到收到 shutdown 请求"""
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        if os.path.exists(self.socket_path):
+            if self.socket_in_use():
+                raise RuntimeError(f"已有常驻进程在监听: {self.socket_path}")
+            # 上一个进程异常退出留下的套接字文件
+            os.remove(self.socket_path)
+        
+        self.lock = asyncio.Lock()
+        self.stopped = asyncio.Event()
+        server = await asyncio.start_unix_server(self.handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        print(f"🛰️  async-i18n 常驻进程已启动 (pid {os.getpid()})")
+        print(f"   套接字: {self.socket_path}")
+        print(f"   项目数量: {len(self.tool.projects)}")
+        try:
+            async with server:
+                await self.stopped.wait()
+        finally:
+            try:
+                os.remove(self.socket_path)
+            except FileNotFoundError:
+                pass
+        print("👋 常驻进程已退出")
+    
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个连接上的所有请求"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.handle_request(json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode('utf-8'))
+                await writer.drain()
+                if self.stopped.is_set():
+                    break
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+    
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """分发请求"""
+        action = request.get('action')
+        if action == 'ping':
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 3),
+                "requests": self.requests,
+            }
+        if action == 'projects':
+            # 与 sync 共用锁，避免同步过程中重新加载清单
+            async with self.lock:
+                self.tool.reload_projects()
+                return {
+                    "ok": True,
+                    "projects": [
+                        {"project_name": project['project_name'], "target_path": self.tool.target_paths(project)}
+                        for project in self.tool.projects
+                    ],
+                }
+        if action == 'sync':
+            return await self.sync(request)
+        if action == 'shutdown':
+            self.stopped.set()
+            return {"ok": True}
+        return {"ok": False, "error": f"未知请求: {action} (支持: {', '.join(ACTIONS)})"}
+    
+    def select_projects(self, names: List[str]) -> List[Dict[str, Any]]:
+        """按项目名称选择项目，没有指定或指定 all 时选择所有项目；有未知名称时抛出 ValueError"""
+        if not names or names == ['all']:
+            return list(self.tool.projects)
+        projects = {project['project_name']: project for project in self.tool.projects}
+        unknown = [name for name in names if name not in projects]
+        if unknown:
+            raise ValueError(f"未知项目: {', '.join(unknown)}")
+        return [projects[name] for name in names]
+    
+    async def sync(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        执行同步请求
+        
+        请求: {"action": "sync", "projects": [...], "dry_run": false, "update": true}
+        同一时间只执行一个同步请求，请求之间共享内存中的清单和扫描结果
+        """
+        async with self.lock:
+            reloaded = self.tool.reload_projects()
+            projects = self.select_projects(request.get('projects') or [])
+            
+            self.tool.dry_run = bool(request.get('dry_run', False))
+            self.tool.update = bool(request.get('update', True))
+            start = time.perf_counter()
+            try:
+                results = await self.tool.process_projects(projects, echo=False)
+            finally:
+                self.tool.dry_run = False
+                self.tool.update = True
+            elapsed = time.perf_counter() - start
+            self.requests += 1
+        
+        success = all(result['success'] for result in results)
+        status = "✅" if success else "❌"
+        names = ', '.join(result['project_name'] for result in results)
+        print(f"{status} 同步 {names} ({elapsed * 1000:.1f} ms)"
+              + (" [dry-run]" if request.get('dry_run') else ""))
+        return {
+            "ok": success,
+            "elapsed": round(elapsed, 6),
+            "reloaded": reloaded,
+            "results": results,
+        }
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+基准测试数据生成器
+生成若干个本地 bare 仓库（每个仓库 M 个语言文件，每个文件 K 个嵌套键）、
+用于推送改动的上游工作区、同步工具使用的源克隆和空的目标目录，全部离线完成
+"""
+
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# 共享模块位于仓库根目录
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sync_common.git_objects import git
+
+
+# 语言文件按语言分目录存放
+LOCALES = ("en", "zh-CN", "ja", "ko", "fr", "de", "es", "ru")
+
+# FolderSyncTool 的同步路径（与 upgrade_system.py 中一致）
+FOLDER_SYNC_PATHS = (
+    "src/clientData",
+    "src/components",
+    "src/app/[locale]/(dashboard)/system",
+    "src/serverData/system",
+    "src/hooks",
+    "src/lib",
+    "src/providers",
+)
+FOLDER_PROJECTS = ("admin-web-ad", "admin-web-fin")
+
+# 生成的提交不依赖本机的 git 身份配置
+GIT_IDENTITY = ("-c", "user.name=benchmark", "-c", "user.email=benchmark@localhost")
+
+
+def make_messages(rng: random.Random, keys: int, depth: int) -> Dict:
+    """生成 keys 个叶子键、最多 depth 层嵌套的语言文件内容"""
+    messages: Dict = {}
+    for i in range(keys):
+        node = messages
+        for level in range(rng.randint(0, max(0, depth - 1))):
+            node = node.setdefault(f"group{rng.randint(0, 7)}_{level}", {})
+        node[f"key_{i}"] = f"text {i} " + "x" * rng.randint(4, 40)
+    return messages
+
+
+def dump_messages(messages: Dict) -> str:
+    return json.dumps(messages, ensure_ascii=False, indent=2) + "\n"
+
+
+def locale_file(index: int) -> str:
+    """第 index 个语言文件的相对路径"""
+    return f"{LOCALES[index % len(LOCALES)]}/module_{index:05d}.json"
+
+
+def commit_all(worktree: Path, message: str):
+    """提交上游工作区的所有改动并推送到 bare 仓库"""
+    git(worktree, "add", "-A")
+    git(worktree, *GIT_IDENTITY, "commit", "-q", "-m", message)
+    git(worktree, "push", "-q", "origin", "HEAD:main")
+
+
+def generate_locale_repos(root: Path, repos: int, files: int, keys: int,
+                          depth: int = 3, seed: int = 0) -> List[Dict[str, str]]:
+    """
+    在 root 下生成 repos 个语言仓库
+
+    目录结构:
+        remotes/<name>.git   bare 仓库（同步工具的远程）
+        upstream/<name>      用来修改并推送的工作区
+        sources/<name>       同步工具使用的源克隆
+        targets/<name>       空的目标目录
+
+    返回每个仓库的 {name, remote, upstream, source, target}
+    """
+    rng = random.Random(seed)
+    projects = []
+    for r in range(repos):
+        name = f"lang-{r:02d}"
+        remote = root / "remotes" / f"{name}.git"
+        upstream = root / "upstream" / name
+        source = root / "sources" / name
+        target = root / "targets" / name
+
+        remote.parent.mkdir(parents=True, exist_ok=True)
+        git(remote.parent, "init", "-q", "--bare", "-b", "main", remote.name)
+        upstream.mkdir(parents=True)
+        git(upstream, "init", "-q", "-b", "main")
+        git(upstream, "remote", "add", "origin", str(remote))
+        for i in range(files):
+            path = upstream / locale_file(i)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(dump_messages(make_messages(rng, keys, depth)), encoding="utf-8")
+        commit_all(upstream, "initial locale files")
+
+        source.parent.mkdir(parents=True, exist_ok=True)
+        git(source.parent, "clone", "-q", str(remote), source.name)
+        target.mkdir(parents=True)
+        projects.append({
+            "name": name,
+            "remote": str(remote),
+            "upstream": str(upstream),
+            "source": str(source),
+            "target": str(target),
+        })
+    return projects
+
+
+def generate_folder_projects(root: Path, files: int, keys: int,
+                             depth: int = 3, seed: int = 0) -> Dict[str, str]:
+    """
+    为 FolderSyncTool 生成源项目和目标项目
+
+    files 个文件平均分布在各同步路径下，目标项目只有空的 src 目录；
+    返回 {base_path, source, target}
+    """
+    rng = random.Random(seed)
+    base = root / "weex"
+    source, target = (base / project for project in FOLDER_PROJECTS)
+    for i in range(files):
+        path = source / FOLDER_SYNC_PATHS[i % len(FOLDER_SYNC_PATHS)] / locale_file(i)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(dump_messages(make_messages(rng, keys, depth)), encoding="utf-8")
+    (target / "src").mkdir(parents=True)
+    return {"base_path": str(base), "source": FOLDER_PROJECTS[0], "target": FOLDER_PROJECTS[1]}
+
+
+def change_files(tree: Path, count: int, seed: int = 0) -> List[str]:
+    """
+    修改 tree 中前 count 个 JSON 文件（按路径排序）各一个叶子键的值
+
+    返回被修改的相对路径
+    """
+    rng = random.Random(seed)
+    paths = sorted(p for p in tree.rglob("*.json") if ".git" not in p.parts)[:count]
+    for path in paths:
+        messages = json.loads(path.read_text(encoding="utf-8"))
+        node = messages
+        while True:
+            key = sorted(node)[0]
+            if not isinstance(node[key], dict):
+                break
+            node = node[key]
+        node[key] = f"changed {rng.random():.8f}"
+        path.write_text(dump_messages(messages), encoding="utf-8")
+    return [str(path.relative_to(tree)) for path in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成基准测试用的语言仓库")
+    parser.add_argument("output", help="输出目录（必须不存在或为空）")
+    parser.add_argument("--repos", type=int, default=4, help="仓库数量 (默认: 4)")
+    parser.add_argument("--files", type=int, default=200, help="每个仓库的语言文件数量 (默认: 200)")
+    parser.add_argument("--keys", type=int, default=100, help="每个文件的键数量 (默认: 100)")
+    parser.add_argument("--depth", type=int, default=3, help="键的最大嵌套层数 (默认: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子 (默认: 0)")
+    args = parser.parse_args()
+
+    root = Path(args.output)
+    if root.exists() and any(root.iterdir()):
+        print(f"❌ 输出目录不为空: {root}")
+        sys.exit(1)
+    root.mkdir(parents=True, exist_ok=True)
+
+    projects = generate_locale_repos(root, args.repos, args.files, args.keys, args.depth, args.seed)
+    folders = generate_folder_projects(root, args.files, args.keys, args.depth, args.seed)
+    print(f"✅ 已生成 {len(projects)} 个语言仓库，每个 {args.files} 个文件: {root}")
+    print(f"✅ 已生成文件夹同步项目: {folders['base_path']}")
+
+
+if __name__ == "__main__":
+    main()
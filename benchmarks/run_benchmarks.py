@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+同步工具基准测试
+为每个工具生成一份全新的合成数据，依次计时以下场景，结果写入 JSON 便于不同版本之间对比：
+    cold        目标目录为空的首次同步
+    noop        没有任何改动时再次同步
+    one_key     上游一个文件的一个键有改动
+    many_files  上游大量文件有改动
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+from datetime import datetime
+
+# 共享模块位于仓库根目录
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from sync_common.git_objects import git
+from generate import (
+    FOLDER_SYNC_PATHS,
+    change_files,
+    commit_all,
+    generate_folder_projects,
+    generate_locale_repos,
+)
+
+
+TOOLS = ("async-i18n", "upgrade-i18n", "upgrade-system")
+SCENARIOS = ("cold", "noop", "one_key", "many_files")
+
+# 支持 --mode 的工具
+SYNC_MODES = ("worktree", "object")
+
+# 单次同步的超时时间（秒）
+RUN_TIMEOUT = 1800
+
+
+def json_files(root: Path) -> Dict[str, bytes]:
+    """root 下所有非隐藏 JSON 文件的 {相对路径: 内容}"""
+    files = {}
+    if not root.exists():
+        return files
+    for path in root.rglob("*.json"):
+        rel_path = path.relative_to(root)
+        if any(part.startswith(".") for part in rel_path.parts):
+            continue
+        files[str(rel_path)] = path.read_bytes()
+    return files
+
+
+class Scenario:
+    """一个工具在一份数据上的所有场景：准备配置、修改上游、运行、校验结果"""
+
+    def __init__(self, tool: str, mode: Optional[str], workdir: Path, args: argparse.Namespace):
+        self.tool = tool
+        self.mode = mode
+        self.workdir = workdir
+        self.args = args
+        self.many = max(1, round(args.files * args.many_fraction))
+        if tool == "upgrade-system":
+            self.folders = generate_folder_projects(workdir, args.files, args.keys, args.depth, args.seed)
+        else:
+            self.projects = generate_locale_repos(workdir, args.repos, args.files, args.keys, args.depth, args.seed)
+
+    def command(self) -> Dict:
+        """返回 {argv, stdin, env}"""
+        python = sys.executable
+        env = dict(os.environ)
+        if self.tool == "async-i18n":
+            config = self.workdir / "async-i18n.json"
+            config.write_text(json.dumps([
+                {"project_name": p["name"], "source_path": p["source"], "target_path": p["target"]}
+                for p in self.projects
+            ], indent=2), encoding="utf-8")
+            argv = [python, str(REPO_ROOT / "async-i18n" / "async_i18n.py"), "--config", str(config),
+                    "--mode", self.mode, "--cache-dir", str(self.workdir / "cache")]
+            return {"argv": argv, "stdin": "all\ny\n", "env": env}
+
+        if self.tool == "upgrade-i18n":
+            config_dir = self.workdir / "upgrade-i18n"
+            config_dir.mkdir(exist_ok=True)
+            projects = [
+                {"name": p["name"], "language_path": p["source"], "target_path": p["target"], "enabled": True}
+                for p in self.projects
+            ]
+            (config_dir / "config.py").write_text("\n".join([
+                f"LANGUAGE_BASE_PATH = {str(self.workdir)!r}",
+                f"LANGUAGE_PROJECT_LIST = {projects!r}",
+                "SYNC_CONFIG = " + repr({
+                    "enable_git_operations": True,
+                    "file_extensions": [".json"],
+                    "ignore_patterns": [".git*"],
+                    "state_file": str(self.workdir / "upgrade-i18n-state.json"),
+                }),
+                "GIT_CONFIG = " + repr({
+                    "default_branch": "main",
+                    "sync_mode": self.mode,
+                    "clone_cache_dir": str(self.workdir / "cache"),
+                }),
+                'LOG_CONFIG = {"run_log": ""}',
+                "",
+            ]), encoding="utf-8")
+            env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(config_dir), env.get("PYTHONPATH")]))
+            argv = [python, str(REPO_ROOT / "upgrade_i18n" / "index.py"),
+                    "--language-base-path", str(self.workdir),
+                    "--languages", ",".join(p["name"] for p in self.projects)]
+            return {"argv": argv, "stdin": "y\n", "env": env}
+
+        argv = [python, str(REPO_ROOT / "upgrade_system" / "upgrade_system.py"),
+                "--base-path", self.folders["base_path"],
+                "--source", self.folders["source"], "--target", self.folders["target"]]
+        return {"argv": argv, "stdin": "", "env": env}
+
+    def mutate(self, scenario: str):
+        """在计时前修改上游数据"""
+        count = {"one_key": 1, "many_files": self.many}.get(scenario)
+        if not count:
+            return
+        if self.tool == "upgrade-system":
+            change_files(Path(self.folders["base_path"]) / self.folders["source"], count, self.args.seed)
+            return
+        for project in self.projects:
+            upstream = Path(project["upstream"])
+            change_files(upstream, count, self.args.seed)
+            commit_all(upstream, f"benchmark: {scenario}")
+
+    def verify(self) -> bool:
+        """目标中的 JSON 文件与上游完全一致"""
+        if self.tool == "upgrade-system":
+            base = Path(self.folders["base_path"])
+            return all(
+                json_files(base / self.folders["source"] / path) == json_files(base / self.folders["target"] / path)
+                for path in FOLDER_SYNC_PATHS
+            )
+        return all(
+            json_files(Path(p["upstream"])) == json_files(Path(p["target"]))
+            for p in self.projects
+        )
+
+    def run(self, scenario: str) -> Dict:
+        """修改上游后运行一次同步并计时"""
+        self.mutate(scenario)
+        command = self.command()
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(
+                command["argv"],
+                input=command["stdin"],
+                env=command["env"],
+                capture_output=True,
+                text=True,
+                timeout=RUN_TIMEOUT
+            )
+            returncode, output = result.returncode, result.stdout + result.stderr
+        except subprocess.TimeoutExpired as e:
+            returncode, output = None, f"timeout after {e.timeout}s"
+        seconds = time.perf_counter() - start
+        record = {
+            "tool": self.tool,
+            "mode": self.mode,
+            "scenario": scenario,
+            "seconds": round(seconds, 6),
+            "returncode": returncode,
+            "verified": returncode == 0 and self.verify(),
+        }
+        if not record["verified"]:
+            record["output_tail"] = output[-2000:]
+        return record
+
+
+def revision() -> Optional[str]:
+    """当前仓库的提交 ID，工作区有改动时加上 -dirty"""
+    try:
+        commit = git(REPO_ROOT, "rev-parse", "HEAD").strip()
+        dirty = git(REPO_ROOT, "status", "--porcelain", "--untracked-files=no").strip()
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def summarize(results: List[Dict]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """按 工具/模式、场景 汇总 {min, median, mean}"""
+    grouped: Dict[str, Dict[str, List[float]]] = {}
+    for record in results:
+        key = record["tool"] + (f"/{record['mode']}" if record["mode"] else "")
+        grouped.setdefault(key, {}).setdefault(record["scenario"], []).append(record["seconds"])
+    return {
+        key: {
+            scenario: {
+                "min": round(min(times), 6),
+                "median": round(statistics.median(times), 6),
+                "mean": round(statistics.mean(times), 6),
+            }
+            for scenario, times in scenarios.items()
+        }
+        for key, scenarios in grouped.items()
+    }
+
+
+def print_summary(summary: Dict, baseline: Optional[Dict] = None):
+    """输出中位数耗时表，提供基准结果时同时输出与基准的比值"""
+    print("\n" + "=" * 60)
+    print("⏱️  中位数耗时:")
+    print(f"   {'工具/模式':<26}" + "".join(f"{scenario:>14}" for scenario in SCENARIOS))
+    for key, scenarios in summary.items():
+        row = f"   {key:<30}"
+        for scenario in SCENARIOS:
+            median = scenarios.get(scenario, {}).get("median")
+            cell = f"{median:.3f}s" if median is not None else "-"
+            base = (baseline or {}).get(key, {}).get(scenario, {}).get("median")
+            if median is not None and base:
+                cell += f" x{median / base:.2f}"
+            row += f"{cell:>14}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步工具基准测试")
+    parser.add_argument("--tools", default=",".join(TOOLS), help=f"要测试的工具，用逗号分隔 (默认: {','.join(TOOLS)})")
+    parser.add_argument("--modes", default=",".join(SYNC_MODES), help="async-i18n / upgrade-i18n 的同步模式 (默认: worktree,object)")
+    parser.add_argument("--repos", type=int, default=4, help="仓库数量 (默认: 4)")
+    parser.add_argument("--files", type=int, default=200, help="每个仓库的语言文件数量 (默认: 200)")
+    parser.add_argument("--keys", type=int, default=100, help="每个文件的键数量 (默认: 100)")
+    parser.add_argument("--depth", type=int, default=3, help="键的最大嵌套层数 (默认: 3)")
+    parser.add_argument("--many-fraction", type=float, default=0.25, help="many_files 场景修改的文件比例 (默认: 0.25)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景重复次数，每次使用全新数据 (默认: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子 (默认: 0)")
+    parser.add_argument("--workdir", help="生成数据的目录 (默认: 临时目录，结束后删除)")
+    parser.add_argument("--output", help="结果 JSON 文件 (默认: benchmark-<提交>.json)")
+    parser.add_argument("--baseline", help="用于对比的历史结果 JSON 文件")
+    args = parser.parse_args()
+
+    tools = [tool.strip() for tool in args.tools.split(",") if tool.strip()]
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    invalid = [tool for tool in tools if tool not in TOOLS] + [mode for mode in modes if mode not in SYNC_MODES]
+    if invalid:
+        print(f"❌ 无效的工具或模式: {', '.join(invalid)}")
+        sys.exit(1)
+
+    rev = revision()
+    started_at = datetime.now().isoformat(timespec="seconds")
+    output = Path(args.output or f"benchmark-{(rev or 'unknown')[:12]}.json")
+    root = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="sync-bench-"))
+    root.mkdir(parents=True, exist_ok=True)
+
+    print("🏁 同步工具基准测试")
+    print(f"   版本: {rev or '未知'}")
+    print(f"   数据: {args.repos} 个仓库 × {args.files} 个文件 × {args.keys} 个键")
+    print(f"   目录: {root}")
+
+    results = []
+    try:
+        for tool in tools:
+            for mode in (modes if tool != "upgrade-system" else [None]):
+                label = tool + (f"/{mode}" if mode else "")
+                for repeat in range(args.repeat):
+                    workdir = root / f"{tool}-{mode or 'default'}-{repeat}"
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    workdir.mkdir(parents=True)
+                    scenario_runner = Scenario(tool, mode, workdir, args)
+                    for scenario in SCENARIOS:
+                        record = scenario_runner.run(scenario)
+                        record["repeat"] = repeat
+                        results.append(record)
+                        status = "✅" if record["verified"] else "❌"
+                        print(f"   {status} {label:<26} {scenario:<12} {record['seconds']:8.3f}s")
+                    shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    summary = summarize(results)
+    report = {
+        "meta": {
+            "revision": rev,
+            "started_at": started_at,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "git": git(REPO_ROOT, "--version").strip(),
+            "params": {key: getattr(args, key) for key in (
+                "repos", "files", "keys", "depth", "many_fraction", "repeat", "seed"
+            )},
+        },
+        "results": results,
+        "summary": summary,
+    }
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("summary")
+    print_summary(summary, baseline)
+    print(f"\n📄 结果已写入: {output}")
+
+    if not all(record["verified"] for record in results):
+        print("❌ 部分场景同步失败或结果与上游不一致")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
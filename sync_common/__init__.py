@@ -0,0 +1,6 @@
+"""
+同步工具共享模块
+
+async-i18n、upgrade_i18n、upgrade_system 共用的底层实现。
+各工具脚本运行时会把仓库根目录加入 sys.path 后再导入本包。
+"""
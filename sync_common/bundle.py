@@ -0,0 +1,371 @@
+"""
+tar 流同步包（--bundle / --unbundle）
+
+把源项目的同步路径打包成一个顺序写入的 tar 流（可选 gzip / zstd 压缩），在目标端一次顺序读取解包。
+在网络挂载（NFS）之间同步大量小文件时，耗时主要是每个文件打开 / 关闭的往返；
+同步包在传输介质上只是一个文件，可以保存为构建产物，之后应用到多个目标项目或多台机器。
+
+包中的第一个成员是清单 MANIFEST_NAME：源项目、同步路径、忽略规则和每个文件的 (大小, mtime_ns)。
+解包时先用清单与目标比较（tree_sync.diff_trees），只写入新增和变化的文件、删除源中已不存在的文件，
+未变化的文件在 tar 流中直接跳过；一个包可以一次解包到多个目标项目，每个成员只读取一次。
+
+文件的 mtime 以纳秒保存在 PAX 扩展头中，解包后与源完全一致，之后的增量同步按 (大小, mtime) 判定为未变化。
+"""
+
+import io
+import os
+import sys
+import json
+import gzip
+import shutil
+import tarfile
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from sync_common.ignore import IgnoreMatcher
+from sync_common.progress import ProgressReporter
+from sync_common.tree_sync import Snapshot, apply_delta, diff_trees, snapshot
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+
+BUNDLE_VERSION = 1
+MANIFEST_NAME = ".sync-bundle.json"
+
+COMPRESSIONS = ("auto", "none", "gzip", "zstd")
+
+# 按扩展名选择压缩方式（auto）
+EXTENSIONS = {".tar.gz": "gzip", ".tgz": "gzip", ".tar.zst": "zstd", ".tzst": "zstd"}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# 压缩格式的魔数，解包时自动识别
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# PAX 扩展头中保存纳秒 mtime 的键
+MTIME_NS_KEY = "SYNC.mtime_ns"
+
+BUFFER_SIZE = 1024 * 1024
+
+
+def resolve_compression(output: str, compression: str = "auto") -> str:
+    """auto 按输出文件的扩展名选择压缩方式，标准输出（-）和其他扩展名不压缩"""
+    if compression != "auto":
+        return compression
+    name = str(output).lower()
+    for extension, method in EXTENSIONS.items():
+        if name.endswith(extension):
+            return method
+    return "none"
+
+
+def _require_zstd():
+    if zstd is None:
+        raise RuntimeError("zstd 压缩需要 Python 3.14+ 或安装 zstandard (pip install zstandard)")
+
+
+@contextlib.contextmanager
+def _compressed_writer(raw: BinaryIO, compression: str) -> Iterator[BinaryIO]:
+    if compression == "none":
+        yield raw
+    elif compression == "gzip":
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL) as stream:
+            yield stream
+    elif compression == "zstd":
+        _require_zstd()
+        if hasattr(zstd, "ZstdFile"):
+            with zstd.ZstdFile(raw, "wb", level=ZSTD_LEVEL) as stream:
+                yield stream
+        else:
+            with zstd.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False) as stream:
+                yield stream
+    else:
+        raise ValueError(f"不支持的压缩方式: {compression}")
+
+
+@contextlib.contextmanager
+def _decompressed_reader(raw: io.BufferedReader) -> Iterator[BinaryIO]:
+    """按魔数识别压缩方式"""
+    magic = raw.peek(4)[:4]
+    if magic.startswith(GZIP_MAGIC):
+        with gzip.GzipFile(fileobj=raw, mode="rb") as stream:
+            yield stream
+    elif magic == ZSTD_MAGIC:
+        _require_zstd()
+        if hasattr(zstd, "ZstdFile"):
+            with zstd.ZstdFile(raw, "rb") as stream:
+                yield stream
+        else:
+            with zstd.ZstdDecompressor().stream_reader(raw, closefd=False) as stream:
+                yield stream
+    else:
+        yield raw
+
+
+@contextlib.contextmanager
+def _open_raw(path: Union[str, Path], mode: str) -> Iterator[BinaryIO]:
+    """打开同步包文件，- 表示标准输入 / 标准输出"""
+    if str(path) == "-":
+        # 调用方可能把进度输出重定向到了标准错误，同步包总是读写进程的标准输入 / 标准输出
+        if mode == "wb":
+            yield sys.__stdout__.buffer
+            sys.__stdout__.buffer.flush()
+        else:
+            yield sys.__stdin__.buffer
+        return
+    if mode == "wb":
+        # 写完后再 rename，中途失败不会留下不完整的包
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                yield f
+            os.replace(tmp_file, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_file)
+            raise
+    else:
+        with open(path, "rb") as f:
+            yield f
+
+
+def write_bundle(output: Union[str, Path], project_root: Union[str, Path],
+                 paths: Dict[str, Optional[Snapshot]], compression: str = "none",
+                 ignore: List[str] = (), **meta) -> Dict[str, int]:
+    """
+    把同步路径打包成 tar 流
+
+    paths 为 {同步路径: 快照}，快照为 None 表示同步路径是单个文件；ignore 为源项目的忽略规则，
+    解包时用于扫描目标。返回 {"files", "bytes", "missing"}，missing 为扫描后、打包前被删除的文件数
+    """
+    project_root = Path(project_root)
+    manifest_paths = {}
+    for sync_path, entries in paths.items():
+        if entries is None:
+            stat = (project_root / sync_path).stat()
+            manifest_paths[sync_path] = {"kind": "file", "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        else:
+            manifest_paths[sync_path] = {"kind": "tree", "entries": entries}
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        **meta,
+        "ignore": list(ignore),
+        "paths": manifest_paths,
+    }
+
+    stats = {"files": 0, "bytes": 0, "missing": 0}
+    with _open_raw(output, "wb") as raw, _compressed_writer(raw, compression) as stream, \
+            tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        data = json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        info.mtime = int(datetime.now().timestamp())
+        tar.addfile(info, io.BytesIO(data))
+
+        for sync_path, entries in paths.items():
+            if entries is None:
+                names = [sync_path]
+            else:
+                names = [f"{sync_path}/{rel_path}" for rel_path, state in entries.items() if state is not None]
+            for name in names:
+                try:
+                    f = open(project_root / name, "rb")
+                except FileNotFoundError:
+                    stats["missing"] += 1
+                    continue
+                with f:
+                    stat = os.fstat(f.fileno())
+                    info = tarfile.TarInfo(name)
+                    info.size = stat.st_size
+                    info.mtime = stat.st_mtime
+                    info.mode = stat.st_mode & 0o7777
+                    info.pax_headers = {MTIME_NS_KEY: str(stat.st_mtime_ns)}
+                    tar.addfile(info, f)
+                stats["files"] += 1
+                stats["bytes"] += stat.st_size
+    return stats
+
+
+def _read_manifest(tar: tarfile.TarFile) -> Dict:
+    member = tar.next()
+    if member is None or member.name != MANIFEST_NAME:
+        raise ValueError("不是同步包: 缺少清单")
+    manifest = json.loads(tar.extractfile(member).read())
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"不支持的同步包版本: {manifest.get('version')}")
+    for sync_path, entry in manifest["paths"].items():
+        for rel_path in [sync_path, *entry.get("entries", ())]:
+            parts = rel_path.split("/")
+            if not rel_path or rel_path.startswith("/") or ".." in parts:
+                raise ValueError(f"同步包中的路径不安全: {rel_path}")
+    return manifest
+
+
+def _prepare(target_root: Path, sync_path: str, entry: Dict, ignore: IgnoreMatcher,
+             writes: Dict[str, List[Tuple]], key: Tuple[str, str]) -> Dict[str, int]:
+    """
+    比较清单和一个目标同步路径：先执行删除和创建目录，需要写入的文件加入 writes
+
+    writes 为 {成员名称: [(目标文件, key, created / updated, 大小)]}，key 为 (目标名称, 同步路径)。
+    返回这个同步路径的统计，写入成员时继续累加 created / updated / bytes
+    """
+    target_path = target_root / sync_path
+    if entry["kind"] == "file":
+        stats = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "bytes": 0}
+        if target_path.is_dir() and not target_path.is_symlink():
+            shutil.rmtree(target_path)
+            stats["deleted"] += 1
+        try:
+            target_stat = target_path.stat()
+        except FileNotFoundError:
+            counter = "created"
+        else:
+            if (target_stat.st_size, target_stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+                stats["unchanged"] += 1
+                return stats
+            counter = "updated"
+        writes.setdefault(sync_path, []).append((target_path, key, counter, entry["size"]))
+        return stats
+
+    source: Snapshot = {
+        rel_path: tuple(state) if state is not None else None for rel_path, state in entry["entries"].items()
+    }
+    if target_path.exists() and not target_path.is_dir():
+        target_path.unlink()
+    target = snapshot(target_path, ignore.relative_to(sync_path)) if target_path.is_dir() else {}
+    delta = diff_trees(target_path, target_path, source, target)
+    # 先执行删除和创建目录（不复制文件，不需要复制引擎），文件在读取 tar 流时写入
+    stats = apply_delta(target_path, target_path, {**delta, "create": [], "update": []}, None)
+    for delta_key, counter in (("create", "created"), ("update", "updated")):
+        for rel_path in delta[delta_key]:
+            writes.setdefault(f"{sync_path}/{rel_path}", []).append(
+                (target_path / rel_path, key, counter, source[rel_path][0])
+            )
+    return stats
+
+
+def _discard(f: BinaryIO, tmp_file: Path):
+    """关闭并删除写了一半的临时文件"""
+    with contextlib.suppress(OSError):
+        f.close()
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(tmp_file)
+
+
+def _extract(tar: tarfile.TarFile, member: tarfile.TarInfo, jobs: List[Tuple],
+             results: Dict[str, Dict[str, object]], progress: ProgressReporter = None):
+    """
+    读取一个成员，同时写入所有需要它的目标文件（临时文件 + rename，保留纳秒 mtime）
+
+    写入失败时把对应的 results[目标名称][同步路径] 替换为异常并删除它的临时文件，其他目标不受影响，
+    这个同步路径之后的文件不再写入
+    """
+    mtime_ns = int(member.pax_headers.get(MTIME_NS_KEY, int(member.mtime * 1_000_000_000)))
+    outputs = []
+    for target_file, (name, sync_path), counter, _ in jobs:
+        if isinstance(results[name][sync_path], Exception):
+            continue
+        tmp_file = target_file.with_name(f".{target_file.name}.{os.getpid()}.tmp")
+        try:
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            outputs.append((open(tmp_file, "wb"), tmp_file, target_file, name, sync_path, counter))
+        except OSError as e:
+            results[name][sync_path] = e
+
+    source = tar.extractfile(member)
+    try:
+        while True:
+            chunk = source.read(BUFFER_SIZE)
+            if not chunk:
+                break
+            for output in list(outputs):
+                f, tmp_file, _, name, sync_path, _ = output
+                try:
+                    f.write(chunk)
+                except OSError as e:
+                    # 只放弃这个目标（例如磁盘已满），其他目标继续写入
+                    results[name][sync_path] = e
+                    outputs.remove(output)
+                    _discard(f, tmp_file)
+    except BaseException:
+        for f, tmp_file, *_ in outputs:
+            _discard(f, tmp_file)
+        raise
+    for output in list(outputs):
+        f, tmp_file, _, name, sync_path, _ = output
+        try:
+            f.close()
+        except OSError as e:
+            results[name][sync_path] = e
+            outputs.remove(output)
+            _discard(f, tmp_file)
+
+    for _, tmp_file, target_file, name, sync_path, counter in outputs:
+        try:
+            os.chmod(tmp_file, member.mode)
+            os.utime(tmp_file, ns=(mtime_ns, mtime_ns))
+            os.replace(tmp_file, target_file)
+        except OSError as e:
+            results[name][sync_path] = e
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_file)
+            continue
+        stats = results[name][sync_path]
+        if isinstance(stats, Exception):
+            continue
+        stats[counter] += 1
+        stats["bytes"] += member.size
+        if progress is not None:
+            progress.advance(member.size)
+
+
+def apply_bundle(bundle: Union[str, Path], targets: Dict[str, Union[str, Path]],
+                 delete_excluded: bool = False,
+                 progress: ProgressReporter = None) -> Tuple[Dict, Dict[str, Dict[str, object]]]:
+    """
+    把同步包解包到多个目标项目（一次顺序读取）
+
+    targets 为 {目标名称: 项目根目录}。目标中被包内忽略规则忽略的文件保持不变，delete_excluded 时一并删除。
+    返回 (清单, {目标名称: {同步路径: apply_delta 格式的统计或异常}})
+    """
+    results: Dict[str, Dict[str, object]] = {name: {} for name in targets}
+    with _open_raw(bundle, "rb") as raw, _decompressed_reader(raw) as stream, \
+            tarfile.open(fileobj=stream, mode="r|") as tar:
+        manifest = _read_manifest(tar)
+        ignore = IgnoreMatcher(() if delete_excluded else manifest.get("ignore", []))
+
+        writes: Dict[str, List[Tuple]] = {}
+        for name, target_root in targets.items():
+            for sync_path, entry in manifest["paths"].items():
+                try:
+                    results[name][sync_path] = _prepare(
+                        Path(target_root), sync_path, entry, ignore, writes, (name, sync_path)
+                    )
+                except Exception as e:
+                    results[name][sync_path] = e
+        if progress is not None:
+            progress.add_total(sum(len(jobs) for jobs in writes.values()),
+                               sum(job[3] for jobs in writes.values() for job in jobs))
+
+        for member in tar:
+            jobs = writes.pop(member.name, None)
+            if jobs and member.isfile():
+                _extract(tar, member, jobs, results, progress)
+
+    # 打包时已被删除的文件不在 tar 流中
+    for member_name, jobs in writes.items():
+        for _, (name, sync_path), _, _ in jobs:
+            if not isinstance(results[name][sync_path], Exception):
+                results[name][sync_path] = FileNotFoundError(f"同步包中缺少文件: {member_name}")
+    return manifest, results
@@ -0,0 +1,64 @@
+"""
+语言仓库克隆缓存
+
+工具自己管理一份语言仓库的克隆，而不是要求用户提供完整克隆：
+- --filter=blob:none  只按需下载文件内容
+- --depth=1           不下载历史提交
+- sparse-checkout     工作区只检出匹配的语言文件 (如 *.json)
+
+缓存目录归工具所有，更新时直接 fetch + reset --hard，不需要考虑本地改动。
+"""
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from sync_common.git_objects import git
+
+
+def sparse_patterns(extensions: Iterable[str]) -> List[str]:
+    """把文件扩展名转换为 sparse-checkout (non-cone) 规则"""
+    return [f"*{ext}" for ext in extensions]
+
+
+def cache_path(cache_dir: Union[str, Path], name: str) -> Path:
+    """项目在缓存目录中的克隆路径"""
+    return Path(os.path.expanduser(str(cache_dir))) / name
+
+
+def head_commit(repo_path: Union[str, Path]) -> Optional[str]:
+    """获取 HEAD 提交，仓库不存在或没有提交时返回 None"""
+    try:
+        return git(repo_path, "rev-parse", "--verify", "-q", "HEAD").strip() or None
+    except (subprocess.CalledProcessError, FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def ensure_clone(remote: str, repo_path: Union[str, Path], branch: str,
+                 extensions: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Optional[str]]:
+    """
+    创建或更新一个 blobless、shallow、sparse 的克隆
+
+    返回更新前后的 HEAD 提交 {"before": ..., "after": ...}，首次克隆时 before 为 None。
+    失败时抛出 CalledProcessError / TimeoutExpired。
+    """
+    repo_path = Path(repo_path)
+    patterns = sparse_patterns(extensions)
+
+    if not (repo_path / ".git").exists():
+        repo_path.parent.mkdir(parents=True, exist_ok=True)
+        git(repo_path.parent, "clone", "--filter=blob:none", "--depth=1", "--no-checkout",
+            "--single-branch", "--branch", branch, remote, str(repo_path), timeout=timeout)
+        git(repo_path, "sparse-checkout", "set", "--no-cone", *patterns, timeout=timeout)
+        git(repo_path, "checkout", branch, timeout=timeout)
+        return {"before": None, "after": head_commit(repo_path)}
+
+    before = head_commit(repo_path)
+    # 配置的扩展名可能变化，每次都重新设置 sparse 规则（规则相同时没有额外开销）
+    git(repo_path, "sparse-checkout", "set", "--no-cone", *patterns, timeout=timeout)
+    git(repo_path, "fetch", "--depth=1", "--filter=blob:none", "origin", branch, timeout=timeout)
+    git(repo_path, "reset", "--hard", "FETCH_HEAD", timeout=timeout)
+    # 同时更新 origin/<branch>，对象库模式从这个引用读取
+    git(repo_path, "update-ref", f"refs/remotes/origin/{branch}", "FETCH_HEAD", timeout=timeout)
+    return {"before": before, "after": head_commit(repo_path)}
@@ -0,0 +1,200 @@
+"""
+可插拔的文件复制引擎
+
+支持的复制策略：
+- reflink:  写时复制克隆 (Linux FICLONE / macOS clonefile)，不复制数据块
+- hardlink: 硬链接，目标与源共享同一个 inode，只适合只读的使用方
+- kernel:   os.copy_file_range / os.sendfile，数据在内核中复制
+- buffered: 用户态缓冲复制，总是可用
+
+auto 按 reflink → kernel → buffered 的顺序尝试；指定的策略不被支持时
+（例如跨文件系统、文件系统不支持 reflink）逐个文件回退到下一个策略。
+所有策略都先写入同目录的临时文件再 rename，不会修改目标原有的 inode。
+"""
+
+import os
+import sys
+import time
+import errno
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+STRATEGIES = ("auto", "reflink", "hardlink", "kernel", "buffered")
+
+# auto 模式的尝试顺序
+AUTO_CHAIN = ("reflink", "kernel", "buffered")
+
+# 这些错误表示“当前策略不支持”，回退到下一个策略而不是报错
+UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EPERM, errno.EMLINK,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EOPNOTSUPP,
+}
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+BUFFER_SIZE = 1024 * 1024
+
+
+def _reflink(src: str, dst: str):
+    """写时复制克隆"""
+    if sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL("libc.dylib", use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), src)
+        return
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink 不受支持", src)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _hardlink(src: str, dst: str):
+    """硬链接"""
+    os.link(src, dst)
+
+
+def _kernel(src: str, dst: str):
+    """内核态复制：优先 copy_file_range，其次 sendfile"""
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is None and not sys.platform.startswith("linux"):
+        # 非 Linux 平台的 sendfile 只支持 socket 作为输出
+        raise OSError(errno.EOPNOTSUPP, "内核态复制不受支持", src)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        remaining = os.fstat(infd).st_size
+        offset = 0
+        while remaining > 0:
+            if copy_range is not None:
+                sent = copy_range(infd, outfd, remaining)
+            else:
+                sent = os.sendfile(outfd, infd, offset, remaining)
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+
+
+def _buffered(src: str, dst: str):
+    """用户态缓冲复制"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, BUFFER_SIZE)
+
+
+COPY_FUNCTIONS = {
+    "reflink": _reflink,
+    "hardlink": _hardlink,
+    "kernel": _kernel,
+    "buffered": _buffered,
+}
+
+
+class CopyEngine:
+    """按配置的策略复制文件，并统计每个策略的文件数、字节数和耗时（线程安全）"""
+
+    def __init__(self, strategy: str = "auto"):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"未知的复制策略: {strategy} (可选: {', '.join(STRATEGIES)})")
+        self.strategy = strategy
+        if strategy == "auto":
+            self.chain = AUTO_CHAIN
+        else:
+            self.chain = (strategy,) + tuple(s for s in AUTO_CHAIN if s != strategy)
+        # (策略, 源设备, 目标设备) -> 不支持，避免每个文件都重新尝试
+        self._unsupported = set()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def copy(self, src: Union[str, Path], dst: Union[str, Path]) -> str:
+        """
+        复制单个文件（语义同 shutil.copy2，可作为 copytree 的 copy_function）
+
+        返回实际使用的策略
+        """
+        src, dst = os.fspath(src), os.fspath(dst)
+        src_stat = os.stat(src)
+        try:
+            if os.path.samestat(src_stat, os.stat(dst)):
+                # 目标已经是源的硬链接，os.replace 在同一个 inode 上什么都不做，会留下临时文件
+                return "hardlink"
+        except FileNotFoundError:
+            pass
+        dst_dir = os.path.dirname(dst) or "."
+        devices = (src_stat.st_dev, os.stat(dst_dir).st_dev)
+        tmp = os.path.join(dst_dir, f".{os.path.basename(dst)}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        for strategy in self.chain:
+            if (strategy, *devices) in self._unsupported:
+                continue
+            start = time.perf_counter()
+            try:
+                COPY_FUNCTIONS[strategy](src, tmp)
+                if strategy != "hardlink":
+                    shutil.copystat(src, tmp)
+                os.replace(tmp, dst)
+                if os.path.lexists(tmp):
+                    # 复制过程中目标变成了源的硬链接，rename 到同一个 inode 不会移走临时文件
+                    os.unlink(tmp)
+            except OSError as e:
+                if os.path.lexists(tmp):
+                    os.unlink(tmp)
+                if e.errno in UNSUPPORTED_ERRNOS and strategy != "buffered":
+                    with self._lock:
+                        self._unsupported.add((strategy, *devices))
+                    continue
+                raise
+            self._record(strategy, os.path.getsize(dst), time.perf_counter() - start)
+            return strategy
+
+        raise OSError(errno.EOPNOTSUPP, "没有可用的复制策略", src)
+
+    def _record(self, strategy: str, size: int, elapsed: float):
+        """记录一次复制"""
+        with self._lock:
+            stats = self.stats.setdefault(strategy, {"files": 0, "bytes": 0, "seconds": 0.0})
+            stats["files"] += 1
+            stats["bytes"] += size
+            stats["seconds"] += elapsed
+
+    def summary(self) -> List[Tuple[str, int, int, float]]:
+        """每个策略的 (策略, 文件数, 字节数, 字节/秒)"""
+        with self._lock:
+            return [
+                (strategy, int(s["files"]), int(s["bytes"]),
+                 s["bytes"] / s["seconds"] if s["seconds"] > 0 else 0.0)
+                for strategy, s in self.stats.items()
+            ]
+
+    def totals(self) -> Dict[str, float]:
+        """所有策略合计的 {files, bytes, seconds}"""
+        with self._lock:
+            return {
+                key: sum(s[key] for s in self.stats.values())
+                for key in ("files", "bytes", "seconds")
+            }
+
+    def summary_lines(self) -> List[str]:
+        """可直接输出的统计信息"""
+        return [
+            f"{strategy}: {files} 个文件, {format_bytes(size)}, {format_bytes(rate)}/s"
+            for strategy, files, size, rate in self.summary()
+        ]
+
+
+def format_bytes(size: float) -> str:
+    """格式化字节数"""
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
@@ -0,0 +1,117 @@
+"""
+直接读取 Git 对象库
+
+不需要 checkout：用 git ls-tree 列出提交中的文件，再通过一个长驻的
+git cat-file --batch 进程按对象 ID 读取内容，写入目标路径。
+工作区不会被修改，工作区有未提交改动时也可以使用。
+"""
+
+import os
+import hashlib
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_id(file_path: Union[str, Path]) -> str:
+    """计算文件的 git blob 对象 ID（与 git hash-object 结果一致）"""
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha1(f"blob {size}\0".encode())
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def git(repo_path: Union[str, Path], *args: str, timeout: Optional[float] = None) -> str:
+    """在 repo_path 中执行 git 命令并返回标准输出，失败时抛出 CalledProcessError"""
+    result = subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=timeout
+    )
+    return result.stdout
+
+
+def resolve_ref(repo_path: Union[str, Path], ref: str, timeout: Optional[float] = None) -> str:
+    """把分支/引用解析为提交 ID"""
+    return git(repo_path, "rev-parse", "--verify", f"{ref}^{{commit}}", timeout=timeout).strip()
+
+
+def list_tree(repo_path: Union[str, Path], treeish: str,
+              include: Callable[[str], bool] = None,
+              timeout: Optional[float] = None) -> Dict[str, str]:
+    """
+    列出提交中的所有文件
+
+    返回 {相对路径: blob 对象 ID}，include 用于过滤路径
+    """
+    output = git(repo_path, "ls-tree", "-r", "-z", "--full-tree", treeish, timeout=timeout)
+    entries = {}
+    for record in output.split('\0'):
+        if not record:
+            continue
+        meta, rel_path = record.split('\t', 1)
+        _, obj_type, oid = meta.split(' ')
+        # 只处理普通文件，跳过子模块 (commit) 和符号链接
+        if obj_type != 'blob' or meta.startswith('120000'):
+            continue
+        if include is None or include(rel_path):
+            entries[rel_path] = oid
+    return entries
+
+
+class BlobReader:
+    """长驻的 git cat-file --batch 进程，一个进程读取任意数量的对象"""
+
+    def __init__(self, repo_path: Union[str, Path]):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def read(self, oid: str) -> bytes:
+        """读取对象内容"""
+        self.process.stdin.write(f"{oid}\n".encode())
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().decode().split()
+        if len(header) != 3:
+            raise KeyError(f"对象不存在: {oid}")
+        size = int(header[2])
+        data = self.process.stdout.read(size)
+        # 每个对象内容后面跟一个换行符
+        self.process.stdout.read(1)
+        return data
+
+    def close(self):
+        """关闭 cat-file 进程"""
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_file_atomic(target_file: Union[str, Path], data: bytes):
+    """先写临时文件再 rename，读者不会看到写了一半的文件"""
+    target_file = str(target_file)
+    os.makedirs(os.path.dirname(target_file), exist_ok=True)
+    tmp_file = f"{target_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, target_file)
+
@@ -0,0 +1,254 @@
+"""
+gitignore 风格的忽略规则与剪枝遍历
+
+- IgnoreMatcher 把所有规则编译成一个匹配器，语义与 .gitignore 一致：
+  # 注释、! 取反、结尾 / 只匹配目录、含 / 的规则相对根目录、*、?、[...]、**
+- scan_tree 基于 os.scandir 遍历，被忽略的目录不会进入，结果以生成器逐个产出，
+  调用方可以边扫描边处理
+- 可选只保留 git 跟踪的文件（git ls-files），未跟踪的文件和不含跟踪文件的目录视为被忽略
+"""
+
+import os
+import re
+import copy
+import contextlib
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from sync_common.git_objects import git
+
+
+def _translate(glob: str) -> str:
+    """把 gitignore glob 转换为正则表达式（不含锚点）"""
+    i, n = 0, len(glob)
+    out = []
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i) and (i == 0 or glob[i - 1] == "/"):
+            # 开头或中间的 **/ 匹配零个或多个目录
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == n:
+            # 结尾的 /** 匹配目录下的所有内容
+            out.append("/.*")
+            i += 3
+        elif c == "*":
+            if glob.startswith("**", i):
+                out.append(".*")
+                i += 2
+            else:
+                out.append("[^/]*")
+                i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = glob.find("]", i + 2 if glob[i + 1:i + 2] in ("!", "^", "]") else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = glob[i + 1:end]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def _parse(line: str) -> Optional[Tuple[bool, str, str]]:
+    """
+    解析一条规则
+
+    返回 (是否取反, 文件匹配正则, 目录匹配正则)，空行和注释返回 None。
+    正则同时匹配路径本身和它下面的所有内容，被忽略目录中的文件也会被忽略。
+    """
+    line = line.rstrip("\n")
+    # 结尾未转义的空格会被忽略
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\#") or line.startswith("\\!"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # 含 / 的规则相对根目录匹配，否则匹配任意层级的名称
+    if "/" in line:
+        body = "^" + _translate(line.lstrip("/"))
+    else:
+        body = "^(?:.*/)?" + _translate(line)
+
+    dir_pattern = f"{body}(?:/.*)?$"
+    file_pattern = f"{body}/.*$" if dir_only else dir_pattern
+    return negate, file_pattern, dir_pattern
+
+
+class IgnoreMatcher:
+    """编译后的 gitignore 规则集合，路径使用相对根目录的 / 分隔路径"""
+
+    def __init__(self, patterns: Iterable[str] = (), tracked: Iterable[str] = None):
+        """tracked 不为 None 时只保留其中的文件（相对根目录的路径）"""
+        rules = [rule for rule in (_parse(p) for p in patterns) if rule]
+        self.rule_count = len(rules)
+        self.tracked: Optional[Set[str]] = None
+        self._tracked_dirs: Set[str] = set()
+        if tracked is not None:
+            self.tracked = set(tracked)
+            for path in self.tracked:
+                parent = path.rpartition("/")[0]
+                while parent and parent not in self._tracked_dirs:
+                    self._tracked_dirs.add(parent)
+                    parent = parent.rpartition("/")[0]
+        self.empty = not rules and self.tracked is None
+        # 扫描子目录时，传入的相对路径前面加上子目录相对根目录的路径
+        self.prefix = ""
+        if any(negate for negate, _, _ in rules):
+            # 有取反规则时按顺序匹配，最后一条匹配的规则生效
+            self._rules = [(negate, re.compile(f), re.compile(d)) for negate, f, d in rules]
+            self._file_re = self._dir_re = None
+        else:
+            # 没有取反规则时合并成一个正则，一次匹配
+            self._rules = None
+            self._file_re = re.compile("|".join(f"(?:{f})" for _, f, _ in rules)) if rules else None
+            self._dir_re = re.compile("|".join(f"(?:{d})" for _, _, d in rules)) if rules else None
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], extra: Iterable[str] = (),
+                  tracked: Iterable[str] = None) -> "IgnoreMatcher":
+        """从 .gitignore 语法的文件加载规则，文件不存在时只使用 extra"""
+        patterns = list(extra)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                patterns.extend(f.read().splitlines())
+        except FileNotFoundError:
+            pass
+        return cls(patterns, tracked)
+
+    def relative_to(self, prefix: str) -> "IgnoreMatcher":
+        """
+        用于扫描子目录 prefix 的匹配器（共享编译结果）
+
+        规则仍相对原来的根目录匹配，扫描子目录时传入的相对路径不需要再拼接前缀
+        """
+        matcher = copy.copy(self)
+        matcher.prefix = f"{self.prefix}/{prefix}" if self.prefix else prefix.strip("/")
+        return matcher
+
+    def match(self, rel_path: str, is_dir: bool = False) -> bool:
+        """路径（或它所在的目录）是否被忽略"""
+        if self.empty:
+            return False
+        if self.prefix:
+            rel_path = f"{self.prefix}/{rel_path}"
+        if self.tracked is not None:
+            if rel_path not in (self._tracked_dirs if is_dir else self.tracked):
+                return True
+        if self._rules is None:
+            if self._file_re is None:
+                return False
+            regex = self._dir_re if is_dir else self._file_re
+            return regex.match(rel_path) is not None
+        ignored = False
+        for negate, file_re, dir_re in self._rules:
+            if (dir_re if is_dir else file_re).match(rel_path):
+                ignored = not negate
+        return ignored
+
+
+def tracked_files(repo_path: Union[str, Path], timeout: Optional[float] = None) -> List[str]:
+    """git 跟踪的所有文件（相对 repo_path 的路径），repo_path 可以是仓库中的子目录"""
+    output = git(repo_path, "ls-files", "-z", "--cached", timeout=timeout)
+    return [path for path in output.split("\0") if path]
+
+
+# 已经警告过的跳过路径
+_warned: Set[str] = set()
+
+
+def warn_skipped(root: Union[str, Path]) -> Callable[[str, str], None]:
+    """scan_tree 的 skipped 回调：跳过的路径输出警告，每个路径只警告一次（监听模式会反复扫描）"""
+    def warn(rel_path: str, reason: str):
+        path = os.path.join(root, rel_path)
+        if path not in _warned:
+            _warned.add(path)
+            print(f"⚠️  跳过 {path}: {reason}")
+    return warn
+
+
+def scan_tree(root: Union[str, Path], matcher: IgnoreMatcher = None,
+              include: Callable[[str], bool] = None,
+              dirs: bool = False, symlinks: str = "skip",
+              skipped: Callable[[str, str], None] = None) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    剪枝遍历目录树，逐个产出 (相对路径, DirEntry)
+
+    被 matcher 忽略的目录不会进入；include 按文件名过滤。
+    dirs 为 True 时未被忽略的目录也会产出（先于其中的文件）。
+    symlinks 决定符号链接的处理方式：
+    - skip（默认）：跳过符号链接，DirEntry 自带的 stat 缓存可直接使用
+    - follow：同 shutil.copytree 跟随符号链接，按链接指向的文件或目录产出和遍历
+    - yield：不跟随，符号链接本身按文件产出
+    skipped 不为空时，未产出的符号链接（skip 模式除外）和特殊文件以 (相对路径, 原因) 回调
+    """
+    if symlinks not in ("skip", "follow", "yield"):
+        raise ValueError(f"未知的符号链接处理方式: {symlinks}")
+    matcher = matcher or IgnoreMatcher()
+    follow = symlinks == "follow"
+    # 跟随符号链接时记录每个目录的祖先 (设备, inode)，指向祖先的链接会造成无限遍历
+    ancestors: Tuple[Tuple[int, int], ...] = ()
+    if follow:
+        with contextlib.suppress(OSError):
+            root_stat = os.stat(root)
+            ancestors = ((root_stat.st_dev, root_stat.st_ino),)
+    stack: List[Tuple[str, str, Tuple[Tuple[int, int], ...]]] = [(os.fspath(root), "", ancestors)]
+    while stack:
+        dir_path, rel_dir, ancestors = stack.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            is_link = entry.is_symlink()
+            if is_link and symlinks == "skip":
+                continue
+            if is_link and symlinks == "yield":
+                if (include is None or include(entry.name)) and not matcher.match(rel_path):
+                    yield rel_path, entry
+                continue
+            if entry.is_dir(follow_symlinks=follow):
+                if not matcher.match(rel_path, is_dir=True):
+                    node = ()
+                    if follow:
+                        entry_stat = entry.stat()
+                        node = ((entry_stat.st_dev, entry_stat.st_ino),)
+                        if node[0] in ancestors:
+                            if skipped is not None:
+                                skipped(rel_path, "循环的符号链接")
+                            continue
+                    subdirs.append((entry.path, rel_path, ancestors + node))
+                    if dirs:
+                        yield rel_path, entry
+            elif entry.is_file(follow_symlinks=follow):
+                if (include is None or include(entry.name)) and not matcher.match(rel_path):
+                    yield rel_path, entry
+            elif skipped is not None and not matcher.match(rel_path):
+                skipped(rel_path, "指向不存在的路径" if is_link else "不是普通文件或目录")
+        stack.extend(reversed(subdirs))
@@ -0,0 +1,233 @@
+"""
+目录树的 Merkle 哈希索引
+
+每个文件节点保存 (大小, mtime_ns, 内容哈希)，每个目录节点保存子节点名称、类型和哈希组合后的哈希，
+两个目录树的根哈希相同即内容完全一致。
+
+- 刷新索引只需要一次 stat 遍历：大小和 mtime 都没有变化的文件直接沿用上次的内容哈希，
+  只有变化的文件才重新读取内容
+- 比较两个索引时自顶向下遍历，哈希相同的子树直接跳过，不再进入
+- 与 git 的索引一样，mtime 不早于上次索引时间的文件可能在同一个时间粒度内又被修改过，
+  这类文件不沿用缓存，总是重新计算哈希
+- 符号链接的处理与 tree_sync.snapshot 一致：源项目跟随符号链接（指向祖先目录的链接、
+  指向不存在的路径和特殊文件跳过并输出警告）；目标项目不跟随，符号链接按链接本身记录为文件节点，
+  哈希由链接内容计算，与任何文件内容都不相同，同步时被源的文件或目录替换
+
+索引按项目保存在项目根目录的 INDEX_FILE 中，键为同步路径。
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from sync_common.git_objects import blob_id
+from sync_common.ignore import IgnoreMatcher, warn_skipped
+
+
+INDEX_FILE = ".sync-index.json"
+INDEX_VERSION = 1
+
+# 节点: 文件 {"hash", "size", "mtime_ns"}（不跟随的符号链接另有 "link": True）；
+# 目录 {"hash", "children": {名称: 节点}, "files", "bytes"}
+Node = Dict
+
+
+def is_dir_node(node: Node) -> bool:
+    return "children" in node
+
+
+def _dir_node(children: Dict[str, Node]) -> Node:
+    """根据子节点生成目录节点"""
+    digest = hashlib.sha1()
+    files = size = 0
+    for name in sorted(children):
+        child = children[name]
+        if is_dir_node(child):
+            digest.update(f"d {child['hash']} {name}\n".encode())
+            files += child["files"]
+            size += child["bytes"]
+        else:
+            digest.update(f"f {child['hash']} {name}\n".encode())
+            files += 1
+            size += child["size"]
+    return {"hash": digest.hexdigest(), "children": children, "files": files, "bytes": size}
+
+
+class MerkleIndex:
+    """一个项目的 Merkle 索引（同步路径 -> 根节点），同一个实例不要在多个线程中同时刷新"""
+
+    def __init__(self, project_root: Union[str, Path]):
+        self.project_root = Path(project_root)
+        self.index_file = self.project_root / INDEX_FILE
+        # 上一次保存时的索引时间，mtime 不早于该时间的文件不沿用缓存
+        self.indexed_ns = 0
+        self.paths: Dict[str, Optional[Node]] = self.load()
+        self.refreshed_ns = time.time_ns()
+        self.stats = {"stat": 0, "hashed": 0}
+
+    def load(self) -> Dict[str, Optional[Node]]:
+        """加载索引文件，不存在、损坏或版本不一致时返回空索引"""
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return {}
+        self.indexed_ns = data.get("indexed_ns", 0)
+        return data.get("paths", {})
+
+    def save(self):
+        """原子写入索引文件"""
+        tmp_file = self.index_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "indexed_ns": self.refreshed_ns, "paths": self.paths},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_file, self.index_file)
+
+    def refresh(self, sync_path: str, matcher: IgnoreMatcher = None, hint: Node = None,
+                follow_symlinks: bool = False) -> Optional[Node]:
+        """
+        刷新一个同步路径的索引并返回根节点，路径不存在时返回 None
+
+        hint 为刚同步过来的源节点：目标文件的大小和 mtime 与源一致时（复制会保留 mtime）
+        直接沿用源的内容哈希，不需要重新读取刚写入的文件。
+        follow_symlinks 同 tree_sync.snapshot：扫描源项目时为 True，扫描目标项目时为 False
+        """
+        path = self.project_root / sync_path
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            node = None
+        else:
+            cached = self.paths.get(sync_path)
+            if os.path.isdir(path):
+                skipped = warn_skipped(path) if follow_symlinks else None
+                ancestors = ((stat.st_dev, stat.st_ino),) if follow_symlinks else ()
+                node = self._build_dir(str(path), "", cached, hint, matcher, follow_symlinks, ancestors, skipped)
+            else:
+                node = self._build_file(str(path), stat, cached, hint)
+        self.paths[sync_path] = node
+        return node
+
+    def _build_file(self, path: str, stat: os.stat_result, cached: Optional[Node], hint: Optional[Node]) -> Node:
+        self.stats["stat"] += 1
+        key = (stat.st_size, stat.st_mtime_ns)
+        if (cached and not is_dir_node(cached) and not cached.get("link")
+                and (cached["size"], cached["mtime_ns"]) == key and stat.st_mtime_ns < self.indexed_ns):
+            return cached
+        if hint and not is_dir_node(hint) and not hint.get("link") and (hint["size"], hint["mtime_ns"]) == key:
+            return dict(hint)
+        self.stats["hashed"] += 1
+        return {"hash": blob_id(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _build_link(self, path: str, stat: os.stat_result) -> Node:
+        """不跟随的符号链接：按链接内容计算哈希（readlink 不读取文件内容，不需要缓存）"""
+        self.stats["stat"] += 1
+        digest = hashlib.sha1(b"link " + os.fsencode(os.readlink(path)))
+        return {"hash": digest.hexdigest(), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "link": True}
+
+    def _build_dir(self, path: str, rel_dir: str, cached: Optional[Node], hint: Optional[Node],
+                   matcher: Optional[IgnoreMatcher], follow_symlinks: bool = False,
+                   ancestors: Tuple[Tuple[int, int], ...] = (),
+                   skipped: Callable[[str, str], None] = None) -> Node:
+        """
+        目录节点，遍历规则同 scan_tree：follow_symlinks 时对应 symlinks="follow"（ancestors 为祖先目录的
+        (设备, inode)，用于跳过循环的链接），否则对应 symlinks="yield"
+        """
+        cached_children = cached["children"] if cached and is_dir_node(cached) else {}
+        hint_children = hint["children"] if hint and is_dir_node(hint) else {}
+        children = {}
+        try:
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            entries = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            is_link = entry.is_symlink()
+            if is_link and not follow_symlinks:
+                if matcher is None or not matcher.match(rel_path):
+                    children[entry.name] = self._build_link(entry.path, entry.stat(follow_symlinks=False))
+            elif entry.is_dir(follow_symlinks=follow_symlinks):
+                if matcher is None or not matcher.match(rel_path, is_dir=True):
+                    node = ()
+                    if follow_symlinks:
+                        entry_stat = entry.stat()
+                        node = ((entry_stat.st_dev, entry_stat.st_ino),)
+                        if node[0] in ancestors:
+                            if skipped is not None:
+                                skipped(rel_path, "循环的符号链接")
+                            continue
+                    children[entry.name] = self._build_dir(
+                        entry.path, rel_path, cached_children.get(entry.name), hint_children.get(entry.name),
+                        matcher, follow_symlinks, ancestors + node, skipped
+                    )
+            elif entry.is_file(follow_symlinks=follow_symlinks):
+                if matcher is None or not matcher.match(rel_path):
+                    children[entry.name] = self._build_file(
+                        entry.path, entry.stat(follow_symlinks=follow_symlinks),
+                        cached_children.get(entry.name), hint_children.get(entry.name)
+                    )
+            elif skipped is not None and (matcher is None or not matcher.match(rel_path)):
+                skipped(rel_path, "指向不存在的路径" if is_link else "不是普通文件或目录")
+        return _dir_node(children)
+
+
+def _add_subtree(node: Node, rel_path: str, delta: Dict):
+    """源中新增的子树：目录加入 mkdir，文件加入 create"""
+    if not is_dir_node(node):
+        delta["create"].append(rel_path)
+        delta["bytes"] += node["size"]
+        return
+    delta["mkdir"].append(rel_path)
+    for name, child in sorted(node["children"].items()):
+        _add_subtree(child, f"{rel_path}/{name}", delta)
+
+
+def diff_nodes(source: Node, target: Optional[Node]) -> Dict:
+    """
+    自顶向下比较两个目录节点，哈希相同的子树直接跳过
+
+    返回值格式与 tree_sync.diff_trees 相同（没有 touch：内容相同的文件即使 mtime 不同也视为未变化），
+    可直接交给 tree_sync.apply_delta 执行
+    """
+    delta = {"create": [], "update": [], "delete": [], "touch": [],
+             "mkdir": [], "rmdir": [], "unchanged": 0, "bytes": 0}
+    if target is None or not is_dir_node(target):
+        for name, child in sorted(source["children"].items()):
+            _add_subtree(child, name, delta)
+        return delta
+
+    stack = [("", source, target)]
+    while stack:
+        rel_dir, source_dir, target_dir = stack.pop()
+        if source_dir["hash"] == target_dir["hash"]:
+            delta["unchanged"] += source_dir["files"]
+            continue
+        source_children, target_children = source_dir["children"], target_dir["children"]
+        for name in sorted(source_children):
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            child, current = source_children[name], target_children.get(name)
+            if current is None:
+                _add_subtree(child, rel_path, delta)
+            elif is_dir_node(child) != is_dir_node(current):
+                # 文件变成目录或目录变成文件：删除目标后重建
+                delta["delete"].append(rel_path)
+                _add_subtree(child, rel_path, delta)
+            elif is_dir_node(child):
+                stack.append((rel_path, child, current))
+            elif child["hash"] == current["hash"]:
+                delta["unchanged"] += 1
+            else:
+                delta["update"].append(rel_path)
+                delta["bytes"] += child["size"]
+        for name in sorted(target_children):
+            if name in source_children:
+                continue
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            delta["rmdir" if is_dir_node(target_children[name]) else "delete"].append(rel_path)
+    return delta
@@ -0,0 +1,105 @@
+"""
+语言仓库的共享 bare 镜像
+
+每个远程地址只在镜像目录中保存一份 bare 仓库，一次运行中只 fetch 一次；
+工具读取的工作区是这个镜像的 git worktree（detached HEAD + sparse-checkout），
+对象库只有一份。多个项目指向同一个远程时，网络往返和对象存储都按远程数量计算，而不是按项目数量。
+
+镜像只跟踪 refs/heads/*，fetch 后把 refs/remotes/origin/<branch> 指向同一个提交，
+对象库模式读取 origin/<branch> 的代码不需要区分镜像和普通克隆。
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Union
+
+from sync_common.clone_cache import head_commit, sparse_patterns
+from sync_common.git_objects import git
+
+
+def mirror_name(remote: str) -> str:
+    """远程地址对应的镜像目录名：仓库名 + 地址哈希，不同地址的同名仓库不会冲突"""
+    base = re.sub(r"\.git$", "", remote.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]) or "repo"
+    base = re.sub(r"[^A-Za-z0-9._-]", "_", base)
+    return f"{base}-{hashlib.sha1(remote.encode()).hexdigest()[:10]}.git"
+
+
+class MirrorCache:
+    """镜像目录（线程安全）：同一个远程只 fetch 一次，worktree 操作按镜像串行执行"""
+
+    def __init__(self, mirror_dir: Union[str, Path], timeout: Optional[float] = None):
+        self.mirror_dir = Path(os.path.expanduser(str(mirror_dir)))
+        self.timeout = timeout
+        self.fetched: Set[str] = set()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def start_run(self):
+        """开始新的一次运行（常驻进程的每个请求），之后每个镜像会重新 fetch 一次"""
+        with self._guard:
+            self.fetched.clear()
+
+    def worktree_path(self, name: str) -> Path:
+        """项目的工作区路径"""
+        return self.mirror_dir / "worktrees" / name
+
+    def _lock(self, remote: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(remote, threading.Lock())
+
+    def _update(self, remote: str, branch: str) -> Path:
+        """创建或 fetch 镜像（调用方持有该远程的锁），本次运行已 fetch 过时直接返回"""
+        mirror = self.mirror_dir / mirror_name(remote)
+        if remote in self.fetched:
+            return mirror
+
+        if not (mirror / "HEAD").exists():
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            git(mirror.parent, "clone", "--bare", "--quiet", remote, mirror.name, timeout=self.timeout)
+            # 只跟踪分支，--prune 不会删除下面维护的 refs/remotes/origin/*
+            git(mirror, "config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*", timeout=self.timeout)
+        else:
+            git(mirror, "fetch", "--prune", "--quiet", "origin", timeout=self.timeout)
+        git(mirror, "update-ref", f"refs/remotes/origin/{branch}", f"refs/heads/{branch}", timeout=self.timeout)
+        self.fetched.add(remote)
+        return mirror
+
+    def update(self, remote: str, branch: str) -> Path:
+        """确保镜像存在且本次运行已 fetch，返回镜像路径"""
+        with self._lock(remote):
+            return self._update(remote, branch)
+
+    def ensure_worktree(self, remote: str, worktree: Union[str, Path], branch: str,
+                        extensions: Iterable[str] = None) -> Dict[str, Optional[str]]:
+        """
+        创建或更新镜像的一个 worktree，检出 <branch> 的最新提交（detached HEAD）
+
+        extensions 不为空时工作区只检出匹配的文件。返回更新前后的 HEAD 提交，
+        首次创建时 before 为 None；失败时抛出 CalledProcessError / TimeoutExpired
+        """
+        worktree = Path(worktree)
+        with self._lock(remote):
+            mirror = self._update(remote, branch)
+            ref = f"refs/heads/{branch}"
+
+            git_file = worktree / ".git"
+            if git_file.is_dir() or (worktree.exists() and not git_file.exists()):
+                # 以前的独立克隆或残留目录，工作区归工具所有，直接重建
+                shutil.rmtree(worktree)
+            if not git_file.exists():
+                worktree.parent.mkdir(parents=True, exist_ok=True)
+                git(mirror, "worktree", "prune", timeout=self.timeout)
+                git(mirror, "worktree", "add", "--detach", "--no-checkout", str(worktree), ref, timeout=self.timeout)
+                before = None
+            else:
+                before = head_commit(worktree)
+
+            if extensions:
+                git(worktree, "sparse-checkout", "set", "--no-cone", *sparse_patterns(extensions),
+                    timeout=self.timeout)
+            git(worktree, "checkout", "--quiet", "--force", "--detach", ref, timeout=self.timeout)
+            return {"before": before, "after": head_commit(worktree)}
@@ -0,0 +1,168 @@
+"""
+同步计划（--plan / --apply）
+
+计划由一次 stat 遍历生成，逐项列出每个 (源目录, 目标目录) 将要执行的操作：
+新增 / 更新 / 删除的相对路径、未变化的文件数和需要复制的字节数，
+并根据以往运行记录的复制吞吐量估算耗时。计划以 JSON 保存，CI 可以直接读取 totals 判断改动规模；
+--apply 按计划中的操作执行，不需要重新扫描。
+
+每一项的 delta 与 tree_sync.diff_trees 的返回值格式相同，可直接交给 tree_sync.apply_delta 执行。
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+from sync_common.copy_engine import format_bytes
+
+
+PLAN_VERSION = 1
+
+# 估算耗时时使用的最近运行记录数
+ESTIMATE_SAMPLES = 50
+
+
+def empty_delta() -> Dict:
+    """没有任何操作的差异"""
+    return {"create": [], "update": [], "delete": [], "touch": [],
+            "mkdir": [], "rmdir": [], "unchanged": 0, "bytes": 0}
+
+
+def delta_counts(delta: Dict) -> Dict[str, int]:
+    """差异的操作计数 {create, update, delete, unchanged}，删除的目录按一项计"""
+    return {
+        "create": len(delta["create"]),
+        "update": len(delta["update"]),
+        "delete": len(delta["delete"]) + len(delta["rmdir"]),
+        "unchanged": delta["unchanged"] + len(delta["touch"]),
+    }
+
+
+def plan_item(source_root: Union[str, Path], target_root: Union[str, Path], delta: Dict, **labels) -> Dict:
+    """
+    计划中的一项
+
+    labels 为工具自定义的标识（如目标项目、同步路径），原样保存在计划中
+    """
+    return {
+        **labels,
+        "source": str(source_root),
+        "target": str(target_root),
+        "counts": delta_counts(delta),
+        "bytes": delta["bytes"],
+        "delta": delta,
+    }
+
+
+def load_samples(log_file: Optional[Union[str, Path]], phase: str = "copy",
+                 limit: int = ESTIMATE_SAMPLES) -> List[Dict]:
+    """从 JSONL 运行日志读取最近 limit 条有效的 phase 阶段记录（需要 files / bytes / seconds）"""
+    if not log_file:
+        return []
+    samples = []
+    try:
+        with open(os.path.expanduser(str(log_file)), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if (isinstance(record, dict) and record.get("phase") == phase
+                        and record.get("files", 0) > 0 and record.get("seconds", 0) > 0):
+                    samples.append(record)
+    except FileNotFoundError:
+        return []
+    return samples[-limit:]
+
+
+def append_sample(log_file: Optional[Union[str, Path]], files: int, size: int, seconds: float,
+                  phase: str = "copy"):
+    """向 JSONL 运行日志追加一条吞吐量记录，没有复制任何文件时不记录"""
+    if not log_file or files <= 0 or seconds <= 0:
+        return
+    path = Path(os.path.expanduser(str(log_file)))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "phase": phase,
+            "seconds": round(seconds, 6),
+            "files": files,
+            "bytes": size,
+        }, ensure_ascii=False) + "\n")
+
+
+def estimate(samples: List[Dict], files: int, size: int) -> Optional[Dict]:
+    """
+    根据以往的吞吐量估算复制 files 个文件、size 字节的耗时
+
+    分别按字节吞吐量和文件吞吐量估算，取较大值（小文件受每个文件的开销限制，大文件受带宽限制）；
+    没有历史记录时返回 None
+    """
+    total_files = sum(sample["files"] for sample in samples)
+    total_bytes = sum(sample.get("bytes", 0) for sample in samples)
+    total_seconds = sum(sample["seconds"] for sample in samples)
+    if not samples or total_seconds <= 0:
+        return None
+    candidates = [files * total_seconds / total_files]
+    if total_bytes > 0:
+        candidates.append(size * total_seconds / total_bytes)
+    return {
+        "seconds": round(max(candidates), 3),
+        "files_per_second": round(total_files / total_seconds, 1),
+        "bytes_per_second": round(total_bytes / total_seconds),
+        "samples": len(samples),
+    }
+
+
+def build_plan(tool: str, items: List[Dict], samples: List[Dict], **meta) -> Dict:
+    """汇总计划：totals 为所有项目的合计，estimate 为估算耗时（没有历史记录时为 None）"""
+    totals = {"create": 0, "update": 0, "delete": 0, "unchanged": 0, "bytes": 0}
+    for item in items:
+        for key in ("create", "update", "delete", "unchanged"):
+            totals[key] += item["counts"][key]
+        totals["bytes"] += item["bytes"]
+    return {
+        "version": PLAN_VERSION,
+        "tool": tool,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        **meta,
+        "totals": totals,
+        "estimate": estimate(samples, totals["create"] + totals["update"], totals["bytes"]),
+        "items": items,
+    }
+
+
+def write_plan(plan: Dict, output: str):
+    """写入计划文件，output 为 - 时输出到标准输出"""
+    data = json.dumps(plan, ensure_ascii=False, indent=2)
+    if output == "-":
+        sys.stdout.write(data + "\n")
+        return
+    tmp_file = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(data + "\n")
+    os.replace(tmp_file, output)
+
+
+def load_plan(path: Union[str, Path], tool: str) -> Dict:
+    """加载计划文件，格式版本或生成计划的工具不一致时抛出 ValueError"""
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict) or plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"不支持的计划格式: {path}")
+    if plan.get("tool") != tool:
+        raise ValueError(f"计划由 {plan.get('tool')} 生成，不能由 {tool} 执行")
+    return plan
+
+
+def format_estimate(plan: Dict) -> str:
+    """估算耗时的说明"""
+    result = plan.get("estimate")
+    if result is None:
+        return "没有历史吞吐量记录，无法估算"
+    return (f"约 {result['seconds']:.1f}s (以往 {result['samples']} 次运行: "
+            f"{result['files_per_second']:.0f} 个文件/s, {format_bytes(result['bytes_per_second'])}/s)")
@@ -0,0 +1,145 @@
+"""
+复制进度与吞吐量
+
+比较完成后（预扫描）就知道需要复制的文件数和字节数，ProgressReporter 据此在复制过程中
+实时输出 已完成/总数、文件/s、MB/s 和剩余时间；结束后返回 {files, bytes, seconds, scan_seconds} 供汇总使用。
+吞吐量从第一次累加总数（比较完成、开始复制）时算起，不包含扫描时间。
+
+- 输出到终端时用 \\r 原地刷新一行（最多每 REFRESH_INTERVAL 秒一次），结束时清除这一行
+- 输出不是终端（CI 日志）时每 LOG_INTERVAL 秒输出一行，复制很快结束时不输出
+- 线程安全，多个工作线程可以共用一个 ProgressReporter（总数可以分多次累加）；
+  也可以每个工作单元一个不输出的 ProgressReporter，通过 parent 把进度汇总到共用的那个
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional, TextIO, Union
+
+from sync_common.copy_engine import format_bytes
+
+
+# 终端中刷新进度行的最小间隔（秒）
+REFRESH_INTERVAL = 0.2
+
+# 非终端输出时每隔多少秒输出一行进度
+LOG_INTERVAL = 5.0
+
+
+def format_duration(seconds: float) -> str:
+    """格式化剩余时间"""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+class ProgressReporter:
+    """一组复制操作的进度（一个同步路径，或并发同步时的所有目标）"""
+
+    def __init__(self, label: str, live: bool = True, stream: TextIO = None,
+                 parent: "ProgressReporter" = None):
+        self.label = label
+        self.parent = parent
+        self.stream = stream or sys.stdout
+        self.live = live
+        self.tty = live and self.stream.isatty()
+        self.total_files = 0
+        self.total_bytes = 0
+        self.files = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        # 第一次累加总数的时间，即开始复制的时间
+        self.copy_start: Optional[float] = None
+        self._printed = 0.0
+        self._shown = False
+        self._lock = threading.Lock()
+
+    def add_total(self, files: int, size: int):
+        """累加需要复制的文件数和字节数（比较完成后调用）"""
+        with self._lock:
+            if self.copy_start is None:
+                self.copy_start = time.perf_counter()
+            self.total_files += files
+            self.total_bytes += size
+        if self.parent is not None:
+            self.parent.add_total(files, size)
+
+    def advance(self, size: int):
+        """复制完成一个文件"""
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            now = time.perf_counter()
+            interval = REFRESH_INTERVAL if self.tty else LOG_INTERVAL
+            if self.live and now - self._printed >= interval and now - self.start >= interval:
+                self._printed = now
+                self._show(now)
+        if self.parent is not None:
+            self.parent.advance(size)
+
+    def eta(self, elapsed: float) -> Optional[float]:
+        """
+        剩余时间：分别按文件吞吐量和字节吞吐量估算，取较大值；还没有完成任何文件时返回 None
+        """
+        if not self.files or elapsed <= 0:
+            return None
+        candidates = [(self.total_files - self.files) * elapsed / self.files]
+        if self.bytes:
+            candidates.append((self.total_bytes - self.bytes) * elapsed / self.bytes)
+        return max(0.0, *candidates)
+
+    def line(self, now: float = None) -> str:
+        """当前进度的一行说明"""
+        elapsed = (now or time.perf_counter()) - (self.copy_start or self.start)
+        rate = self.files / elapsed if elapsed > 0 else 0.0
+        speed = self.bytes / elapsed if elapsed > 0 else 0.0
+        eta = self.eta(elapsed)
+        return (f"⏳ {self.label}: {self.files}/{self.total_files} 个文件, "
+                f"{format_bytes(self.bytes)}/{format_bytes(self.total_bytes)}, "
+                f"{rate:.0f} 个文件/s, {format_bytes(speed)}/s, "
+                f"剩余 {format_duration(eta) if eta is not None else '--'}")
+
+    def _show(self, now: float):
+        if self.tty:
+            self.stream.write(f"\r{self.line(now)}\033[K")
+            self._shown = True
+        else:
+            self.stream.write(f"   {self.line(now)}\n")
+        self.stream.flush()
+
+    def finish(self) -> Dict[str, float]:
+        """
+        结束进度输出（清除终端中的进度行）
+
+        返回 {files, bytes, seconds, scan_seconds}：seconds 为创建以来的总耗时，scan_seconds 为其中比较所用的时间
+        """
+        with self._lock:
+            if self._shown:
+                self.stream.write("\r\033[K")
+                self.stream.flush()
+                self._shown = False
+            now = time.perf_counter()
+            return {
+                "files": self.files,
+                "bytes": self.bytes,
+                "seconds": now - self.start,
+                "scan_seconds": (self.copy_start or now) - self.start,
+            }
+
+
+def append_summary(log_file: Union[str, Path], summary: Dict):
+    """把一次运行的 JSON 汇总追加到 JSONL 文件（每次运行一行），用于跟踪同步耗时的变化"""
+    line = json.dumps({"finished_at": datetime.now().isoformat(timespec="seconds"), **summary},
+                      ensure_ascii=False)
+    path = Path(os.path.expanduser(str(log_file)))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
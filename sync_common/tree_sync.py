@@ -0,0 +1,392 @@
+"""
+目录树增量同步（rsync 风格）
+
+先分别扫描源目录和目标目录，按 (大小, mtime) 比较得到差异，再只执行差异：
+- 源中新增的文件复制到目标，内容变化的文件覆盖
+- 源中已经不存在的文件从目标删除，删除后变空且源中不存在的目录一并删除
+- 未变化的文件不做任何操作，inode 和 mtime 保持不变
+
+复制使用 CopyEngine（临时文件 + rename，保留 mtime），同步后目标文件的 mtime 与源一致，
+下一次比较时未修改的文件直接按 (大小, mtime) 判定为未变化。
+checksum 模式下大小相同、mtime 不同的文件再比较内容哈希，内容相同时只修正 mtime。
+
+暂存模式 (stage_delta)：不在目标目录中原地修改，而是先在同一文件系统的兄弟临时目录中
+用硬链接复刻目标目录，在临时目录中执行差异，再通过 rename 整体替换目标目录。
+监听目标目录的开发服务器每个同步路径只看到一次变化，进程中途退出也不会留下写了一半的目录。
+"""
+
+import os
+import sys
+import errno
+import shutil
+from pathlib import Path
+from stat import S_ISDIR, S_ISLNK, S_ISREG
+from typing import Dict, Iterable, Tuple, Union
+
+from sync_common.copy_engine import CopyEngine
+from sync_common.git_objects import blob_id
+from sync_common.ignore import IgnoreMatcher, scan_tree, warn_skipped
+from sync_common.progress import ProgressReporter
+
+
+# 快照: {相对路径: (大小, mtime_ns)}，目录的值为 None
+Snapshot = Dict[str, Union[Tuple[int, int], None]]
+
+# 暂存目录和被替换下来的旧目录的名称前缀（与目标目录同级）
+STAGING_PREFIX = "sync-staging"
+OLD_PREFIX = "sync-old"
+
+# linux/fs.h
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+def snapshot(root: Union[str, Path], matcher: IgnoreMatcher = None, follow_symlinks: bool = False) -> Snapshot:
+    """
+    扫描目录树，返回所有文件的 (大小, mtime_ns) 和所有目录
+
+    follow_symlinks 为 True 时（扫描源目录）同 shutil.copytree 跟随符号链接，记录链接指向的文件和目录，
+    指向不存在的路径、循环的链接和特殊文件跳过并输出警告；
+    为 False 时（扫描目标目录）符号链接本身按文件记录，与源不一致时被替换或删除，不会通过链接写入其他位置
+    """
+    entries: Snapshot = {}
+    symlinks = "follow" if follow_symlinks else "yield"
+    skipped = warn_skipped(root) if follow_symlinks else None
+    for rel_path, entry in scan_tree(root, matcher, dirs=True, symlinks=symlinks, skipped=skipped):
+        if entry.is_dir(follow_symlinks=follow_symlinks):
+            entries[rel_path] = None
+        else:
+            stat = entry.stat(follow_symlinks=follow_symlinks)
+            entries[rel_path] = (stat.st_size, stat.st_mtime_ns)
+    return entries
+
+
+def snapshot_paths(root: Union[str, Path], rel_paths: Iterable[str], matcher: IgnoreMatcher = None,
+                   follow_symlinks: bool = False) -> Snapshot:
+    """
+    只扫描目录树中的指定路径（监听模式下一批改动涉及的路径），返回格式同 snapshot
+
+    目录路径包含其中的所有内容，已在某个目录路径中的路径不再单独扫描；
+    不存在或被忽略的路径不出现在结果中。结果按路径排序，目录先于其中的内容。
+    follow_symlinks 同 snapshot
+    """
+    root = Path(root)
+    matcher = matcher or IgnoreMatcher()
+    requested = set(rel_paths)
+    entries: Snapshot = {}
+    for rel_path in sorted(requested):
+        parent = rel_path.rpartition("/")[0]
+        while parent and parent not in requested:
+            parent = parent.rpartition("/")[0]
+        if parent:
+            continue
+        path = root / rel_path
+        try:
+            stat = path.stat() if follow_symlinks else path.lstat()
+        except (FileNotFoundError, NotADirectoryError):
+            if follow_symlinks and path.is_symlink() and not matcher.match(rel_path):
+                warn_skipped(root)(rel_path, "指向不存在的路径")
+            continue
+        if S_ISDIR(stat.st_mode):
+            if matcher.match(rel_path, is_dir=True):
+                continue
+            entries[rel_path] = None
+            sub_entries = snapshot(path, matcher.relative_to(rel_path), follow_symlinks)
+            for sub_path, state in sub_entries.items():
+                entries[f"{rel_path}/{sub_path}"] = state
+        elif (S_ISREG(stat.st_mode) or S_ISLNK(stat.st_mode)) and not matcher.match(rel_path):
+            entries[rel_path] = (stat.st_size, stat.st_mtime_ns)
+    return dict(sorted(entries.items()))
+
+
+def _source_hash(source_root: Union[str, Path], rel_path: str, hashes: Dict[str, str] = None) -> str:
+    """源文件的内容哈希，优先读取缓存"""
+    if hashes is None:
+        return blob_id(Path(source_root, rel_path))
+    if rel_path not in hashes:
+        hashes[rel_path] = blob_id(Path(source_root, rel_path))
+    return hashes[rel_path]
+
+
+def diff_trees(source_root: Union[str, Path], target_root: Union[str, Path],
+               source: Snapshot, target: Snapshot, checksum: bool = False,
+               hashes: Dict[str, str] = None) -> Dict:
+    """
+    比较两个快照
+
+    hashes 缓存源文件的内容哈希，同一个源同步到多个目标时共享，每个源文件最多计算一次
+
+    返回 {"create", "update", "delete", "touch", "mkdir", "rmdir": [相对路径],
+          "unchanged": 文件数, "bytes": 需要复制的字节数}
+    touch 为 checksum 模式下内容相同、只有 mtime 不同的文件；
+    文件和目录类型不一致的路径同时出现在 delete 和 create / mkdir 中（先删除再按源重建）
+    """
+    delta = {"create": [], "update": [], "delete": [], "touch": [],
+             "mkdir": [], "rmdir": [], "unchanged": 0, "bytes": 0}
+
+    for rel_path, state in source.items():
+        if rel_path not in target:
+            if state is None:
+                delta["mkdir"].append(rel_path)
+            else:
+                delta["create"].append(rel_path)
+                delta["bytes"] += state[0]
+            continue
+
+        current = target[rel_path]
+        if state is None or current is None:
+            if (state is None) == (current is None):
+                continue
+            # 文件变成目录或目录变成文件：删除目标后重建
+            delta["delete"].append(rel_path)
+            if state is None:
+                delta["mkdir"].append(rel_path)
+            else:
+                delta["create"].append(rel_path)
+                delta["bytes"] += state[0]
+        elif state == current:
+            delta["unchanged"] += 1
+        elif (checksum and state[0] == current[0] and not os.path.islink(Path(target_root, rel_path))
+              and _source_hash(source_root, rel_path, hashes) == blob_id(Path(target_root, rel_path))):
+            delta["touch"].append(rel_path)
+        else:
+            delta["update"].append(rel_path)
+            delta["bytes"] += state[0]
+
+    # 整体删除的目录（快照中目录先于其中的内容出现），其中的内容不需要单独列出
+    removed = set()
+    for rel_path, current in target.items():
+        if rel_path.rpartition("/")[0] in removed:
+            if current is None:
+                removed.add(rel_path)
+            continue
+        if rel_path in source:
+            if current is None and source[rel_path] is not None:
+                removed.add(rel_path)
+            continue
+        if current is None:
+            delta["rmdir"].append(rel_path)
+            removed.add(rel_path)
+        else:
+            delta["delete"].append(rel_path)
+    return delta
+
+
+def apply_delta(source_root: Union[str, Path], target_root: Union[str, Path],
+                delta: Dict, copy_engine: CopyEngine, progress: ProgressReporter = None) -> Dict[str, int]:
+    """
+    在目标目录执行差异
+
+    返回 {"created", "updated", "deleted", "unchanged", "bytes"}，deleted 按文件和目录计数；
+    progress 不为空时每复制一个文件更新一次进度（总数由调用方在比较后累加）
+    """
+    source_root, target_root = Path(source_root), Path(target_root)
+    stats = {"created": 0, "updated": 0, "deleted": 0,
+             "unchanged": delta["unchanged"] + len(delta["touch"]), "bytes": 0}
+
+    # 先删除，类型变化的路径（文件 ↔ 目录）需要先腾出位置；
+    # 按保存的计划执行时路径可能已经不存在，视为已删除
+    for rel_path in delta["rmdir"] + delta["delete"]:
+        path = target_root / rel_path
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        elif os.path.lexists(path):
+            path.unlink()
+        stats["deleted"] += 1
+
+    target_root.mkdir(parents=True, exist_ok=True)
+    for rel_path in delta["mkdir"]:
+        (target_root / rel_path).mkdir(parents=True, exist_ok=True)
+
+    for key, counter in (("create", "created"), ("update", "updated")):
+        for rel_path in delta[key]:
+            target_file = target_root / rel_path
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            copy_engine.copy(source_root / rel_path, target_file)
+            size = target_file.stat().st_size
+            stats[counter] += 1
+            stats["bytes"] += size
+            if progress is not None:
+                progress.advance(size)
+
+    for rel_path in delta["touch"]:
+        source_stat = (source_root / rel_path).stat()
+        os.utime(target_root / rel_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    return stats
+
+
+def _sibling(target_root: Path, prefix: str) -> Path:
+    """目标目录同级的临时目录"""
+    return target_root.parent / f".{target_root.name}.{prefix}-{os.getpid()}"
+
+
+def _link_tree(source_root: Path, target_root: Path):
+    """用硬链接复刻目录树（类似 cp -al），包括被忽略的文件和符号链接"""
+    for dir_path, dir_names, file_names in os.walk(source_root):
+        rel_dir = os.path.relpath(dir_path, source_root)
+        target_dir = target_root / rel_dir if rel_dir != "." else target_root
+        target_dir.mkdir(exist_ok=True)
+        for name in dir_names:
+            # os.walk 不进入指向目录的符号链接，这里原样复制链接
+            path = os.path.join(dir_path, name)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), target_dir / name)
+        for name in file_names:
+            path = os.path.join(dir_path, name)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), target_dir / name)
+            else:
+                try:
+                    os.link(path, target_dir / name)
+                except OSError:
+                    shutil.copy2(path, target_dir / name)
+
+
+def _exchange(a: Path, b: Path) -> bool:
+    """原子交换两个路径 (Linux renameat2 RENAME_EXCHANGE)，不支持时返回 False"""
+    if not sys.platform.startswith("linux"):
+        return False
+    import ctypes
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    if renameat2(AT_FDCWD, os.fsencode(a), AT_FDCWD, os.fsencode(b), RENAME_EXCHANGE) == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)):
+        return False
+    raise OSError(err, os.strerror(err), str(b))
+
+
+def swap_into_place(staging_root: Union[str, Path], target_root: Union[str, Path]):
+    """
+    用暂存目录替换目标目录
+
+    Linux 上通过 RENAME_EXCHANGE 原子交换；其他平台先把目标目录 rename 到旁边再 rename 暂存目录，
+    两次 rename 之间进程退出时由 recover_staging 恢复
+    """
+    staging_root, target_root = Path(staging_root), Path(target_root)
+    if not target_root.exists():
+        os.rename(staging_root, target_root)
+    elif _exchange(staging_root, target_root):
+        # 交换后暂存目录中是旧的目标目录
+        shutil.rmtree(staging_root)
+    else:
+        old_root = _sibling(target_root, OLD_PREFIX)
+        os.rename(target_root, old_root)
+        os.rename(staging_root, target_root)
+        shutil.rmtree(old_root)
+
+
+def recover_staging(target_root: Union[str, Path]):
+    """清理上一次中断的暂存目录；目标目录在替换过程中丢失时换回旧目录"""
+    target_root = Path(target_root)
+    if not target_root.parent.is_dir():
+        return
+    for prefix in (STAGING_PREFIX, OLD_PREFIX):
+        for leftover in target_root.parent.glob(f".{target_root.name}.{prefix}-*"):
+            if prefix == OLD_PREFIX and not target_root.exists():
+                os.rename(leftover, target_root)
+            else:
+                shutil.rmtree(leftover, ignore_errors=True)
+
+
+def has_changes(delta: Dict) -> bool:
+    """差异中是否有需要写入目标目录的改动（不含只修正 mtime 的文件）"""
+    return any(delta[key] for key in ("create", "update", "delete", "mkdir", "rmdir"))
+
+
+def stage_delta(source_root: Union[str, Path], target_root: Union[str, Path],
+                delta: Dict, copy_engine: CopyEngine, progress: ProgressReporter = None) -> Dict[str, int]:
+    """
+    暂存模式执行差异：硬链接复刻目标目录 → 在副本中 apply_delta → rename 替换目标目录
+
+    未变化的文件通过硬链接保留原来的 inode 和 mtime；没有改动时不创建暂存目录。
+    统计格式同 apply_delta
+    """
+    source_root, target_root = Path(source_root), Path(target_root)
+    recover_staging(target_root)
+    if not has_changes(delta):
+        return apply_delta(source_root, target_root, delta, copy_engine, progress)
+
+    staging_root = _sibling(target_root, STAGING_PREFIX)
+    target_root.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if target_root.is_dir():
+            _link_tree(target_root, staging_root)
+        stats = apply_delta(source_root, staging_root, delta, copy_engine, progress)
+        swap_into_place(staging_root, target_root)
+    except BaseException:
+        shutil.rmtree(staging_root, ignore_errors=True)
+        raise
+    return stats
+
+
+def sync_tree(source_root: Union[str, Path], target_root: Union[str, Path],
+              copy_engine: CopyEngine, checksum: bool = False,
+              matcher: IgnoreMatcher = None, source: Snapshot = None,
+              hashes: Dict[str, str] = None, staging: bool = False,
+              target_matcher: IgnoreMatcher = None, progress: ProgressReporter = None) -> Dict[str, int]:
+    """
+    增量同步整个目录树，返回 apply_delta 的统计
+
+    source 为预先扫描的源快照（同步到多个目标时只扫描一次），hashes 同 diff_trees，
+    staging 为 True 时通过 stage_delta 整体替换目标目录。
+    target_matcher 为扫描目标目录的规则，默认与 matcher 相同（目标中被忽略的文件保持不变）；
+    progress 在比较完成后累加需要复制的文件数和字节数，复制过程中更新进度
+    """
+    if source is None:
+        source = snapshot(source_root, matcher, follow_symlinks=True)
+    if target_matcher is None:
+        target_matcher = matcher
+    target = snapshot(target_root, target_matcher) if Path(target_root).is_dir() else {}
+    delta = diff_trees(source_root, target_root, source, target, checksum, hashes)
+    if progress is not None:
+        progress.add_total(len(delta["create"]) + len(delta["update"]), delta["bytes"])
+    if staging:
+        return stage_delta(source_root, target_root, delta, copy_engine, progress)
+    return apply_delta(source_root, target_root, delta, copy_engine, progress)
+
+
+def sync_file(source_file: Union[str, Path], target_file: Union[str, Path],
+              copy_engine: CopyEngine, checksum: bool = False,
+              progress: ProgressReporter = None) -> Dict[str, int]:
+    """增量同步单个文件，统计格式同 apply_delta"""
+    source_file, target_file = Path(source_file), Path(target_file)
+    stats = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "bytes": 0}
+    source_stat = source_file.stat()
+
+    if target_file.is_dir() and not target_file.is_symlink():
+        shutil.rmtree(target_file)
+        stats["deleted"] += 1
+    if os.path.lexists(target_file):
+        # 目标是符号链接时按链接本身比较，直接用文件替换链接，不通过链接写入其他位置
+        target_stat = target_file.lstat()
+        if (source_stat.st_size, source_stat.st_mtime_ns) == (target_stat.st_size, target_stat.st_mtime_ns):
+            stats["unchanged"] += 1
+            return stats
+        if (checksum and S_ISREG(target_stat.st_mode) and source_stat.st_size == target_stat.st_size
+                and blob_id(source_file) == blob_id(target_file)):
+            os.utime(target_file, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+            stats["unchanged"] += 1
+            return stats
+        counter = "updated"
+    else:
+        counter = "created"
+
+    if progress is not None:
+        progress.add_total(1, source_stat.st_size)
+    target_file.parent.mkdir(parents=True, exist_ok=True)
+    copy_engine.copy(source_file, target_file)
+    stats[counter] += 1
+    stats["bytes"] += source_stat.st_size
+    if progress is not None:
+        progress.advance(source_stat.st_size)
+    return stats
+
+
+def format_counts(stats: Dict[str, int]) -> str:
+    """格式化同步统计"""
+    return (f"新增 {stats['created']}, 更新 {stats['updated']}, "
+            f"删除 {stats['deleted']}, 未变化 {stats['unchanged']}")
@@ -0,0 +1,284 @@
+"""
+监听目录树的改动（--watch）
+
+- Linux 上使用 inotify（ctypes 调用 libc，不需要第三方依赖）：为每个未被忽略的目录添加监听，
+  新建或移入的目录自动加入监听；事件队列溢出时把整个监听路径报告为改动
+- 其他平台、inotify 不可用或监听数量超过系统限制时退回轮询：每隔 interval 秒做一次剪枝 stat 遍历，
+  与上一次的 (大小, mtime) 索引比较
+- collect() 等到第一个改动后继续收集，直到 debounce 秒内没有新的改动（最多等待 max_delay 秒），
+  一次返回这段时间内所有改动的路径（去重），编辑器连续保存几百次也只产生一批改动
+
+改动的路径都是相对基础目录（项目根目录）的 / 分隔路径，只报告路径本身，不区分新增、修改和删除，
+调用方重新比较这些路径的源和目标即可。
+"""
+
+import os
+import abc
+import sys
+import stat
+import time
+import errno
+import struct
+import select
+from pathlib import Path
+from typing import Dict, Optional, Set, Union
+
+from sync_common.ignore import IgnoreMatcher
+from sync_common.tree_sync import Snapshot, snapshot
+
+
+# 轮询模式默认的扫描间隔（秒）
+DEFAULT_POLL_INTERVAL = 1.0
+
+# linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+class Watcher(abc.ABC):
+    """
+    监听基础目录下的若干路径
+
+    roots 为 {相对基础目录的路径: 忽略规则}，规则使用 IgnoreMatcher.relative_to(路径) 得到的匹配器，
+    被忽略的路径不会报告
+    """
+
+    kind = ""
+
+    def __init__(self, base_path: Union[str, Path], roots: Dict[str, Optional[IgnoreMatcher]]):
+        self.base_path = Path(base_path)
+        self.roots = {root.strip("/"): matcher or IgnoreMatcher() for root, matcher in roots.items()}
+
+    def root_of(self, rel_path: str) -> Optional[str]:
+        """路径所属的监听路径，不在任何监听路径中时返回 None"""
+        for root in self.roots:
+            if rel_path == root or rel_path.startswith(root + "/"):
+                return root
+        return None
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """路径是否不在监听路径中或被忽略（监听路径本身不会被忽略）"""
+        root = self.root_of(rel_path)
+        if root is None:
+            return True
+        return rel_path != root and self.roots[root].match(rel_path[len(root) + 1:], is_dir=is_dir)
+
+    @abc.abstractmethod
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        """等待最多 timeout 秒（None 表示一直等待），返回这段时间内的改动，可能为空"""
+
+    def collect(self, debounce: float, max_delay: Optional[float] = None) -> Set[str]:
+        """
+        等待下一批改动
+
+        收到第一个改动后继续收集，直到 debounce 秒内没有新的改动或距第一个改动已超过 max_delay 秒
+        """
+        changes: Set[str] = set()
+        while not changes:
+            changes = self.poll(None)
+        deadline = time.monotonic() + max_delay if max_delay else None
+        while True:
+            timeout = debounce
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+            more = self.poll(timeout)
+            if not more:
+                break
+            changes |= more
+        return changes
+
+    def close(self):
+        pass
+
+
+class PollWatcher(Watcher):
+    """轮询监听：定期扫描监听路径，与上一次的 (大小, mtime) 索引比较"""
+
+    kind = "polling"
+
+    def __init__(self, base_path: Union[str, Path], roots: Dict[str, Optional[IgnoreMatcher]],
+                 interval: float = DEFAULT_POLL_INTERVAL):
+        super().__init__(base_path, roots)
+        self.interval = interval
+        self.state = {root: self.scan(root) for root in self.roots}
+
+    def scan(self, root: str) -> Snapshot:
+        """监听路径的 mtime 索引，键为相对基础目录的路径；路径是文件时只有它自己"""
+        path = self.base_path / root
+        try:
+            root_stat = path.lstat()
+        except (FileNotFoundError, NotADirectoryError):
+            return {}
+        if not stat.S_ISDIR(root_stat.st_mode):
+            return {root: (root_stat.st_size, root_stat.st_mtime_ns)}
+        entries: Snapshot = {root: None}
+        for rel_path, state in snapshot(path, self.roots[root], follow_symlinks=True).items():
+            entries[_join(root, rel_path)] = state
+        return entries
+
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        changes = set()
+        for root, previous in self.state.items():
+            current = self.scan(root)
+            changes.update(path for path, state in current.items() if previous.get(path, False) != state)
+            changes.update(path for path in previous if path not in current)
+            self.state[root] = current
+        return changes
+
+
+class InotifyWatcher(Watcher):
+    """
+    inotify 监听（仅 Linux）
+
+    每个目录一个监听，监听路径所在的目录也会监听，但只报告监听路径本身。
+    无法初始化或监听数量超过 fs.inotify.max_user_watches 时抛出 OSError
+    """
+
+    kind = "inotify"
+
+    def __init__(self, base_path: Union[str, Path], roots: Dict[str, Optional[IgnoreMatcher]]):
+        super().__init__(base_path, roots)
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify 仅支持 Linux")
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            self._rm_watch = libc.inotify_rm_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError(errno.ENOSYS, "libc 不支持 inotify")
+        self._get_errno = ctypes.get_errno
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = self._get_errno()
+            raise OSError(err, os.strerror(err))
+        # 监听描述符 -> 相对基础目录的目录路径
+        self.watches: Dict[int, str] = {}
+        try:
+            for root in self.roots:
+                # 所在目录中只报告监听路径本身，监听路径被删除后重新创建时也能收到事件
+                self.watch_dir(root.rpartition("/")[0])
+                path = self.base_path / root
+                if path.is_dir() and not path.is_symlink():
+                    self.watch_tree(root)
+        except BaseException:
+            self.close()
+            raise
+
+    def watch_dir(self, rel_dir: str) -> bool:
+        """监听一个目录，目录已不存在时返回 False"""
+        path = self.base_path / rel_dir if rel_dir else self.base_path
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = self._get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return False
+            raise OSError(err, os.strerror(err), str(path))
+        self.watches[wd] = rel_dir
+        return True
+
+    def watch_tree(self, rel_dir: str):
+        """监听一个目录和其中所有未被忽略的子目录"""
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            if not self.watch_dir(current):
+                continue
+            try:
+                with os.scandir(self.base_path / current) as entries:
+                    for entry in entries:
+                        rel_path = _join(current, entry.name)
+                        if entry.is_dir(follow_symlinks=False) and not self.ignored(rel_path, is_dir=True):
+                            stack.append(rel_path)
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changes = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+                offset += EVENT_HEADER.size + length
+                self.handle(wd, mask, name, changes)
+        return changes
+
+    def handle(self, wd: int, mask: int, name: str, changes: Set[str]):
+        """处理一个事件，把改动的路径加入 changes"""
+        if mask & IN_Q_OVERFLOW:
+            # 丢失了事件，整个监听路径都需要重新比较
+            changes.update(self.roots)
+            return
+        if mask & IN_IGNORED:
+            self.watches.pop(wd, None)
+            return
+        rel_dir = self.watches.get(wd)
+        if rel_dir is None:
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            if mask & IN_MOVE_SELF and not (self.base_path / rel_dir).is_dir():
+                # 在监听范围内移动时，新位置的 IN_MOVED_TO 已经把监听改到新路径；
+                # 移出监听范围的目录不再监听
+                self._rm_watch(self.fd, wd)
+                self.watches.pop(wd, None)
+            if not self.ignored(rel_dir, is_dir=True):
+                changes.add(rel_dir)
+            return
+        rel_path = _join(rel_dir, name)
+        is_dir = bool(mask & IN_ISDIR)
+        if self.ignored(rel_path, is_dir):
+            return
+        changes.add(rel_path)
+        if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+            # 新目录中的内容可能在添加监听前就已写入，调用方比较目录路径时会包含这些内容
+            self.watch_tree(rel_path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(base_path: Union[str, Path], roots: Dict[str, Optional[IgnoreMatcher]],
+                   poll: bool = False, interval: float = DEFAULT_POLL_INTERVAL) -> Watcher:
+    """优先使用 inotify，不可用时（或 poll 为 True）退回轮询"""
+    if not poll:
+        try:
+            return InotifyWatcher(base_path, roots)
+        except OSError as e:
+            print(f"⚠️  inotify 不可用，改为每 {interval:g}s 轮询: {e}")
+    return PollWatcher(base_path, roots, interval)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 仓库没有打包配置，测试直接从仓库根目录导入 sync_common
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,111 @@
+import io
+import json
+import errno
+import tarfile
+
+import pytest
+
+from sync_common import bundle
+from sync_common.bundle import MANIFEST_NAME, BUNDLE_VERSION, apply_bundle, write_bundle
+from sync_common.tree_sync import snapshot
+
+
+MTIME_NS = 1_700_000_000_123_456_789
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "source"
+    (root / "locales" / "zh").mkdir(parents=True)
+    (root / "locales" / "en.json").write_text('{"hello": "Hello"}')
+    (root / "locales" / "zh" / "common.json").write_text('{"hello": "你好"}')
+    (root / "i18n.config.js").write_text("module.exports = {}")
+    for i, path in enumerate(["locales/en.json", "locales/zh/common.json", "i18n.config.js"]):
+        bundle.os.utime(root / path, ns=(MTIME_NS + i, MTIME_NS + i))
+    return root
+
+
+def _pack(project, output, compression):
+    paths = {"locales": snapshot(project / "locales"), "i18n.config.js": None}
+    return write_bundle(output, project, paths, compression, project_name="demo")
+
+
+@pytest.mark.parametrize("compression, suffix", [
+    ("gzip", ".tar.gz"),
+    pytest.param("zstd", ".tar.zst",
+                 marks=pytest.mark.skipif(bundle.zstd is None, reason="zstd 不可用")),
+])
+def test_round_trip(tmp_path, project, compression, suffix):
+    output = tmp_path / f"demo{suffix}"
+    size = sum(path.stat().st_size for path in project.rglob("*") if path.is_file())
+    assert _pack(project, output, compression) == {"files": 3, "bytes": size, "missing": 0}
+
+    stale = tmp_path / "stale"
+    (stale / "locales" / "fr").mkdir(parents=True)
+    (stale / "locales" / "en.json").write_text("{}")
+    (stale / "locales" / "fr" / "common.json").write_text("{}")
+    manifest, results = apply_bundle(output, {"empty": tmp_path / "empty", "stale": stale})
+
+    assert manifest["project_name"] == "demo"
+    assert results["empty"]["locales"]["created"] == 2
+    assert results["empty"]["i18n.config.js"]["created"] == 1
+    assert results["stale"]["locales"]["updated"] == 1
+    assert results["stale"]["locales"]["created"] == 1
+    assert results["stale"]["locales"]["deleted"] == 1
+    assert not (stale / "locales" / "fr").exists()
+    for target in (tmp_path / "empty", stale):
+        assert snapshot(target / "locales") == snapshot(project / "locales")
+        assert (target / "locales" / "zh" / "common.json").read_text() == '{"hello": "你好"}'
+        assert (target / "i18n.config.js").stat().st_mtime_ns == MTIME_NS + 2
+        assert not list(target.rglob("*.tmp"))
+
+    # 再次解包时所有文件都不变
+    _, results = apply_bundle(output, {"stale": stale})
+    assert results["stale"]["locales"]["unchanged"] == 2
+    assert results["stale"]["locales"]["created"] == results["stale"]["locales"]["updated"] == 0
+
+
+@pytest.mark.parametrize("unsafe", ["../escape.json", "/etc/passwd", "locales/../../escape.json", ""])
+def test_rejects_unsafe_manifest_paths(tmp_path, unsafe):
+    output = tmp_path / "evil.tar"
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "ignore": [],
+        "paths": {"locales": {"kind": "tree", "entries": {unsafe: [2, MTIME_NS]}}},
+    }
+    with tarfile.open(output, "w", format=tarfile.PAX_FORMAT) as tar:
+        data = json.dumps(manifest).encode("utf-8")
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+
+    with pytest.raises(ValueError, match="不安全"):
+        apply_bundle(output, {"target": tmp_path / "target"})
+    assert not (tmp_path / "target").exists()
+
+
+def test_write_error_only_fails_its_target(tmp_path, project, monkeypatch):
+    output = tmp_path / "demo.tar"
+    _pack(project, output, "none")
+    full = tmp_path / "full"
+
+    class FullDisk(io.BytesIO):
+        def write(self, data):
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+    real_open = open
+
+    def fake_open(path, mode="r", *args, **kwargs):
+        if mode == "wb" and str(path).startswith(str(full)):
+            real_open(path, mode).close()
+            return FullDisk()
+        return real_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(bundle, "open", fake_open, raising=False)
+    _, results = apply_bundle(output, {"full": full, "ok": tmp_path / "ok"})
+
+    assert isinstance(results["full"]["locales"], OSError)
+    assert isinstance(results["full"]["i18n.config.js"], OSError)
+    assert not [path for path in full.rglob("*") if path.is_file()]
+    assert results["ok"]["locales"]["created"] == 2
+    assert snapshot(tmp_path / "ok" / "locales") == snapshot(project / "locales")
@@ -0,0 +1,82 @@
+import shutil
+
+import pytest
+
+from sync_common.clone_cache import ensure_clone, head_commit
+from sync_common.git_objects import git
+
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="需要 git")
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    for key, value in (("GIT_AUTHOR_NAME", "test"), ("GIT_AUTHOR_EMAIL", "test@example.com"),
+                       ("GIT_COMMITTER_NAME", "test"), ("GIT_COMMITTER_EMAIL", "test@example.com"),
+                       ("GIT_CONFIG_NOSYSTEM", "1"), ("HOME", str(tmp_path))):
+        monkeypatch.setenv(key, value)
+    bare = tmp_path / "remote.git"
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(bare))
+    # 本地 file:// 远程默认不支持 --filter
+    git(bare, "config", "uploadpack.allowFilter", "true")
+
+    work = tmp_path / "work"
+    git(tmp_path, "clone", "-q", str(bare), str(work))
+    git(work, "checkout", "-q", "-b", "main")
+    return bare, work
+
+
+def _commit(work, files, message):
+    for rel_path, content in files.items():
+        path = work / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", message)
+    git(work, "push", "-q", "origin", "main")
+    return head_commit(work)
+
+
+def _missing_objects(repo):
+    """本地缺少的对象（不触发按需下载）"""
+    output = git(repo, "rev-list", "--objects", "--missing=print", "HEAD")
+    return {line[1:] for line in output.splitlines() if line.startswith("?")}
+
+
+def test_blobless_shallow_sparse_clone(tmp_path, remote):
+    bare, work = remote
+    _commit(work, {"en.json": "1", "README.md": "readme"}, "first")
+    head = _commit(work, {"zh/common.json": "2", "docs/guide.md": "guide"}, "second")
+    clone = tmp_path / "cache" / "demo"
+
+    assert ensure_clone(bare.as_uri(), clone, "main", [".json"]) == {"before": None, "after": head}
+
+    assert git(clone, "rev-parse", "--is-shallow-repository").strip() == "true"
+    assert git(clone, "rev-list", "--count", "HEAD").strip() == "1"
+    assert git(clone, "config", "remote.origin.partialclonefilter").strip() == "blob:none"
+    worktree = sorted(p.relative_to(clone).as_posix() for p in clone.rglob("*")
+                      if p.is_file() and ".git" not in p.parts)
+    assert worktree == ["en.json", "zh/common.json"]
+    # 没有检出的文件内容不下载
+    markdown = {git(clone, "rev-parse", f"HEAD:{path}").strip() for path in ("README.md", "docs/guide.md")}
+    assert markdown <= _missing_objects(clone)
+
+
+def test_refresh_after_new_commit(tmp_path, remote):
+    bare, work = remote
+    first = _commit(work, {"en.json": "1", "notes.txt": "notes"}, "first")
+    clone = tmp_path / "cache" / "demo"
+    ensure_clone(bare.as_uri(), clone, "main", [".json"])
+
+    second = _commit(work, {"en.json": "2", "fr.json": "3"}, "second")
+    assert ensure_clone(bare.as_uri(), clone, "main", [".json"]) == {"before": first, "after": second}
+
+    assert (clone / "en.json").read_text() == "2"
+    assert (clone / "fr.json").read_text() == "3"
+    assert not (clone / "notes.txt").exists()
+    assert git(clone, "rev-parse", "origin/main").strip() == second
+    assert git(clone, "rev-list", "--count", "HEAD").strip() == "1"
+
+    # 没有新提交时 HEAD 不变；扩展名变化时重新设置 sparse 规则
+    assert ensure_clone(bare.as_uri(), clone, "main", [".json", ".txt"]) == {"before": second, "after": second}
+    assert (clone / "notes.txt").read_text() == "notes"
@@ -0,0 +1,30 @@
+import os
+
+from sync_common.copy_engine import CopyEngine
+
+
+def test_hardlink_copy_onto_existing_link(tmp_path):
+    src = tmp_path / "a.json"
+    dst = tmp_path / "b.json"
+    src.write_text("{}")
+    engine = CopyEngine("hardlink")
+
+    assert engine.copy(src, dst) == "hardlink"
+    assert engine.copy(src, dst) == "hardlink"
+
+    assert os.path.samestat(src.stat(), dst.stat())
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json", "b.json"]
+
+
+def test_buffered_copy_replaces_content(tmp_path):
+    src = tmp_path / "a.json"
+    dst = tmp_path / "b.json"
+    src.write_text("new")
+    dst.write_text("old")
+
+    assert CopyEngine("buffered").copy(src, dst) == "buffered"
+
+    assert dst.read_text() == "new"
+    assert not os.path.samestat(src.stat(), dst.stat())
+    assert src.stat().st_mtime_ns == dst.stat().st_mtime_ns
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json", "b.json"]
@@ -0,0 +1,59 @@
+import json
+
+from upgrade_i18n.json_merge import format_delta, merge_json
+
+
+def _encode(data, **kwargs):
+    return (json.dumps(data, ensure_ascii=False, **kwargs) + "\n").encode("utf-8")
+
+
+def test_key_paths():
+    source = _encode({"a": 1, "nested": {"x": "new", "y": 2}, "added": True}, indent=2)
+    target = _encode({"nested": {"x": "old", "z": 3}, "a": 1, "removed": "gone"}, indent=2)
+
+    merged, delta = merge_json(source, target)
+
+    assert delta == {"added": ["nested.y", "added"], "changed": ["nested.x"], "removed": ["nested.z", "removed"]}
+    assert format_delta(delta) == "+2 ~1 -2"
+    assert json.loads(merged) == {"nested": {"x": "new", "y": 2}, "a": 1, "added": True}
+
+
+def test_keeps_target_order_and_format():
+    source = _encode({"a": "1", "b": "二", "c": "3"}, indent=2)
+    target = b'{\n    "c": "old",\n    "a": "1"\n}'
+
+    merged, _ = merge_json(source, target)
+
+    # 已有的键保持目标顺序，新增的键追加在后面；沿用 4 空格缩进，目标没有结尾换行时也不加
+    assert merged == '{\n    "c": "3",\n    "a": "1",\n    "b": "二"\n}'.encode("utf-8")
+
+
+def test_keeps_compact_single_line_format():
+    merged, _ = merge_json(b'{"a": 1, "b": 2}', b'{"b":0,"a":1}\n')
+    assert merged == b'{"b":2,"a":1}\n'
+
+
+def test_identical_content_is_not_written():
+    target = b'{\n\t"b": 1,\n\t"a": {"x": 2}\n}\n'
+    merged, delta = merge_json(b'{"a": {"x": 2}, "b": 1}', target)
+    assert merged is None
+    assert delta == {"added": [], "changed": [], "removed": []}
+
+
+def test_same_values_different_format_is_not_rewritten():
+    # 键值相同时不因格式差异改写目标文件
+    merged, _ = merge_json(_encode({"a": 1}, indent=2), b'{"a":1}')
+    assert merged is None
+
+
+def test_invalid_target_is_replaced():
+    source = _encode({"a": 1}, indent=2)
+    merged, delta = merge_json(source, b'{"a": 1,,')
+    assert merged == source
+    assert delta["changed"] == ["(root)"]
+
+
+def test_non_object_target_is_replaced():
+    merged, delta = merge_json(b'{"a": 1}', b'["a"]')
+    assert json.loads(merged) == {"a": 1}
+    assert delta["changed"] == ["(root)"]
@@ -0,0 +1,98 @@
+import os
+import shutil
+
+from sync_common.copy_engine import CopyEngine
+from sync_common.git_objects import blob_id
+from sync_common.merkle import INDEX_FILE, MerkleIndex, diff_nodes, is_dir_node
+from sync_common.tree_sync import apply_delta, diff_trees, snapshot
+
+
+def _write(root, files):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _contents(root):
+    return {
+        path.relative_to(root).as_posix(): path.read_text() if path.is_file() else None
+        for path in sorted(root.rglob("*"))
+        if path.name != INDEX_FILE
+    }
+
+
+def test_refresh_builds_tree(tmp_path):
+    _write(tmp_path, {"lib/a.json": "a", "lib/sub/b.json": "bb", "lib/c.log": "c"})
+    node = MerkleIndex(tmp_path).refresh("lib")
+
+    assert is_dir_node(node)
+    assert (node["files"], node["bytes"]) == (3, 4)
+    assert node["children"]["sub"]["children"]["b.json"]["hash"] == blob_id(tmp_path / "lib/sub/b.json")
+    assert MerkleIndex(tmp_path).refresh("missing") is None
+
+    # 根哈希只取决于内容和名称
+    _write(tmp_path / "copy", {"lib/a.json": "a", "lib/sub/b.json": "bb", "lib/c.log": "c"})
+    assert MerkleIndex(tmp_path / "copy").refresh("lib")["hash"] == node["hash"]
+
+
+def test_diff_nodes_matches_diff_trees(tmp_path):
+    source = tmp_path / "source" / "lib"
+    _write(source, {"same.json": "same", "changed.json": "new", "new/deep/a.json": "a",
+                    "file_to_dir/x.json": "x", "dir_to_file": "file", "keep/b.json": "b"})
+    target = tmp_path / "target" / "lib"
+    _write(target, {"same.json": "same", "changed.json": "old", "gone.json": "gone", "gone_dir/c/d.json": "d",
+                    "file_to_dir": "file", "dir_to_file/y.json": "y", "keep/b.json": "b"})
+    shutil.copytree(tmp_path / "target", tmp_path / "indexed", copy_function=shutil.copy2)
+    indexed = tmp_path / "indexed" / "lib"
+
+    engine = CopyEngine()
+    tree_delta = diff_trees(source, target, snapshot(source, follow_symlinks=True), snapshot(target))
+    source_node = MerkleIndex(tmp_path / "source").refresh("lib", follow_symlinks=True)
+    node_delta = diff_nodes(source_node, MerkleIndex(tmp_path / "indexed").refresh("lib"))
+
+    for key in ("create", "delete", "mkdir", "rmdir"):
+        assert sorted(node_delta[key]) == sorted(tree_delta[key]), key
+    assert node_delta["update"] == ["changed.json"]
+    apply_delta(source, target, tree_delta, engine)
+    apply_delta(source, indexed, node_delta, engine)
+
+    assert _contents(indexed) == _contents(target) == _contents(source)
+    # 同步后目标索引与源的根哈希一致
+    assert MerkleIndex(tmp_path / "indexed").refresh("lib")["hash"] == source_node["hash"]
+
+
+def test_racily_clean_file_is_rehashed(tmp_path):
+    _write(tmp_path, {"lib/old.json": "aaaa", "lib/racy.json": "aaaa"})
+    index = MerkleIndex(tmp_path)
+    # old.json 在索引时间之前修改；racy.json 的 mtime 不早于索引时间（同一个时间粒度内）
+    before = index.refreshed_ns - 10_000_000_000
+    os.utime(tmp_path / "lib/old.json", ns=(before, before))
+    os.utime(tmp_path / "lib/racy.json", ns=(index.refreshed_ns, index.refreshed_ns))
+    index.refresh("lib")
+    index.save()
+
+    # 大小不变的修改，mtime 也恢复原值
+    for name in ("old.json", "racy.json"):
+        path = tmp_path / "lib" / name
+        mtime_ns = path.stat().st_mtime_ns
+        path.write_text("bbbb")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    index = MerkleIndex(tmp_path)
+    node = index.refresh("lib")
+
+    assert index.stats == {"stat": 2, "hashed": 1}
+    assert node["children"]["racy.json"]["hash"] == blob_id(tmp_path / "lib/racy.json")
+    # 索引时间之前的文件按 (大小, mtime) 沿用缓存
+    assert node["children"]["old.json"]["hash"] != blob_id(tmp_path / "lib/old.json")
+
+
+def test_hint_skips_hashing_copied_files(tmp_path):
+    _write(tmp_path / "source", {"lib/a.json": "a", "lib/b.json": "b"})
+    source_node = MerkleIndex(tmp_path / "source").refresh("lib", follow_symlinks=True)
+    shutil.copytree(tmp_path / "source", tmp_path / "target", copy_function=shutil.copy2)
+
+    index = MerkleIndex(tmp_path / "target")
+    assert index.refresh("lib", hint=source_node)["hash"] == source_node["hash"]
+    assert index.stats["hashed"] == 0
@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+from sync_common.copy_engine import CopyEngine
+from sync_common.tree_sync import (
+    OLD_PREFIX, STAGING_PREFIX, apply_delta, diff_trees, recover_staging, snapshot, stage_delta,
+    swap_into_place, sync_tree,
+)
+
+
+def _write(root, files):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _contents(root):
+    return {
+        path.relative_to(root).as_posix(): path.read_text() if path.is_file() else None
+        for path in sorted(root.rglob("*"))
+    }
+
+
+def _sync(source, target, staging=False):
+    delta = diff_trees(source, target, snapshot(source, follow_symlinks=True), snapshot(target))
+    if staging:
+        stats = stage_delta(source, target, delta, CopyEngine())
+    else:
+        stats = apply_delta(source, target, delta, CopyEngine())
+    return delta, stats
+
+
+@pytest.fixture
+def trees(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _write(source, {"en.json": "en", "zh/common.json": "zh", "ja/common.json": "ja-new", "fr": "fr"})
+    _write(target, {"en.json": "en", "zh/common.json": "zh", "ja/common.json": "ja-old",
+                    "fr/common.json": "fr", "old/a/b.json": "old", "de.json": "de"})
+    # 未变化的文件 mtime 与源一致
+    for rel_path in ("en.json", "zh/common.json"):
+        stat = (source / rel_path).stat()
+        os.utime(target / rel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return source, target
+
+
+@pytest.mark.parametrize("staging", [False, True])
+def test_sync_delta(trees, staging):
+    source, target = trees
+    unchanged_inode = (target / "en.json").stat().st_ino
+
+    delta, stats = _sync(source, target, staging)
+
+    assert delta["update"] == ["ja/common.json"]
+    assert delta["create"] == ["fr"]
+    assert sorted(delta["delete"]) == ["de.json", "fr"]
+    assert delta["rmdir"] == ["old"]
+    assert delta["unchanged"] == 2
+    assert stats == {"created": 1, "updated": 1, "deleted": 3, "unchanged": 2, "bytes": 8}
+    assert _contents(target) == _contents(source)
+    assert snapshot(target) == snapshot(source)
+    # 未变化的文件保持原来的 inode（暂存模式通过硬链接保留）
+    assert (target / "en.json").stat().st_ino == unchanged_inode
+    assert not list(target.parent.glob(".target.*"))
+
+    delta, _ = _sync(source, target, staging)
+    assert delta["unchanged"] == 4
+    assert not any(delta[key] for key in ("create", "update", "delete", "mkdir", "rmdir"))
+
+
+def test_file_becomes_directory(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    _write(source, {"zh/common.json": "zh", "en": "en"})
+    _write(target, {"zh": "zh", "en/common.json": "en"})
+
+    delta, _ = _sync(source, target)
+
+    assert sorted(delta["delete"]) == ["en", "zh"]
+    assert delta["mkdir"] == ["zh"]
+    assert sorted(delta["create"]) == ["en", "zh/common.json"]
+    assert _contents(target) == {"en": "en", "zh": None, "zh/common.json": "zh"}
+
+
+def test_symlinks(tmp_path):
+    shared = tmp_path / "shared"
+    source, target = tmp_path / "source", tmp_path / "target"
+    _write(shared, {"common.json": "shared", "zh/common.json": "zh"})
+    _write(source, {"en.json": "en"})
+    (source / "common.json").symlink_to(shared / "common.json")
+    (source / "zh").symlink_to(shared / "zh", target_is_directory=True)
+    (source / "loop").symlink_to(source, target_is_directory=True)
+    (source / "dangling.json").symlink_to(tmp_path / "missing.json")
+    # 目标中的链接被文件替换，不会写入链接指向的目录
+    elsewhere = tmp_path / "elsewhere"
+    _write(elsewhere, {"common.json": "elsewhere"})
+    target.mkdir()
+    (target / "zh").symlink_to(elsewhere, target_is_directory=True)
+
+    sync_tree(source, target, CopyEngine())
+
+    assert _contents(target) == {"common.json": "shared", "en.json": "en", "zh": None, "zh/common.json": "zh"}
+    assert _contents(elsewhere) == {"common.json": "elsewhere"}
+    assert not (target / "zh").is_symlink()
+    assert not (target / "common.json").is_symlink()
+
+
+def test_swap_into_place(tmp_path):
+    staging, target = tmp_path / f".target.{STAGING_PREFIX}-1", tmp_path / "target"
+    _write(staging, {"new.json": "new"})
+    _write(target, {"old.json": "old"})
+
+    swap_into_place(staging, target)
+
+    assert _contents(target) == {"new.json": "new"}
+    assert not staging.exists()
+
+
+def test_recover_staging(tmp_path):
+    target = tmp_path / "target"
+    _write(target, {"en.json": "en"})
+    _write(tmp_path / f".target.{STAGING_PREFIX}-123", {"en.json": "partial"})
+    recover_staging(target)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["target"]
+
+    # 两次 rename 之间中断：目标目录已被移走，换回旧目录
+    os.rename(target, tmp_path / f".target.{OLD_PREFIX}-123")
+    _write(tmp_path / f".target.{STAGING_PREFIX}-123", {"en.json": "partial"})
+    recover_staging(target)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["target"]
+    assert _contents(target) == {"en.json": "en"}
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from upgrade_system.upgrade_system import FolderSyncTool
+
+
+SYNC_PATHS = ["src/hooks", "src/lib"]
+
+
+def _write(root, files):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _contents(root):
+    return {
+        path.relative_to(root).as_posix(): path.read_text() if path.is_file() else None
+        for path in sorted(root.rglob("*"))
+        if not path.name.startswith(".sync-")
+    }
+
+
+@pytest.fixture
+def base(tmp_path):
+    _write(tmp_path / "source", {"src/hooks/a.ts": "a", "src/hooks/b/c.ts": "c", "src/lib": "lib file"})
+    # 两个目标初始状态相同：src/lib 是目录，src/hooks 中有过期文件
+    for target in ("plan", "sync"):
+        _write(tmp_path / target, {"src/hooks/a.ts": "old", "src/hooks/stale.ts": "stale",
+                                   "src/lib/x.ts": "x", "src/lib/y/z.ts": "z"})
+    return tmp_path
+
+
+def _tool(base, **kwargs):
+    tool = FolderSyncTool(str(base), throughput_log="", progress=False, **kwargs)
+    tool.sync_paths = list(SYNC_PATHS)
+    return tool
+
+
+@pytest.mark.parametrize("staging", [False, True])
+def test_plan_apply_matches_sync(base, staging):
+    tool = _tool(base, staging=staging)
+    plan = tool.plan_targets("source", ["plan"])
+    lib = next(item for item in plan["items"] if item["sync_path"] == "src/lib")
+    assert lib["counts"] == {"create": 1, "update": 0, "delete": 1, "unchanged": 0}
+
+    assert tool.apply_plan(plan)
+    stats = {sync_path: tool.sync_path("source", "sync", sync_path) for sync_path in SYNC_PATHS}
+
+    assert stats["src/lib"]["created"] == stats["src/lib"]["deleted"] == 1
+    assert _contents(base / "plan") == _contents(base / "sync") == _contents(base / "source")
+    assert (base / "plan" / "src" / "lib").stat().st_mtime_ns == (base / "source" / "src" / "lib").stat().st_mtime_ns
+
+    # 执行后再生成的计划没有任何操作
+    totals = tool.plan_targets("source", ["plan"])["totals"]
+    assert totals["create"] == totals["update"] == totals["delete"] == 0
+
+
+@pytest.fixture
+def linked(tmp_path):
+    shared = tmp_path / "shared"
+    _write(shared, {"x.json": "x", "dir/y.json": "y"})
+    _write(tmp_path / "source", {"src/lib/a.ts": "a", "src/hooks/b.ts": "b"})
+    lib = tmp_path / "source" / "src" / "lib"
+    (lib / "x.json").symlink_to(shared / "x.json")
+    (lib / "dir").symlink_to(shared / "dir", target_is_directory=True)
+    (lib / "loop").symlink_to(lib, target_is_directory=True)
+    (lib / "dangling.json").symlink_to(tmp_path / "missing.json")
+    for target in ("plain", "indexed"):
+        _write(tmp_path / target, {"src/lib/stale.ts": "stale"})
+        # 目标中的链接被源的文件替换，不会通过链接写入 shared
+        (tmp_path / target / "src" / "hooks").mkdir(parents=True)
+        (tmp_path / target / "src" / "hooks" / "b.ts").symlink_to(shared / "x.json")
+    return tmp_path
+
+
+def test_index_sync_follows_symlinks_like_delta_sync(linked):
+    plain, indexed = _tool(linked), _tool(linked, use_index=True)
+    expected = {"src/hooks/b.ts": "b", "src/lib/a.ts": "a", "src/lib/dir/y.json": "y", "src/lib/x.json": "x"}
+
+    for sync_path in SYNC_PATHS:
+        plain.sync_path("source", "plain", sync_path)
+        indexed.sync_path("source", "indexed", sync_path)
+    indexed.save_indexes()
+
+    for target in ("plain", "indexed"):
+        files = {path: content for path, content in _contents(linked / target).items() if content is not None}
+        assert files == expected
+        assert not any(path.is_symlink() for path in (linked / target).rglob("*"))
+    assert _contents(linked / "shared") == {"dir": None, "dir/y.json": "y", "x.json": "x"}
+
+    # 普通同步之后的 --index 同步、--check 和计划都认为已一致，不会删除链接过来的文件
+    indexed = _tool(linked, use_index=True)
+    for sync_path in SYNC_PATHS:
+        stats = indexed.sync_path("source", "plain", sync_path)
+        assert stats["created"] == stats["updated"] == stats["deleted"] == 0
+    assert indexed.check_targets("source", ["plain"])
+    totals = indexed.plan_targets("source", ["plain"])["totals"]
+    assert totals["create"] == totals["update"] == totals["delete"] == 0
@@ -5,12 +5,16 @@
 """
 
 import os
-import shutil
 import sys
 import subprocess
+import threading
 import json
+import cProfile
+import pstats
+import contextlib
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Iterator, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
 from datetime import datetime
 
@@ -23,14 +27,74 @@ from config import (
     LOG_CONFIG
 )
 
+# 共享模块位于仓库根目录
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sync_common.clone_cache import cache_path, ensure_clone
+from sync_common.copy_engine import STRATEGIES, CopyEngine, format_bytes
+from sync_common.git_objects import BlobReader, blob_id, git, list_tree, resolve_ref, write_file_atomic
+from sync_common.ignore import IgnoreMatcher, scan_tree
+from sync_common.mirror import MirrorCache
+from sync_common.plan import (
+    build_plan, empty_delta, format_estimate, load_plan, load_samples, plan_item, write_plan
+)
+from instrument import RunRecorder
+from json_merge import format_delta, merge_json
+from sync_state import SyncState, tree_fingerprint
+
+
+# 同步模式：worktree 切换分支并拉取后从工作区复制；object 只 fetch，直接从对象库读取
+SYNC_MODES = ("worktree", "object")
+
+# 并发执行 Git 阶段的项目数 (GIT_CONFIG["workers"])
+DEFAULT_GIT_WORKERS = 4
+
+# 文件复制线程数 (SYNC_CONFIG["copy_workers"])
+DEFAULT_COPY_WORKERS = 8
+
+# 每批输出的文件结果行数
+OUTPUT_BATCH_SIZE = 200
+
+# 运行日志 (LOG_CONFIG["run_log"]) 和 --profile 输出文件 (LOG_CONFIG["profile_file"]) 的默认路径
+DEFAULT_RUN_LOG = "~/.cache/upgrade_i18n/runs.jsonl"
+DEFAULT_PROFILE_FILE = "upgrade_i18n.prof"
+
+# 计划文件中的工具名称
+PLAN_TOOL = "upgrade_i18n"
+
 
 class I18nSyncTool:
-    def __init__(self, language_base_path: str = LANGUAGE_BASE_PATH):
+    def __init__(self, language_base_path: str = LANGUAGE_BASE_PATH, sync_mode: str = None,
+                 copy_strategy: str = None, force: bool = False, merge: bool = None):
         self.language_base_path = Path(language_base_path)
-        self.language_project_list = LANGUAGE_PROJECT_LIST
+        self.language_project_list = [dict(project) for project in LANGUAGE_PROJECT_LIST]
         self.sync_config = SYNC_CONFIG
         self.git_config = GIT_CONFIG
         self.log_config = LOG_CONFIG
+        self.sync_mode = sync_mode or self.git_config.get("sync_mode", "worktree")
+        self.copy_engine = CopyEngine(copy_strategy or self.sync_config.get("copy_strategy", "auto"))
+        self.extensions = set(self.sync_config.get("file_extensions", [".json"]))
+        # 忽略规则只编译一次，语义同 .gitignore
+        self.ignore_matcher = IgnoreMatcher(self.sync_config.get("ignore_patterns", []))
+        self._repo_locks: Dict[str, threading.Lock] = {}
+        self._repo_locks_guard = threading.Lock()
+        self.sync_state = SyncState(self.sync_config.get("state_file", "~/.cache/upgrade_i18n/state.json"))
+        self.force = force
+        # 键级合并模式：只改写内容有差异的文件，保持目标文件的键顺序和格式
+        self.merge = self.sync_config.get("merge_mode", False) if merge is None else merge
+        self.recorder = RunRecorder(self.log_config.get("run_log", DEFAULT_RUN_LOG))
+        
+        # 配置了 remote 的项目由工具管理克隆，language_path 指向缓存目录；
+        # 设置了 mirror_dir 时改为共享 bare 镜像的 worktree，同一个远程只保存、fetch 一次
+        clone_cache_dir = self.git_config.get("clone_cache_dir", "~/.cache/upgrade_i18n")
+        mirror_dir = self.git_config.get("mirror_dir")
+        self.mirrors = MirrorCache(mirror_dir, timeout=self.git_config.get("timeout", 300)) if mirror_dir else None
+        for project in self.language_project_list:
+            if project.get("remote"):
+                if self.mirrors:
+                    project["language_path"] = str(self.mirrors.worktree_path(project["name"]))
+                else:
+                    project["language_path"] = str(cache_path(clone_cache_dir, project["name"]))
         
     def get_available_projects(self) -> List[Dict]:
         """获取可用的语言项目列表"""
@@ -39,7 +103,8 @@ class I18nSyncTool:
             if not project.get("enabled", True):
                 continue
             language_path = project.get("language_path")
-            if Path(language_path).exists():
+            # 缓存克隆在第一次同步时创建
+            if project.get("remote") or Path(language_path).exists():
                 available.append(project)
         return available
     
@@ -49,10 +114,10 @@ class I18nSyncTool:
         print("-" * 60)
         for i, project in enumerate(projects, 1):
             language_path = project.get("language_path")
-            status = "✅" if Path(language_path).exists() else "❌"
-            target_path = project.get("target_path", "未配置")
+            status = "✅" if project.get("remote") or Path(language_path).exists() else "❌"
             print(f"{i}. {status} {project['name']}")
-            print(f"   📁 目标路径: {target_path}")
+            for target_path in self.target_paths(project) or ["未配置"]:
+                print(f"   📁 目标路径: {target_path}")
         print("-" * 60)
     
     def select_languages(self, languages: List[Dict]) -> List[Dict]:
@@ -95,121 +160,177 @@ class I18nSyncTool:
                 print("\n\n退出程序")
                 sys.exit(0)
     
-    def git_operations(self, project: Dict) -> bool:
-        """执行 Git 操作"""
+    def repo_lock(self, language_path: Path) -> threading.Lock:
+        """同一个仓库同一时间只执行一组 Git 操作"""
+        key = os.path.realpath(language_path)
+        with self._repo_locks_guard:
+            return self._repo_locks.setdefault(key, threading.Lock())
+    
+    def git_operations(self, project: Dict, log: List[str] = None) -> bool:
+        """
+        执行 Git 操作
+        
+        通过 cwd 指定仓库而不是 os.chdir，可以在多个线程中并发执行；
+        传入 log 时输出写入 log，由调用方统一打印，避免并发输出交错
+        """
+        emit = print if log is None else log.append
+        
         # 检查是否启用 Git 操作
         if not self.sync_config.get("enable_git_operations", True):
-            print(f"⚠️  Git 操作已禁用，跳过: {project['name']}")
+            emit(f"⚠️  Git 操作已禁用，跳过: {project['name']}")
             return True
         
-        language_path = project.get("language_path")
+        if project.get("remote"):
+            return self.update_clone_cache(project, log)
+        
+        language_path = Path(project.get("language_path"))
         
-        if not Path(language_path).exists():
-            print(f"❌ 语言项目不存在: {language_path}")
+        if not language_path.exists():
+            emit(f"❌ 语言项目不存在: {language_path}")
             return False
         
-        print(f"\n🔧 执行 Git 操作: {project['name']}")
-        print(f"   路径: {language_path}")
+        emit(f"\n🔧 执行 Git 操作: {project['name']}")
+        emit(f"   路径: {language_path}")
+        
+        # 检查是否为 Git 仓库
+        if not (language_path / ".git").exists():
+            emit(f"⚠️  不是 Git 仓库: {project['name']}")
+            return True
+        
+        timeout = self.git_config.get("timeout", 300)
+        show_git_output = self.git_config.get("show_git_output", False)
         
         try:
-            # 切换到项目目录
-            original_dir = os.getcwd()
-            os.chdir(language_path)
-            
-            # 检查是否为 Git 仓库
-            if not Path(".git").exists():
-                print(f"⚠️  不是 Git 仓库: {project['name']}")
-                return True
-            
-            # 获取当前分支
-            result = subprocess.run(
-                ["git", "branch", "--show-current"], 
-                capture_output=True, 
-                text=True, 
-                check=True,
-                timeout=self.git_config.get("timeout", 300)
-            )
-            current_branch = result.stdout.strip()
-            print(f"   当前分支: {current_branch}")
-            
-            # 切换到默认分支
-            default_branch = self.git_config.get("default_branch", "main")
-            if current_branch != default_branch:
-                print(f"   🔄 切换到 {default_branch} 分支...")
-                checkout_cmd = ["git", "checkout", default_branch]
-                if self.git_config.get("force_checkout", False):
-                    checkout_cmd.append("-f")
-                subprocess.run(checkout_cmd, check=True, timeout=self.git_config.get("timeout", 300))
-                print(f"   ✅ 已切换到 {default_branch} 分支")
-            
-            # 执行 git fetch
-            print(f"   📥 执行 git fetch...")
-            result = subprocess.run(
-                ["git", "fetch"], 
-                capture_output=not self.git_config.get("show_git_output", False), 
-                text=True, 
-                check=True,
-                timeout=self.git_config.get("timeout", 300)
-            )
-            print(f"   ✅ git fetch 成功")
-            
-            # 执行 git pull
-            print(f"   📥 执行 git pull...")
-            result = subprocess.run(
-                ["git", "pull"], 
-                capture_output=not self.git_config.get("show_git_output", False), 
-                text=True, 
-                check=True,
-                timeout=self.git_config.get("timeout", 300)
-            )
-            print(f"   ✅ git pull 成功")
-            
-            # 返回原目录
-            os.chdir(original_dir)
+            with self.repo_lock(language_path):
+                with self.recorder.span("git.checkout"):
+                    # 获取当前分支
+                    current_branch = git(language_path, "branch", "--show-current", timeout=timeout).strip()
+                    emit(f"   当前分支: {current_branch}")
+                    
+                    # 切换到默认分支
+                    default_branch = self.git_config.get("default_branch", "main")
+                    if current_branch != default_branch:
+                        emit(f"   🔄 切换到 {default_branch} 分支...")
+                        checkout_args = ["checkout", default_branch]
+                        if self.git_config.get("force_checkout", False):
+                            checkout_args.append("-f")
+                        git(language_path, *checkout_args, timeout=timeout)
+                        emit(f"   ✅ 已切换到 {default_branch} 分支")
+                
+                # 执行 git fetch
+                emit(f"   📥 执行 git fetch...")
+                with self.recorder.span("git.fetch"):
+                    output = git(language_path, "fetch", timeout=timeout)
+                if show_git_output and output.strip():
+                    emit(output.rstrip())
+                emit(f"   ✅ git fetch 成功")
+                
+                # 执行 git pull
+                emit(f"   📥 执行 git pull...")
+                with self.recorder.span("git.pull"):
+                    output = git(language_path, "pull", timeout=timeout)
+                if show_git_output and output.strip():
+                    emit(output.rstrip())
+                emit(f"   ✅ git pull 成功")
             return True
             
         except subprocess.TimeoutExpired:
-            print(f"❌ Git 操作超时: {project['name']}")
-            os.chdir(original_dir)
+            emit(f"❌ Git 操作超时: {project['name']}")
             return False
         except subprocess.CalledProcessError as e:
-            print(f"❌ Git 操作失败: {e}")
+            emit(f"❌ Git 操作失败: {e}")
             if e.stderr:
-                print(f"   错误输出: {e.stderr}")
-            os.chdir(original_dir)
+                emit(f"   错误输出: {e.stderr}")
             return False
         except Exception as e:
-            print(f"❌ Git 操作异常: {e}")
-            os.chdir(original_dir)
+            emit(f"❌ Git 操作异常: {e}")
             return False
     
-    def find_json_files(self, source_path: Path) -> List[Path]:
-        """查找所有指定扩展名的文件"""
-        files = []
+    def update_clone_cache(self, project: Dict, log: List[str] = None) -> bool:
+        """
+        创建或更新工具管理的工作区
+        
+        默认是独立的缓存克隆（blobless + shallow + sparse，只检出语言文件）；
+        设置了 GIT_CONFIG["mirror_dir"] 时是共享镜像的 worktree，镜像每次运行只 fetch 一次
+        """
+        emit = print if log is None else log.append
+        default_branch = self.git_config.get("default_branch", "main")
+        extensions = self.sync_config.get("file_extensions", [".json"])
+        
+        emit(f"\n🔧 更新{'镜像工作区' if self.mirrors else '缓存克隆'}: {project['name']}")
+        emit(f"   远程: {project['remote']}")
+        emit(f"   路径: {project['language_path']}")
+        
+        try:
+            if self.mirrors:
+                with self.repo_lock(project["language_path"]), self.recorder.span("git.mirror"):
+                    heads = self.mirrors.ensure_worktree(
+                        project["remote"], project["language_path"], default_branch, extensions
+                    )
+            else:
+                with self.repo_lock(project["language_path"]), self.recorder.span("git.clone_cache"):
+                    heads = ensure_clone(
+                        project["remote"],
+                        project["language_path"],
+                        default_branch,
+                        extensions,
+                        timeout=self.git_config.get("timeout", 300)
+                    )
+        except subprocess.TimeoutExpired:
+            emit(f"❌ Git 操作超时: {project['name']}")
+            return False
+        except subprocess.CalledProcessError as e:
+            emit(f"❌ Git 操作失败: {e}")
+            if e.stderr:
+                emit(f"   错误输出: {e.stderr}")
+            return False
+        
+        if heads["before"] is None:
+            emit(f"   ✅ {'工作区已创建' if self.mirrors else '克隆完成'}: {heads['after'][:10]}")
+        elif heads["before"] == heads["after"]:
+            emit(f"   ✅ 无新提交: {heads['after'][:10]}")
+        else:
+            emit(f"   ✅ 已更新: {heads['before'][:10]} → {heads['after'][:10]}")
+        return True
+    
+    def has_sync_extension(self, file_name: str) -> bool:
+        """文件扩展名是否需要同步"""
+        return os.path.splitext(file_name)[1] in self.extensions
+    
+    def should_sync(self, relative_path: str) -> bool:
+        """相对源路径的文件扩展名匹配且不在忽略列表中"""
+        return (self.has_sync_extension(os.path.basename(relative_path))
+                and not self.ignore_matcher.match(relative_path))
+    
+    def find_json_files(self, source_path: Path) -> Iterator[Path]:
+        """
+        查找所有指定扩展名的文件
+        
+        基于 os.scandir 剪枝遍历：被忽略的目录（如 .git、node_modules）不会进入，
+        结果以生成器逐个产出，复制可以在扫描结束前开始
+        """
         if Path(source_path).exists():
-            extensions = self.sync_config.get("file_extensions", [".json"])
-            ignore_patterns = self.sync_config.get("ignore_patterns", [])
-
             print(f"   📁 查找 JSON 文件: {source_path}")
             
-            for file_path in Path(source_path).rglob("*"):
-                if file_path.is_file():
-                    # 检查文件扩展名
-                    if any(file_path.suffix == ext for ext in extensions):
-                        # 检查是否在忽略列表中
-                        should_ignore = False
-                        for pattern in ignore_patterns:
-                            if pattern in str(file_path):
-                                should_ignore = True
-                                break
-                        
-                        if not should_ignore:
-                            files.append(file_path)
-        
-        return files
-    
-    def sync_json_files(self, source_path: Path, target_path: Path) -> Dict[str, int]:
-        """同步 JSON 文件"""
+            for _, entry in scan_tree(source_path, self.ignore_matcher, self.has_sync_extension):
+                yield Path(entry.path)
+    
+    def target_paths(self, project: Dict) -> List[Path]:
+        """项目的所有目标路径（target_path 可以是字符串或列表）"""
+        target_path = project.get("target_path")
+        if not target_path:
+            return []
+        if isinstance(target_path, (str, Path)):
+            return [Path(target_path)]
+        return [Path(path) for path in target_path]
+    
+    def sync_json_files(self, source_path: Path, target_paths: List[Path]) -> Dict[str, int]:
+        """
+        同步 JSON 文件
+        
+        源目录只扫描一次，每个文件的复制任务依次写入所有目标路径，
+        返回所有目标合计的统计，多个目标时分别输出每个目标的结果
+        """
         stats = {"success": 0, "failed": 0, "skipped": 0}
         
         if not Path(source_path).exists():
@@ -217,68 +338,645 @@ class I18nSyncTool:
             stats["skipped"] += 1
             return stats
         
-        json_files = self.find_json_files(source_path)
-        
-        if not json_files:
-            print(f"⚠️  未找到 JSON 文件: {source_path}")
-            stats["skipped"] += 1
-            return stats
+        workers = max(1, self.sync_config.get("copy_workers", DEFAULT_COPY_WORKERS))
+        multiple = len(target_paths) > 1
+        target_stats = [{"success": 0, "failed": 0, "skipped": 0, "unchanged": 0} for _ in target_paths]
+        created_dirs = set()
+        lines = []
         
-        print(f"   📁 找到 {len(json_files)} 个 JSON 文件")
-        
-        for json_file in json_files:
-            try:
+        with self.recorder.span("copy") as span, ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            # 边扫描边提交复制任务（scan 阶段只统计遍历本身的耗时）
+            for json_file in self.recorder.timed_iter("scan", self.find_json_files(source_path)):
                 # 计算相对路径
                 relative_path = json_file.relative_to(source_path)
-                target_file = target_path / relative_path
+                target_files = [target_path / relative_path for target_path in target_paths]
                 
-                # 确保目标目录存在
-                target_file.parent.mkdir(parents=True, exist_ok=True)
+                # 每个目标目录只创建一次
+                for target_file in target_files:
+                    if target_file.parent not in created_dirs:
+                        created_dirs.add(target_file.parent)
+                        try:
+                            target_file.parent.mkdir(parents=True, exist_ok=True)
+                        except OSError as e:
+                            lines.append(f"   ❌ 创建目录失败 {target_file.parent}: {e}")
                 
                 # 复制文件
-                shutil.copy2(json_file, target_file)
-                print(f"   ✅ {relative_path}")
-                stats["success"] += 1
+                futures[executor.submit(self.transfer_file, json_file, target_files)] = relative_path
+            
+            for future in as_completed(futures):
+                relative_path = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [e] * len(target_paths)
+                
+                for target_path, result, counts in zip(target_paths, results, target_stats):
+                    label = f"{relative_path} → {target_path}" if multiple else f"{relative_path}"
+                    if isinstance(result, Exception):
+                        lines.append(f"   ❌ {label}: {result}")
+                        counts["failed"] += 1
+                        continue
+                    detail, size = result
+                    if detail is None:
+                        counts["unchanged"] += 1
+                    else:
+                        lines.append(f"   ✅ {label}" + (f" ({detail})" if detail else ""))
+                        span.files += 1
+                        span.bytes += size
+                    counts["success"] += 1
                 
+                # 结果按批输出，避免每个文件一次 print
+                if len(lines) >= OUTPUT_BATCH_SIZE:
+                    print("\n".join(lines))
+                    lines.clear()
+        
+        if lines:
+            print("\n".join(lines))
+        
+        if not futures:
+            print(f"⚠️  未找到 JSON 文件: {source_path}")
+            stats["skipped"] += 1
+            return stats
+        
+        self.print_target_stats(target_paths, target_stats, stats)
+        print(f"   📁 共 {len(futures)} 个 JSON 文件")
+        return stats
+    
+    def print_target_stats(self, target_paths: List[Path], target_stats: List[Dict[str, int]],
+                           stats: Dict[str, int]):
+        """输出每个目标路径的结果，并累加到项目统计中"""
+        for target_path, counts in zip(target_paths, target_stats):
+            if len(target_paths) > 1:
+                print(f"   🎯 {target_path}: 成功 {counts['success']}, 失败 {counts['failed']}, "
+                      f"内容未变化 {counts['unchanged']}")
+            elif counts["unchanged"]:
+                print(f"   ⏭️  内容未变化: {counts['unchanged']} 个文件")
+            for key in ("success", "failed", "skipped"):
+                stats[key] += counts[key]
+    
+    def merge_into(self, target_file: Path, source_bytes: bytes) -> Tuple[str, int]:
+        """
+        键级合并写入目标文件
+        
+        返回 (键级差异摘要, 写入字节数)；合并结果与目标文件字节一致、没有写入时摘要为 None
+        """
+        try:
+            target_bytes = target_file.read_bytes()
+        except FileNotFoundError:
+            write_file_atomic(target_file, source_bytes)
+            return "新文件", len(source_bytes)
+        
+        merged, delta = merge_json(source_bytes, target_bytes)
+        if merged is None:
+            return None, 0
+        write_file_atomic(target_file, merged)
+        return format_delta(delta), len(merged)
+    
+    def transfer_file(self, source_file: Path, target_files: List[Path]) -> List:
+        """
+        复制阶段的单个文件任务（在工作线程中执行），把一个源文件写入所有目标
+        
+        每个目标返回 (说明, 写入字节数)：普通模式整文件复制，说明为空字符串；
+        merge 模式源文件只读取一次，说明为键级差异摘要，没有写入时为 None。
+        某个目标失败时对应位置为异常对象，不影响其他目标
+        """
+        source_bytes = source_file.read_bytes() if self.merge else None
+        results = []
+        for target_file in target_files:
+            try:
+                if not self.merge:
+                    self.copy_engine.copy(source_file, target_file)
+                    results.append(("", target_file.stat().st_size))
+                else:
+                    results.append(self.merge_into(target_file, source_bytes))
             except Exception as e:
-                print(f"   ❌ {relative_path}: {e}")
-                stats["failed"] += 1
+                results.append(e)
+        return results
+    
+    def fetch_objects(self, project: Dict, log: List[str] = None) -> str:
+        """
+        对象库模式的 Git 阶段：只执行 git fetch 并解析 origin/<默认分支>
+        
+        不切换分支也不修改语言项目的工作区，返回提交 ID，失败返回 None
+        """
+        emit = print if log is None else log.append
+        language_path = Path(project.get("language_path"))
+        default_branch = self.git_config.get("default_branch", "main")
+        timeout = self.git_config.get("timeout", 300)
+        
+        if project.get("remote"):
+            # 缓存克隆更新时已经 fetch 过
+            if not self.update_clone_cache(project, log):
+                return None
+        elif not language_path.exists():
+            emit(f"❌ 语言项目不存在: {language_path}")
+            return None
+        
+        emit(f"\n🔧 从 Git 对象库同步: {project['name']}")
+        emit(f"   路径: {language_path}")
+        
+        try:
+            if self.sync_config.get("enable_git_operations", True) and not project.get("remote"):
+                emit(f"   📥 执行 git fetch origin {default_branch}...")
+                with self.repo_lock(language_path), self.recorder.span("git.fetch"):
+                    git(language_path, "fetch", "origin", default_branch, timeout=timeout)
+            commit = resolve_ref(language_path, f"origin/{default_branch}", timeout=timeout)
+        except subprocess.TimeoutExpired:
+            emit(f"❌ Git 操作超时: {project['name']}")
+            return None
+        except subprocess.CalledProcessError as e:
+            emit(f"❌ Git 操作失败: {e}")
+            if e.stderr:
+                emit(f"   错误输出: {e.stderr}")
+            return None
+        
+        emit(f"   📌 origin/{default_branch}: {commit[:10]}")
+        return commit
+    
+    def sync_from_objects(self, project: Dict, target_paths: List[Path], commit: str) -> Dict[str, int]:
+        """
+        直接从 Git 对象库同步 JSON 文件
+        
+        git ls-tree 列出提交中的文件，内容与目标文件不同的文件
+        通过一个 git cat-file --batch 进程读取一次，再并发写入所有需要更新的目标路径
+        """
+        stats = {"success": 0, "failed": 0, "skipped": 0}
+        language_path = Path(project.get("language_path"))
+        multiple = len(target_paths) > 1
+        
+        try:
+            with self.recorder.span("scan") as span:
+                tree = list_tree(
+                    language_path, commit,
+                    include=self.should_sync,
+                    timeout=self.git_config.get("timeout", 300)
+                )
+                span.files = len(tree)
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
+            print(f"❌ 读取提交失败: {e}")
+            stats["skipped"] += 1
+            return stats
+        
+        if not tree:
+            print(f"⚠️  未找到 JSON 文件: {project['name']} @ {commit[:10]}")
+            stats["skipped"] += 1
+            return stats
+        
+        print(f"   📁 找到 {len(tree)} 个 JSON 文件")
+        
+        # 对象 ID 与目标文件内容一致的文件不需要写入
+        target_stats = [{"success": 0, "failed": 0, "skipped": 0, "unchanged": 0} for _ in target_paths]
+        to_write: Dict[str, List[int]] = {}
+        for relative_path, oid in tree.items():
+            for index, target_path in enumerate(target_paths):
+                target_file = target_path / relative_path
+                if target_file.is_file() and blob_id(target_file) == oid:
+                    target_stats[index]["success"] += 1
+                    target_stats[index]["unchanged"] += 1
+                else:
+                    to_write.setdefault(relative_path, []).append(index)
         
+        if to_write:
+            with self.recorder.span("copy") as span, BlobReader(language_path) as reader, \
+                    ThreadPoolExecutor(max_workers=len(target_paths)) as executor:
+                for relative_path, indices in to_write.items():
+                    try:
+                        data = reader.read(tree[relative_path])
+                    except Exception as e:
+                        results = [e] * len(indices)
+                    else:
+                        results = list(executor.map(
+                            lambda index: self.write_object(target_paths[index] / relative_path, data),
+                            indices
+                        ))
+                    
+                    for index, result in zip(indices, results):
+                        label = f"{relative_path} → {target_paths[index]}" if multiple else relative_path
+                        counts = target_stats[index]
+                        if isinstance(result, Exception):
+                            print(f"   ❌ {label}: {result}")
+                            counts["failed"] += 1
+                            continue
+                        detail, size = result
+                        if detail is None:
+                            counts["unchanged"] += 1
+                        else:
+                            print(f"   ✅ {label}" + (f" ({detail})" if detail else ""))
+                            span.files += 1
+                            span.bytes += size
+                        counts["success"] += 1
+        
+        self.print_target_stats(target_paths, target_stats, stats)
         return stats
     
+    def transfer_object(self, data: bytes, target_files: List[Path]) -> List:
+        """把从对象库读取的内容写入所有目标（在工作线程中执行），返回值同 transfer_file"""
+        return [self.write_object(target_file, data) for target_file in target_files]
+    
+    def write_object(self, target_file: Path, data: bytes):
+        """
+        把从对象库读取的内容写入一个目标文件（在工作线程中执行）
+        
+        返回值同 transfer_file 的单个目标结果，失败时返回异常对象
+        """
+        try:
+            if not self.merge:
+                write_file_atomic(target_file, data)
+                return "", len(data)
+            return self.merge_into(target_file, data)
+        except Exception as e:
+            return e
+    
+    def git_stage(self, project: Dict, log: List[str]) -> Dict:
+        """
+        Git 阶段：判断项目是否需要同步，并更新源仓库（可在工作线程中并发执行）
+        
+        返回 {"stats": ..., "commit": ...}；stats 不为 None 表示项目已结束（跳过或失败），
+        否则进入复制阶段
+        """
+        with self.recorder.project(project["name"]):
+            target_paths = self.target_paths(project)
+            if not target_paths:
+                log.append(f"❌ 未配置目标路径: {project['name']}")
+                return {"stats": {"success": 0, "failed": 0, "skipped": 1}, "commit": None}
+            
+            # 快速路径：远程提交和所有目标目录都没有变化时整个项目跳过
+            if self.is_up_to_date(project, target_paths, log):
+                return {"stats": {"success": 0, "failed": 0, "skipped": 0}, "commit": None}
+            
+            if self.sync_mode == "object":
+                commit = self.fetch_objects(project, log)
+                if commit is None:
+                    return {"stats": {"success": 0, "failed": 0, "skipped": 1}, "commit": None}
+                return {"stats": None, "commit": commit}
+            
+            # 执行 Git 操作
+            if not self.git_operations(project, log):
+                log.append(f"❌ Git 操作失败，跳过同步: {project['name']}")
+                return {"stats": {"success": 0, "failed": 0, "skipped": 1}, "commit": None}
+            return {"stats": None, "commit": None}
+    
+    def copy_stage(self, project: Dict, prepared: Dict) -> Dict[str, int]:
+        """复制阶段：把源仓库中的 JSON 文件同步到目标路径"""
+        with self.recorder.project(project["name"]):
+            source_path = Path(project.get("language_path"))
+            target_paths = self.target_paths(project)
+            
+            if self.sync_mode == "object":
+                stats = self.sync_from_objects(project, target_paths, prepared["commit"])
+            else:
+                # 同步 JSON 文件
+                print(f"\n📂 同步 JSON 文件:")
+                print(f"   源路径: {source_path}")
+                for target_path in target_paths:
+                    print(f"   目标路径: {target_path}")
+            
+                stats = self.sync_json_files(source_path, target_paths)
+            
+            self.print_project_stats(stats)
+            self.record_sync_state(project, target_paths, stats)
+            return stats
+    
     def sync_language_project(self, project: Dict) -> Dict[str, int]:
         """同步单个语言项目"""
         print(f"\n🔄 开始同步: {project['name']}")
         print("=" * 60)
         
-        # 获取源路径和目标路径
-        source_path = project.get("language_path")
-        target_path_str = project.get("target_path")
+        log = []
+        prepared = self.git_stage(project, log)
+        if log:
+            print("\n".join(log))
+        if prepared["stats"] is not None:
+            return prepared["stats"]
+        return self.copy_stage(project, prepared)
+    
+    def sync_projects(self, projects: List[Dict]) -> Dict[str, int]:
+        """
+        以流水线方式同步多个项目
+        
+        所有项目的 Git 阶段在线程池中并发执行（GIT_CONFIG["workers"] 个线程，
+        每个命令受 GIT_CONFIG["timeout"] 限制）；哪个项目的 Git 阶段先完成，
+        就先在主线程中执行它的复制阶段，同时其他项目的 Git 阶段继续进行
+        """
+        total_stats = {"success": 0, "failed": 0, "skipped": 0}
+        workers = max(1, self.git_config.get("workers", DEFAULT_GIT_WORKERS))
+        if self.mirrors:
+            self.mirrors.start_run()
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="git") as executor:
+            futures = {}
+            for project in projects:
+                log = []
+                futures[executor.submit(self.git_stage, project, log)] = (project, log)
+            
+            for future in as_completed(futures):
+                project, log = futures[future]
+                print(f"\n🔄 开始同步: {project['name']}")
+                print("=" * 60)
+                
+                try:
+                    prepared = future.result()
+                except Exception as e:
+                    log.append(f"❌ Git 操作异常: {e}")
+                    prepared = {"stats": {"success": 0, "failed": 0, "skipped": 1}, "commit": None}
+                if log:
+                    print("\n".join(log))
+                
+                stats = prepared["stats"]
+                if stats is None:
+                    stats = self.copy_stage(project, prepared)
+                total_stats["success"] += stats["success"]
+                total_stats["failed"] += stats["failed"]
+                total_stats["skipped"] += stats["skipped"]
+        
+        return total_stats
+    
+    def target_fingerprint(self, target_paths: List[Path]) -> str:
+        """所有目标目录中同步文件的 stat 指纹，有目标目录不存在时返回 None"""
+        fingerprints = [
+            tree_fingerprint(target_path, self.ignore_matcher, self.has_sync_extension)
+            for target_path in target_paths
+        ]
+        if None in fingerprints:
+            return None
+        return ",".join(fingerprints)
+    
+    def ls_remote(self, project: Dict) -> str:
+        """用一次 git ls-remote 获取远程默认分支的提交，失败返回 None"""
+        default_branch = self.git_config.get("default_branch", "main")
+        language_path = Path(project.get("language_path"))
+        try:
+            output = git(
+                language_path if language_path.exists() else None,
+                "ls-remote", project.get("remote") or "origin", f"refs/heads/{default_branch}",
+                timeout=self.git_config.get("timeout", 300)
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+            return None
+        fields = output.split()
+        return fields[0] if fields else None
+    
+    def is_up_to_date(self, project: Dict, target_paths: List[Path], log: List[str] = None) -> bool:
+        """远程提交与上次同步的提交一致，且所有目标目录指纹都没有变化"""
+        emit = print if log is None else log.append
+        state = self.sync_state.get(project["name"])
+        if self.force or not state or not self.sync_config.get("enable_git_operations", True):
+            return False
+        
+        with self.recorder.span("validate"):
+            remote_commit = self.ls_remote(project)
+            up_to_date = remote_commit is not None and remote_commit == state.get("commit")
+            fingerprint_changed = up_to_date and self.target_fingerprint(target_paths) != state.get("fingerprint")
+        if not up_to_date:
+            return False
+        
+        if fingerprint_changed:
+            emit(f"   ⚠️  目标目录在上次同步后有变化，重新同步")
+            return False
+        
+        emit(f"⏭️  已是最新: {remote_commit[:10]}，跳过 fetch / pull / 扫描 / 复制")
+        return True
+    
+    def record_sync_state(self, project: Dict, target_paths: List[Path], stats: Dict[str, int]):
+        """同步完全成功后记录源提交和目标目录指纹，否则清除记录"""
+        if stats["failed"] or stats["skipped"] or not self.sync_config.get("enable_git_operations", True):
+            self.sync_state.forget(project["name"])
+            return
+        
+        default_branch = self.git_config.get("default_branch", "main")
+        ref = f"origin/{default_branch}" if self.sync_mode == "object" else "HEAD"
+        with self.recorder.span("state"):
+            try:
+                commit = resolve_ref(project.get("language_path"), ref)
+            except (subprocess.CalledProcessError, OSError):
+                self.sync_state.forget(project["name"])
+                return
+            self.sync_state.update(project["name"], commit, self.target_fingerprint(target_paths))
+    
+    def plan_projects(self, projects: List[Dict]) -> Dict:
+        """
+        生成同步计划：不执行 Git 操作，只读取源仓库当前的内容，与每个目标路径比较
+        
+        worktree 模式扫描工作区，目标文件不存在为新增，大小或 mtime 不同为更新（复制会保留 mtime）；
+        object 模式读取 origin/<默认分支>（上一次 fetch 的结果），按 blob 对象 ID 比较，执行时从对象库读取。
+        merge 模式写入的文件没有源文件的 mtime，改为逐个文件做一次键级合并，合并结果与目标一致时为未变化。
+        本工具不删除目标文件
+        """
+        items = []
+        skipped = []
+        for project in projects:
+            source_path = Path(project.get("language_path"))
+            target_paths = self.target_paths(project)
+            if not target_paths or not source_path.is_dir():
+                print(f"⚠️  跳过 {project['name']}: " + ("未配置目标路径" if not target_paths else f"源路径不存在: {source_path}"))
+                skipped.append(project["name"])
+                continue
+            
+            if self.sync_mode == "object":
+                project_items = self.plan_objects(project, source_path, target_paths)
+            else:
+                project_items = self.plan_worktree(project, source_path, target_paths)
+            if project_items is None:
+                skipped.append(project["name"])
+                continue
+            items.extend(project_items)
+        
+        return build_plan(
+            PLAN_TOOL, items, load_samples(self.recorder.run_log),
+            merge=self.merge, sync_mode=self.sync_mode, skipped=skipped,
+        )
+    
+    def plan_worktree(self, project: Dict, source_path: Path, target_paths: List[Path]) -> List[Dict]:
+        """worktree 模式的计划：对工作区做一次 stat 遍历，每个目标路径一项"""
+        files = [
+            (relative_path, entry.stat(follow_symlinks=False))
+            for relative_path, entry in scan_tree(source_path, self.ignore_matcher, self.has_sync_extension)
+        ]
+        print(f"🔍 {project['name']}: {len(files)} 个 JSON 文件")
         
-        if not target_path_str:
-            print(f"❌ 未配置目标路径: {project['name']}")
-            return {"success": 0, "failed": 0, "skipped": 1}
+        deltas = [empty_delta() for _ in target_paths]
+        for relative_path, stat in files:
+            # merge 模式每个源文件只读取一次
+            source_bytes = (source_path / relative_path).read_bytes() if self.merge else None
+            for target_path, delta in zip(target_paths, deltas):
+                target_file = target_path / relative_path
+                if self.merge:
+                    change, size = self.plan_merge(target_file, source_bytes)
+                else:
+                    try:
+                        target_stat = os.stat(target_file)
+                    except FileNotFoundError:
+                        target_stat = None
+                    if target_stat is None:
+                        change = "create"
+                    elif (stat.st_size, stat.st_mtime_ns) == (target_stat.st_size, target_stat.st_mtime_ns):
+                        change = None
+                    else:
+                        change = "update"
+                    size = stat.st_size
+                if change is None:
+                    delta["unchanged"] += 1
+                else:
+                    delta[change].append(relative_path)
+                    delta["bytes"] += size
+        return [
+            plan_item(source_path, target_path, delta, project=project["name"])
+            for target_path, delta in zip(target_paths, deltas)
+        ]
+    
+    def plan_objects(self, project: Dict, language_path: Path, target_paths: List[Path]) -> List[Dict]:
+        """
+        object 模式的计划：列出 origin/<默认分支> 中的文件，与目标文件的 blob 对象 ID 比较
         
-        target_path = Path(target_path_str)
+        每一项记录提交和需要写入的文件的对象 ID，--apply 直接从对象库读取这些对象，
+        不依赖（只 fetch、不 checkout 的）工作区。读取失败时返回 None
+        """
+        default_branch = self.git_config.get("default_branch", "main")
+        timeout = self.git_config.get("timeout", 300)
+        deltas = [empty_delta() for _ in target_paths]
+        objects: List[Dict[str, str]] = [{} for _ in target_paths]
+        try:
+            commit = resolve_ref(language_path, f"origin/{default_branch}", timeout=timeout)
+            tree = list_tree(language_path, commit, include=self.should_sync, timeout=timeout)
+            print(f"🔍 {project['name']}: {len(tree)} 个 JSON 文件 (origin/{default_branch} @ {commit[:10]})")
+            
+            with BlobReader(language_path) as reader:
+                for relative_path, oid in tree.items():
+                    data = None
+                    for index, target_path in enumerate(target_paths):
+                        target_file = target_path / relative_path
+                        if target_file.is_file() and blob_id(target_file) == oid:
+                            deltas[index]["unchanged"] += 1
+                            continue
+                        # 对象内容只在有目标需要写入时读取一次
+                        if data is None:
+                            data = reader.read(oid)
+                        if self.merge:
+                            change, size = self.plan_merge(target_file, data)
+                        else:
+                            change, size = ("update" if target_file.exists() else "create"), len(data)
+                        if change is None:
+                            deltas[index]["unchanged"] += 1
+                            continue
+                        deltas[index][change].append(relative_path)
+                        deltas[index]["bytes"] += size
+                        objects[index][relative_path] = oid
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, KeyError, OSError) as e:
+            print(f"⚠️  跳过 {project['name']}: 读取 origin/{default_branch} 失败: {e}")
+            return None
         
-        # 执行 Git 操作
-        if not self.git_operations(project):
-            print(f"❌ Git 操作失败，跳过同步: {project['name']}")
-            return {"success": 0, "failed": 0, "skipped": 1}
+        return [
+            plan_item(language_path, target_path, delta, project=project["name"], commit=commit, objects=item_objects)
+            for target_path, delta, item_objects in zip(target_paths, deltas, objects)
+        ]
+    
+    def plan_merge(self, target_file: Path, source_bytes: bytes) -> Tuple[str, int]:
+        """
+        merge 模式下一个目标文件的计划操作，不写入
+        
+        返回 (create / update，合并后目标为 None 时表示未变化, 将写入的字节数)
+        """
+        try:
+            target_bytes = target_file.read_bytes()
+        except FileNotFoundError:
+            return "create", len(source_bytes)
+        try:
+            merged, _ = merge_json(source_bytes, target_bytes)
+        except ValueError:
+            # 源文件不是合法 JSON，执行时会报告这个文件失败
+            return "update", len(source_bytes)
+        if merged is None:
+            return None, 0
+        return "update", len(merged)
+    
+    def print_plan(self, plan: Dict):
+        """输出计划中每个目标路径的操作数、合计和估算耗时"""
+        print(f"\n📋 同步计划:")
+        for item in plan["items"]:
+            counts = item["counts"]
+            print(f"   {item['project']} → {item['target']}: 新增 {counts['create']}, 更新 {counts['update']}, "
+                  f"未变化 {counts['unchanged']}, {format_bytes(item['bytes'])}")
+        totals = plan["totals"]
+        print(f"📊 合计: 新增 {totals['create']}, 更新 {totals['update']}, 未变化 {totals['unchanged']}, "
+              f"需要复制 {format_bytes(totals['bytes'])}")
+        print(f"⏱️  预计耗时: {format_estimate(plan)}")
+    
+    def apply_plan(self, plan: Dict) -> Dict[str, int]:
+        """
+        按保存的计划复制文件，不执行 Git 操作也不重新扫描
         
-        # 同步 JSON 文件
-        print(f"\n📂 同步 JSON 文件:")
-        print(f"   源路径: {source_path}")
-        print(f"   目标路径: {target_path}")
+        每个计划项只处理其中列出的新增 / 更新文件，merge 模式沿用计划生成时的设置；
+        object 模式的计划项按记录的对象 ID 从对象库读取，不读取工作区
+        """
+        self.merge = plan.get("merge", self.merge)
+        total_stats = {"success": 0, "failed": 0, "skipped": 0}
+        workers = max(1, self.sync_config.get("copy_workers", DEFAULT_COPY_WORKERS))
+        print(f"▶️  执行同步计划 (生成于 {plan.get('created_at')})")
+        print(f"⏱️  预计耗时: {format_estimate(plan)}")
         
-        stats = self.sync_json_files(source_path, target_path)
+        for item in plan["items"]:
+            source_path, target_path = Path(item["source"]), Path(item["target"])
+            relative_paths = item["delta"]["create"] + item["delta"]["update"]
+            counts = {"success": 0, "failed": 0, "skipped": 0}
+            # object 模式的计划项记录了对象 ID，从对象库读取计划生成时的内容
+            objects = item.get("objects")
+            with self.recorder.project(item["project"]), self.recorder.span("copy") as span, \
+                    ThreadPoolExecutor(max_workers=workers) as executor, \
+                    (BlobReader(source_path) if objects is not None else contextlib.nullcontext()) as reader:
+                futures = {}
+                for relative_path in relative_paths:
+                    target_file = target_path / relative_path
+                    try:
+                        target_file.parent.mkdir(parents=True, exist_ok=True)
+                    except OSError as e:
+                        print(f"   ❌ 创建目录失败 {target_file.parent}: {e}")
+                    if reader is None:
+                        future = executor.submit(self.transfer_file, source_path / relative_path, [target_file])
+                    else:
+                        try:
+                            data = reader.read(objects[relative_path])
+                        except Exception as e:
+                            print(f"   ❌ {relative_path} → {target_path}: {e}")
+                            counts["failed"] += 1
+                            continue
+                        future = executor.submit(self.transfer_object, data, [target_file])
+                    futures[future] = relative_path
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()[0]
+                    except Exception as e:
+                        result = e
+                    if isinstance(result, Exception):
+                        print(f"   ❌ {futures[future]} → {target_path}: {result}")
+                        counts["failed"] += 1
+                        continue
+                    detail, size = result
+                    if detail is not None:
+                        span.files += 1
+                        span.bytes += size
+                    counts["success"] += 1
+            print(f"✅ {item['project']} → {target_path}: 成功 {counts['success']}, 失败 {counts['failed']}")
+            for key in total_stats:
+                total_stats[key] += counts[key]
         
+        print(f"📊 总体统计:")
+        print(f"   ✅ 成功: {total_stats['success']}")
+        print(f"   ❌ 失败: {total_stats['failed']}")
+        copy_lines = self.copy_engine.summary_lines()
+        if copy_lines:
+            print(f"📦 文件复制 (策略: {self.copy_engine.strategy}):")
+            for line in copy_lines:
+                print(f"   {line}")
+        self.recorder.write_run_log(total_stats)
+        return total_stats
+    
+    def print_project_stats(self, stats: Dict[str, int]):
+        """显示单个项目的同步结果"""
         print(f"\n📊 同步结果:")
         print(f"   ✅ 成功: {stats['success']}")
         print(f"   ❌ 失败: {stats['failed']}")
         print(f"   ⚠️  跳过: {stats['skipped']}")
-        
-        return stats
     
     def run(self, selected_projects: List[Dict] = None):
         """运行同步工具"""
@@ -316,13 +1014,7 @@ class I18nSyncTool:
             return
         
         # 执行同步
-        total_stats = {"success": 0, "failed": 0, "skipped": 0}
-        
-        for project in selected_projects:
-            stats = self.sync_language_project(project)
-            total_stats["success"] += stats["success"]
-            total_stats["failed"] += stats["failed"]
-            total_stats["skipped"] += stats["skipped"]
+        total_stats = self.sync_projects(selected_projects)
         
         # 显示总结
         print("\n" + "=" * 60)
@@ -332,6 +1024,19 @@ class I18nSyncTool:
         print(f"   ❌ 失败: {total_stats['failed']}")
         print(f"   ⚠️  跳过: {total_stats['skipped']}")
         
+        copy_lines = self.copy_engine.summary_lines()
+        if copy_lines:
+            print(f"📦 文件复制 (策略: {self.copy_engine.strategy}):")
+            for line in copy_lines:
+                print(f"   {line}")
+        
+        timing_lines = self.recorder.summary_lines()
+        if timing_lines:
+            print(f"⏱️  阶段耗时:")
+            for line in timing_lines:
+                print(f"   {line}")
+        self.recorder.write_run_log(total_stats)
+        
         if total_stats["failed"] == 0:
             print("🎉 所有文件同步成功!")
         elif total_stats["success"] > 0:
@@ -356,6 +1061,46 @@ def main():
         action="store_true",
         help="列出所有可用的语言项目"
     )
+    parser.add_argument(
+        "--mode",
+        choices=SYNC_MODES,
+        help="同步模式: worktree 切换分支并拉取后从工作区复制; object 只 fetch 并直接从 Git 对象库读取 (默认: GIT_CONFIG['sync_mode'] 或 worktree)"
+    )
+    parser.add_argument(
+        "--copy-strategy",
+        choices=STRATEGIES,
+        help="文件复制策略: reflink / hardlink / kernel / buffered，auto 自动检测 (默认: SYNC_CONFIG['copy_strategy'] 或 auto)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="忽略上次同步记录，强制执行 fetch / pull / 扫描 / 复制"
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        default=None,
+        help="键级合并模式: 只改写键有差异的文件，保持目标文件的键顺序和格式 (默认: SYNC_CONFIG['merge_mode'])"
+    )
+    parser.add_argument(
+        "--plan",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="只生成同步计划 (JSON) 不执行 Git 操作和复制: 新增 / 更新 / 未变化的文件数、字节数和估算耗时 (object 模式比较 origin/<默认分支> 中的对象)；未指定 FILE 时输出到标准输出"
+    )
+    parser.add_argument(
+        "--apply",
+        metavar="FILE",
+        help="执行 --plan 保存的计划，不执行 Git 操作也不重新扫描"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=LOG_CONFIG.get("profile_file", DEFAULT_PROFILE_FILE),
+        metavar="FILE",
+        help="用 cProfile 运行并把统计写入文件，只覆盖主线程，Git 工作线程不计入 (默认: LOG_CONFIG['profile_file'] 或 upgrade_i18n.prof)"
+    )
     
     args = parser.parse_args()
     
@@ -364,7 +1109,13 @@ def main():
         print(f"❌ 语言项目基础路径不存在: {args.language_base_path}")
         sys.exit(1)
     
-    tool = I18nSyncTool(args.language_base_path)
+    tool = I18nSyncTool(
+        args.language_base_path,
+        sync_mode=args.mode,
+        copy_strategy=args.copy_strategy,
+        force=args.force,
+        merge=args.merge
+    )
     
     # 如果指定了 --list 参数，只显示项目列表
     if args.list:
@@ -393,8 +1144,37 @@ def main():
                     selected_projects.append(project)
                     break
     
+    if args.apply:
+        try:
+            plan = load_plan(args.apply, PLAN_TOOL)
+        except (OSError, ValueError) as e:
+            print(f"❌ 无法加载计划: {e}")
+            sys.exit(2)
+        stats = tool.apply_plan(plan)
+        sys.exit(1 if stats["failed"] else 0)
+    
+    if args.plan:
+        # 计划输出到标准输出时，进度和摘要改为输出到标准错误
+        with contextlib.redirect_stdout(sys.stderr if args.plan == "-" else sys.stdout):
+            plan = tool.plan_projects(selected_projects or tool.get_available_projects())
+            tool.print_plan(plan)
+        write_plan(plan, args.plan)
+        if args.plan != "-":
+            print(f"💾 计划已保存: {args.plan} (使用 --apply {args.plan} 执行)")
+        return
+    
     # 运行同步工具
-    tool.run(selected_projects)
+    if not args.profile:
+        tool.run(selected_projects)
+        return
+    
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(tool.run, selected_projects)
+    finally:
+        profiler.dump_stats(args.profile)
+        print(f"\n🔬 cProfile 统计已写入: {args.profile}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
 
 
 if __name__ == "__main__":
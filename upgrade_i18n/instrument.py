@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+同步过程计时
+记录每个项目各阶段（校验、git fetch / pull、扫描、复制、记录状态）的耗时、文件数和字节数，
+写入 JSONL 运行日志，并在结束时输出汇总表
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+from datetime import datetime
+
+
+# 汇总表中的列，git.* 阶段合并为一列
+SUMMARY_PHASES = ("validate", "git", "scan", "copy", "state")
+
+
+class Span:
+    """一个阶段的计时结果，files / bytes 由调用方在阶段内填写"""
+    
+    def __init__(self, project: str, phase: str):
+        self.project = project
+        self.phase = phase
+        self.seconds = 0.0
+        self.files = 0
+        self.bytes = 0
+    
+    def to_dict(self) -> Dict:
+        return {
+            "project": self.project,
+            "phase": self.phase,
+            "seconds": round(self.seconds, 6),
+            "files": self.files,
+            "bytes": self.bytes,
+        }
+
+
+class RunRecorder:
+    """收集一次运行中的所有阶段计时（线程安全）"""
+    
+    def __init__(self, run_log: Optional[str] = None):
+        self.run_log = Path(os.path.expanduser(run_log)) if run_log else None
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    @contextmanager
+    def project(self, name: str):
+        """当前线程后续的阶段都记到这个项目下"""
+        previous = getattr(self._local, "project", None)
+        self._local.project = name
+        try:
+            yield
+        finally:
+            self._local.project = previous
+    
+    @contextmanager
+    def span(self, phase: str) -> Iterator[Span]:
+        """计时一个阶段"""
+        span = Span(getattr(self._local, "project", None) or "-", phase)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - start
+            with self._lock:
+                self.spans.append(span)
+    
+    def timed_iter(self, phase: str, iterable: Iterable) -> Iterator:
+        """
+        计时一个生成器：只统计产出元素所用的时间和元素数量
+        
+        扫描与复制并行时，scan 阶段只包含真正花在遍历上的时间
+        """
+        span = Span(getattr(self._local, "project", None) or "-", phase)
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    span.seconds += time.perf_counter() - start
+                    break
+                span.seconds += time.perf_counter() - start
+                span.files += 1
+                yield item
+        finally:
+            with self._lock:
+                self.spans.append(span)
+    
+    def write_run_log(self, total_stats: Dict[str, int] = None):
+        """把本次运行的所有阶段追加写入 JSONL 运行日志"""
+        if not self.run_log:
+            return
+        base = {"run_id": self.run_id, "started_at": self.started_at}
+        self.run_log.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.run_log, "a", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps({**base, **span.to_dict()}, ensure_ascii=False) + "\n")
+            f.write(json.dumps({
+                **base,
+                "project": "*",
+                "phase": "run",
+                "seconds": round(time.perf_counter() - self.start, 6),
+                "stats": total_stats or {},
+            }, ensure_ascii=False) + "\n")
+    
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """按项目、阶段汇总 {项目: {阶段: {seconds, files, bytes}}}"""
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        with self._lock:
+            for span in self.spans:
+                phase = "git" if span.phase.startswith("git.") else span.phase
+                item = result.setdefault(span.project, {}).setdefault(
+                    phase, {"seconds": 0.0, "files": 0, "bytes": 0}
+                )
+                item["seconds"] += span.seconds
+                item["files"] += span.files
+                item["bytes"] += span.bytes
+        return result
+    
+    def summary_lines(self) -> List[str]:
+        """可直接输出的汇总表"""
+        summary = self.summary()
+        if not summary:
+            return []
+        # 中文表头每个字占两列，按显示宽度对齐
+        header = f"{'项目':<22}" + "".join(f"{phase:>10}" for phase in SUMMARY_PHASES) + f"{'文件':>6}{'字节':>10}"
+        lines = [header, "-" * (24 + 10 * len(SUMMARY_PHASES) + 20)]
+        for project, phases in summary.items():
+            row = f"{project:<24}"
+            for phase in SUMMARY_PHASES:
+                seconds = phases.get(phase, {}).get("seconds")
+                row += f"{seconds:>9.2f}s" if seconds is not None else f"{'-':>10}"
+            copy = phases.get("copy", {})
+            row += f"{int(copy.get('files', 0)):>8}{int(copy.get('bytes', 0)):>12}"
+            lines.append(row)
+        lines.append(f"总耗时: {time.perf_counter() - self.start:.2f}s")
+        return lines
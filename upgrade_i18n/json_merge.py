@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+语言文件键级合并
+用源文件的内容更新目标文件：保持目标文件中已有键的顺序，新增键按源文件顺序追加，
+删除源文件中已不存在的键，并沿用目标文件的缩进格式。整个过程对键数量是线性的。
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def empty_delta() -> Dict[str, List[str]]:
+    """键级差异：新增 / 修改 / 删除的键路径"""
+    return {"added": [], "changed": [], "removed": []}
+
+
+def merge_values(source: Any, target: Any, prefix: str, delta: Dict[str, List[str]]) -> Any:
+    """递归合并，返回合并后的值并把差异记录到 delta 中"""
+    if isinstance(source, dict) and isinstance(target, dict):
+        merged = {}
+        # 已有的键保持目标文件中的顺序
+        for key, target_value in target.items():
+            if key in source:
+                merged[key] = merge_values(source[key], target_value, f"{prefix}{key}.", delta)
+            else:
+                delta["removed"].append(f"{prefix}{key}")
+        # 新增的键按源文件中的顺序追加
+        for key, source_value in source.items():
+            if key not in target:
+                merged[key] = source_value
+                delta["added"].append(f"{prefix}{key}")
+        return merged
+    
+    if source != target or type(source) is not type(target):
+        delta["changed"].append(prefix.rstrip(".") or "(root)")
+    return source
+
+
+def detect_format(text: str) -> Dict[str, Any]:
+    """从目标文件推断 json.dumps 的格式参数"""
+    stripped = text.strip()
+    ensure_ascii = stripped.isascii() and "\\u" in stripped
+    
+    if "\n" not in stripped:
+        # 单行文件：区分 {"a": 1} 和 {"a":1}
+        compact = '":' in stripped and '": ' not in stripped
+        separators = (",", ":") if compact else (", ", ": ")
+        return {"indent": None, "separators": separators, "ensure_ascii": ensure_ascii}
+    
+    indent = 2
+    for line in stripped.splitlines()[1:]:
+        body = line.lstrip(" \t")
+        if body and len(body) < len(line):
+            whitespace = line[:len(line) - len(body)]
+            indent = whitespace if "\t" in whitespace else len(whitespace)
+            break
+    return {"indent": indent, "separators": (",", ": "), "ensure_ascii": ensure_ascii}
+
+
+def dump_like(data: Any, original_text: str) -> str:
+    """按照原文件的格式序列化，保留结尾换行"""
+    text = json.dumps(data, **detect_format(original_text))
+    if original_text.endswith("\n"):
+        text += "\n"
+    return text
+
+
+def merge_json(source_bytes: bytes, target_bytes: bytes) -> Tuple[Optional[bytes], Dict[str, List[str]]]:
+    """
+    键级合并源文件和目标文件
+    
+    返回 (合并后的内容, 键级差异)；与目标文件字节一致、不需要写入时内容为 None。
+    源文件不是合法 JSON 时抛出 ValueError；目标文件不是合法 JSON 时直接使用源文件内容。
+    """
+    source = json.loads(source_bytes.decode("utf-8"))
+    delta = empty_delta()
+    
+    try:
+        target_text = target_bytes.decode("utf-8")
+        target = json.loads(target_text)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        delta["changed"].append("(root)")
+        return source_bytes, delta
+    
+    merged = merge_values(source, target, "", delta)
+    if not any(delta.values()):
+        return None, delta
+    
+    merged_bytes = dump_like(merged, target_text).encode("utf-8")
+    if merged_bytes == target_bytes:
+        return None, delta
+    return merged_bytes, delta
+
+
+def format_delta(delta: Dict[str, List[str]]) -> str:
+    """差异摘要，如 +3 ~1 -0"""
+    return f"+{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])}"
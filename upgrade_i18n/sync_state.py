@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+同步状态存储
+按项目记录上一次成功同步的源提交和目标目录指纹，用于跳过没有变化的项目
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+from datetime import datetime
+
+# 共享模块位于仓库根目录，导入方负责加入 sys.path
+from sync_common.ignore import IgnoreMatcher, scan_tree
+
+
+def tree_fingerprint(root: Union[str, Path], matcher: IgnoreMatcher = None,
+                     include: Callable[[str], bool] = None) -> Optional[str]:
+    """
+    目标目录指纹：所有同步文件的相对路径、大小和 mtime 的哈希
+    
+    只需要一次 stat 遍历，不读取文件内容；目录不存在时返回 None
+    """
+    if not Path(root).is_dir():
+        return None
+    digest = hashlib.sha1()
+    for rel_path, entry in scan_tree(root, matcher, include):
+        stat = entry.stat(follow_symlinks=False)
+        digest.update(f"{rel_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+class SyncState:
+    """同步状态文件 (JSON)，每个项目一条记录"""
+    
+    def __init__(self, state_file: Union[str, Path]):
+        self.state_file = Path(os.path.expanduser(str(state_file)))
+        self.projects: Dict[str, Dict] = self.load()
+    
+    def load(self) -> Dict[str, Dict]:
+        """加载状态文件，不存在或损坏时返回空状态"""
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("projects", {}) if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def save(self):
+        """原子写入状态文件"""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"projects": self.projects}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.state_file)
+    
+    def get(self, name: str) -> Optional[Dict]:
+        """获取项目的上一次同步记录"""
+        return self.projects.get(name)
+    
+    def update(self, name: str, commit: str, fingerprint: Optional[str]):
+        """记录一次成功同步"""
+        self.projects[name] = {
+            "commit": commit,
+            "fingerprint": fingerprint,
+            "synced_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save()
+    
+    def forget(self, name: str):
+        """清除项目记录，下次同步时完整执行"""
+        if self.projects.pop(name, None) is not None:
+            self.save()
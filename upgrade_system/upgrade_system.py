@@ -2,20 +2,112 @@
 """
 文件夹同步工具
 用于在 weex 项目之间同步指定的文件夹和文件
+
+增量同步：按 (大小, mtime) 比较源和目标，只复制新增和变化的文件、只删除源中已不存在的文件，
+未变化的文件保持原样（inode 和 mtime 不变）；--checksum 时大小相同、mtime 不同的文件再比较内容
+
+多目标同步（--targets all）：源项目只扫描一次，再在线程池中并发同步到每个目标项目，
+最后输出 目标项目 × 同步路径 的结果矩阵
+
+Merkle 索引（--index / --check）：每个项目根目录下保存同步路径的 Merkle 哈希索引，
+按 mtime 增量刷新，比较时跳过哈希相同的子树；--check 只需一次 stat 遍历即可判断项目是否已同步
+
+暂存模式（--staging）：在目标同步路径旁的临时目录中准备好新的目录树，再用 rename 整体替换，
+运行中的开发服务器每个同步路径只看到一次变化，中途退出也不会留下写了一半的目录
+
+忽略规则：源项目根目录下的 .syncignore（gitignore 语法）在遍历时生效，被忽略的目录不会进入，
+规则相对项目根目录；--tracked-only 时只同步 git 跟踪的文件
+
+同步计划（--plan / --apply）：只做一次 stat 遍历，输出将要执行的操作、字节数和按以往吞吐量估算的耗时（JSON），
+保存的计划可以用 --apply 直接执行，不需要重新扫描
+
+监听模式（--watch）：完整同步一次后监听源项目的同步路径（inotify，不可用时轮询），
+改动在防抖时间内合并成一批，每批只比较和复制改动涉及的路径，每个目标项目执行一次增量同步
+
+进度与耗时：比较完成后按需要复制的文件数和字节数实时输出 文件/s、MB/s 和剩余时间，
+结束时输出每个同步路径的比较 / 复制耗时、字节数和文件数；--summary 把这些数字以 JSON 追加到文件，跟踪同步成本的变化
+
+同步包（--bundle / --unbundle）：把同步路径打包成一个 tar 流（可选 gzip / zstd 压缩），在目标端一次顺序读取解包，
+适合在网络挂载的不同 --base-path 之间同步大量小文件；同一个包可以应用到多个目标项目或多台机器
 """
 
 import os
-import shutil
 import sys
+import time
+import tarfile
+import contextlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from stat import S_ISDIR
+from typing import Dict, List, Set, Tuple
 import argparse
 from datetime import datetime
 
+# 共享模块位于仓库根目录
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sync_common.bundle import COMPRESSIONS, apply_bundle, resolve_compression, write_bundle
+from sync_common.copy_engine import STRATEGIES, CopyEngine, format_bytes
+from sync_common.ignore import IgnoreMatcher, tracked_files
+from sync_common.merkle import MerkleIndex, diff_nodes, is_dir_node
+from sync_common.progress import ProgressReporter, append_summary
+from sync_common.plan import (
+    append_sample, build_plan, empty_delta, format_estimate, load_plan, load_samples, plan_item, write_plan
+)
+from sync_common.tree_sync import (
+    apply_delta, diff_trees, format_counts, snapshot, snapshot_paths, stage_delta, sync_file, sync_tree
+)
+from sync_common.watcher import DEFAULT_POLL_INTERVAL, create_watcher
+
+
+# --targets / 交互选择中表示“除源项目外的所有项目”
+ALL_TARGETS = "all"
+
+# 项目根目录下的忽略规则文件
+IGNORE_FILE = ".syncignore"
+
+# 计划文件中的工具名称
+PLAN_TOOL = "upgrade_system"
+
+# 复制吞吐量记录，用于 --plan 估算耗时
+DEFAULT_THROUGHPUT_LOG = "~/.cache/upgrade_system/throughput.jsonl"
+
+# 结果矩阵中每个单元格的最小宽度
+MATRIX_CELL_WIDTH = 16
+
+# 监听模式：改动停止多少秒后同步一批，持续改动时最多等待多少秒
+DEFAULT_DEBOUNCE = 0.5
+WATCH_MAX_DELAY = 10.0
+
 
 class FolderSyncTool:
-    def __init__(self, base_path: str = "/Users/eli/Documents/project/weex"):
+    def __init__(self, base_path: str = "/Users/eli/Documents/project/weex", copy_strategy: str = "auto",
+                 checksum: bool = False, use_index: bool = False, staging: bool = False,
+                 tracked_only: bool = False, delete_excluded: bool = False,
+                 throughput_log: str = DEFAULT_THROUGHPUT_LOG, progress: bool = True, summary_log: str = None):
         self.base_path = Path(base_path)
+        self.copy_engine = CopyEngine(copy_strategy)
+        # 大小相同、mtime 不同时是否比较内容哈希
+        self.checksum = checksum
+        # 是否使用 Merkle 索引比较源和目标
+        self.use_index = use_index
+        # 是否先在临时目录中准备好再整体替换目标目录
+        self.staging = staging
+        # 是否只同步源项目中 git 跟踪的文件
+        self.tracked_only = tracked_only
+        # 目标中被忽略的文件是否也删除（默认保持不变）
+        self.delete_excluded = delete_excluded
+        self.matchers: Dict[str, Tuple[IgnoreMatcher, IgnoreMatcher]] = {}
+        # 每次同步后记录复制吞吐量，空字符串表示不记录
+        self.throughput_log = throughput_log
+        # 是否实时输出复制进度
+        self.progress = progress
+        # 每次运行的 JSON 汇总追加到这个文件，None 表示不记录
+        self.summary_log = summary_log
+        # 本次运行每个 (目标项目, 同步路径) 的耗时、字节数和文件数
+        self.path_costs: List[Dict] = []
+        self.indexes: Dict[str, MerkleIndex] = {}
         self.sync_paths = [
             "src/clientData",
             "src/components", 
@@ -66,35 +158,151 @@ class FolderSyncTool:
                 print("\n\n退出程序")
                 sys.exit(0)
     
-    def sync_folder(self, source_path: Path, target_path: Path, folder_name: str) -> bool:
-        """同步单个文件夹"""
+    def index(self, project: str) -> MerkleIndex:
+        """项目的 Merkle 索引（每次运行加载一次）"""
+        if project not in self.indexes:
+            self.indexes[project] = MerkleIndex(self.base_path / project)
+        return self.indexes[project]
+    
+    def save_indexes(self):
+        """保存本次运行刷新过的索引，并输出索引统计"""
+        if not self.indexes:
+            return
+        stat_count = hashed_count = 0
+        for index in self.indexes.values():
+            try:
+                index.save()
+            except OSError as e:
+                print(f"⚠️  保存索引失败 {index.index_file}: {e}")
+            stat_count += index.stats["stat"]
+            hashed_count += index.stats["hashed"]
+        print(f"🌲 Merkle 索引: stat {stat_count} 个文件, 读取内容 {hashed_count} 个文件")
+    
+    def ignore_matchers(self, source_project: str, sync_path: str) -> Tuple[IgnoreMatcher, IgnoreMatcher]:
+        """
+        同步路径的 (源匹配器, 目标匹配器)
+        
+        规则来自源项目的 .syncignore，每个源项目只加载一次；--tracked-only 时源匹配器只保留
+        git 跟踪的文件，--delete-excluded 时目标不使用任何规则（目标中被忽略的文件会被删除）
+        """
+        if source_project not in self.matchers:
+            source_base = self.base_path / source_project
+            ignore_file = source_base / IGNORE_FILE
+            target_matcher = IgnoreMatcher.from_file(ignore_file)
+            if target_matcher.rule_count:
+                print(f"🙈 忽略规则: {ignore_file} ({target_matcher.rule_count} 条)")
+            source_matcher = target_matcher
+            if self.tracked_only:
+                try:
+                    tracked = tracked_files(source_base)
+                except (subprocess.CalledProcessError, FileNotFoundError) as e:
+                    print(f"⚠️  无法读取 git 跟踪的文件，同步所有未被忽略的文件: {e}")
+                else:
+                    source_matcher = IgnoreMatcher.from_file(ignore_file, tracked=tracked)
+                    print(f"📌 只同步 git 跟踪的文件: {len(tracked)} 个")
+            if self.delete_excluded:
+                target_matcher = IgnoreMatcher()
+            self.matchers[source_project] = (source_matcher, target_matcher)
+        source_matcher, target_matcher = self.matchers[source_project]
+        return source_matcher.relative_to(sync_path), target_matcher.relative_to(sync_path)
+    
+    def ignore_patterns(self, source_project: str) -> List[str]:
+        """源项目 .syncignore 的规则原文（写入同步包，解包时用于扫描目标）"""
         try:
+            with open(self.base_path / source_project / IGNORE_FILE, "r", encoding="utf-8") as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+    
+    def scan_source(self, source_project: str, sync_path: str):
+        """
+        扫描一个源同步路径
+        
+        索引模式返回 Merkle 节点，否则返回 tree_sync 快照（单个文件返回 None）
+        """
+        source_matcher, _ = self.ignore_matchers(source_project, sync_path)
+        if self.use_index:
+            return self.index(source_project).refresh(sync_path, source_matcher, follow_symlinks=True)
+        source_path = self.base_path / source_project / sync_path
+        return snapshot(source_path, source_matcher, follow_symlinks=True) if source_path.is_dir() else None
+    
+    def sync_path(self, source_project: str, target_project: str, sync_path: str, source=None,
+                  hashes: Dict[str, str] = None, progress: ProgressReporter = None) -> Dict[str, int]:
+        """
+        增量同步单个文件夹或文件，失败时抛出异常
+        
+        source 为 scan_source 预先扫描的结果，hashes 为共享的源文件哈希缓存，
+        progress 在比较后累加需要复制的总数并在复制过程中更新
+        """
+        if self.use_index:
+            return self.sync_path_indexed(source_project, target_project, sync_path, source, progress)
+        source_path = self.base_path / source_project / sync_path
+        target_path = self.base_path / target_project / sync_path
+        if source_path.is_dir():
+            if target_path.exists() and not target_path.is_dir():
+                target_path.unlink()
+            source_matcher, target_matcher = self.ignore_matchers(source_project, sync_path)
+            return sync_tree(source_path, target_path, self.copy_engine, self.checksum,
+                             matcher=source_matcher, source=source, hashes=hashes,
+                             staging=self.staging, target_matcher=target_matcher, progress=progress)
+        return sync_file(source_path, target_path, self.copy_engine, self.checksum, progress)
+    
+    def sync_path_indexed(self, source_project: str, target_project: str, sync_path: str,
+                          source_node=None, progress: ProgressReporter = None) -> Dict[str, int]:
+        """
+        按 Merkle 索引增量同步：哈希相同的子树直接跳过，同步后用源节点刷新目标索引
+        """
+        source_path = self.base_path / source_project / sync_path
+        target_path = self.base_path / target_project / sync_path
+        source_matcher, target_matcher = self.ignore_matchers(source_project, sync_path)
+        if source_node is None:
+            source_node = self.index(source_project).refresh(sync_path, source_matcher, follow_symlinks=True)
+        if source_node is None:
+            raise FileNotFoundError(f"源路径不存在: {source_path}")
+        
+        target_index = self.index(target_project)
+        target_node = target_index.refresh(sync_path, target_matcher)
+        if is_dir_node(source_node):
+            if target_path.exists() and not target_path.is_dir():
+                target_path.unlink()
+            delta = diff_nodes(source_node, target_node)
+            if progress is not None:
+                progress.add_total(len(delta["create"]) + len(delta["update"]), delta["bytes"])
+            apply = stage_delta if self.staging else apply_delta
+            stats = apply(source_path, target_path, delta, self.copy_engine, progress)
+        elif target_node and not is_dir_node(target_node) and target_node["hash"] == source_node["hash"]:
+            stats = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 1, "bytes": 0}
+        else:
+            stats = sync_file(source_path, target_path, self.copy_engine, self.checksum, progress)
+        
+        if stats["created"] or stats["updated"] or stats["deleted"]:
+            # 复制保留 mtime，刚写入的文件直接沿用源的内容哈希
+            target_index.refresh(sync_path, target_matcher, hint=source_node)
+        return stats
+    
+    def sync_folder(self, source_project: str, target_project: str, sync_path: str) -> Dict[str, int]:
+        """
+        增量同步单个文件夹或文件
+        
+        返回 {"created", "updated", "deleted", "unchanged", "bytes"}，失败时返回 None
+        """
+        progress = ProgressReporter(sync_path, live=self.progress)
+        try:
+            source_path = self.base_path / source_project / sync_path
             if not source_path.exists():
                 print(f"⚠️  源路径不存在: {source_path}")
-                return False
-            
-            # 确保目标目录存在
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 如果目标路径存在，先删除
-            if target_path.exists():
-                if target_path.is_dir():
-                    shutil.rmtree(target_path)
-                else:
-                    target_path.unlink()
-            
-            # 复制文件夹或文件
-            if source_path.is_dir():
-                shutil.copytree(source_path, target_path)
-            else:
-                shutil.copy2(source_path, target_path)
+                return None
             
-            print(f"✅ 同步成功: {folder_name}")
-            return True
+            stats = self.sync_path(source_project, target_project, sync_path, progress=progress)
+            cost = self.record_cost(target_project, sync_path, stats, progress)
+            print(f"✅ 同步成功: {sync_path} ({format_counts(stats)}, 复制 {format_bytes(stats['bytes'])}, "
+                  f"{cost['seconds']:.2f}s)")
+            return stats
             
         except Exception as e:
-            print(f"❌ 同步失败 {folder_name}: {str(e)}")
-            return False
+            self.record_cost(target_project, sync_path, e, progress)
+            print(f"❌ 同步失败 {sync_path}: {str(e)}")
+            return None
     
     def sync_projects(self, source_project: str, target_project: str):
         """同步两个项目之间的指定文件夹"""
@@ -111,21 +319,121 @@ class FolderSyncTool:
         
         print(f"\n🔄 开始同步: {source_project} → {target_project}")
         print("=" * 60)
+        self.ignore_matchers(source_project, "")
         
+        start = time.perf_counter()
         success_count = 0
         total_count = len(self.sync_paths)
+        total_stats = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "bytes": 0}
         
         for sync_path in self.sync_paths:
-            source_path = source_base / sync_path
-            target_path = target_base / sync_path
-            
             print(f"\n📂 同步: {sync_path}")
-            if self.sync_folder(source_path, target_path, sync_path):
+            stats = self.sync_folder(source_project, target_project, sync_path)
+            if stats is not None:
                 success_count += 1
+                for key in total_stats:
+                    total_stats[key] += stats[key]
         
         print("\n" + "=" * 60)
         print(f"📊 同步完成: {success_count}/{total_count} 个文件夹同步成功")
+        print(f"📄 文件: {format_counts(total_stats)}")
+        
+        self.save_indexes()
+        self.print_copy_summary()
+        self.print_costs()
+        self.record_throughput()
+        self.write_summary(source_project, [target_project], time.perf_counter() - start)
+        self.print_result(success_count, total_count)
+    
+    def print_copy_summary(self):
+        """输出复制引擎的统计"""
+        copy_lines = self.copy_engine.summary_lines()
+        if copy_lines:
+            print(f"📦 文件复制 (策略: {self.copy_engine.strategy}):")
+            for line in copy_lines:
+                print(f"   {line}")
+    
+    def record_throughput(self, since: Dict[str, float] = None):
+        """
+        把本次运行的复制文件数、字节数和耗时追加到吞吐量记录
         
+        since 为之前某个时刻的 copy_engine.totals()，只记录这之后的复制（监听模式每批记录一次）
+        """
+        totals = self.copy_engine.totals()
+        if since:
+            totals = {key: value - since[key] for key, value in totals.items()}
+        try:
+            append_sample(self.throughput_log, int(totals["files"]), int(totals["bytes"]), totals["seconds"])
+        except OSError as e:
+            print(f"⚠️  写入吞吐量记录失败: {e}")
+    
+    def record_cost(self, target_project: str, sync_path: str, result, progress: ProgressReporter) -> Dict:
+        """
+        结束一个同步路径的进度并记录它的耗时
+        
+        result 为 sync_path 的统计或失败时的异常；返回记录 {target_project, sync_path, status, files, bytes,
+        seconds, scan_seconds, ...}，files 为复制的文件数，成功时还包含 sync_path 的统计
+        """
+        cost = {"target_project": target_project, "sync_path": sync_path, **progress.finish()}
+        cost["seconds"] = round(cost["seconds"], 6)
+        cost["scan_seconds"] = round(cost["scan_seconds"], 6)
+        if isinstance(result, Exception):
+            cost.update(status="failed", error=str(result))
+        else:
+            cost.update(status="ok", **{key: result[key] for key in ("created", "updated", "deleted", "unchanged")})
+        self.path_costs.append(cost)
+        return cost
+    
+    def print_costs(self):
+        """输出每个同步路径的比较 / 复制耗时、复制的文件数和字节数"""
+        if not self.path_costs:
+            return
+        multi = len({cost["target_project"] for cost in self.path_costs}) > 1
+        labels = [
+            f"{cost['target_project']}: {cost['sync_path']}" if multi else cost["sync_path"]
+            for cost in self.path_costs
+        ]
+        width = max(len(label) for label in labels) + 2
+        print("⏱️  耗时明细:")
+        # 中文每个字占两列，按显示宽度对齐
+        print(f"   {'同步路径':<{width - 4}}{'文件':>6}{'字节':>10}{'比较':>8}{'复制':>8}{'速度':>10}")
+        for label, cost in zip(labels, self.path_costs):
+            if cost["status"] != "ok":
+                print(f"   {label:<{width}}{'✗':>8}")
+                continue
+            copy_seconds = cost["seconds"] - cost["scan_seconds"]
+            speed = format_bytes(cost["bytes"] / copy_seconds) + "/s" if cost["files"] and copy_seconds > 0 else "-"
+            print(f"   {label:<{width}}{cost['files']:>8}{format_bytes(cost['bytes']):>12}"
+                  f"{cost['scan_seconds']:>9.2f}s{copy_seconds:>9.2f}s{speed:>12}")
+    
+    def write_summary(self, source_project: str, target_projects: List[str], elapsed: float):
+        """把本次运行的汇总（每个同步路径的耗时、字节数和文件数）以 JSON 追加到 --summary 文件"""
+        if not self.summary_log:
+            return
+        totals = {"files": 0, "bytes": 0, "created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "failed": 0}
+        for cost in self.path_costs:
+            if cost["status"] != "ok":
+                totals["failed"] += 1
+                continue
+            for key in totals:
+                if key != "failed":
+                    totals[key] += cost[key]
+        try:
+            append_summary(self.summary_log, {
+                "tool": PLAN_TOOL,
+                "base_path": str(self.base_path),
+                "source_project": source_project,
+                "targets": target_projects,
+                "copy_strategy": self.copy_engine.strategy,
+                "seconds": round(elapsed, 6),
+                "totals": totals,
+                "paths": self.path_costs,
+            })
+        except OSError as e:
+            print(f"⚠️  写入运行汇总失败: {e}")
+    
+    def print_result(self, success_count: int, total_count: int):
+        """输出最终结果"""
         if success_count == total_count:
             print("🎉 所有文件夹同步成功!")
         elif success_count > 0:
@@ -133,6 +441,522 @@ class FolderSyncTool:
         else:
             print("❌ 没有文件夹同步成功")
     
+    def resolve_targets(self, source_project: str, targets: List[str]) -> List[str]:
+        """展开目标项目列表：all 表示除源项目外的所有可用项目"""
+        if ALL_TARGETS in targets:
+            return [p for p in self.get_available_projects() if p != source_project]
+        return [p for p in dict.fromkeys(targets) if p != source_project]
+    
+    def sync_to_targets(self, source_project: str, target_projects: List[str]):
+        """
+        把源项目同步到多个目标项目
+        
+        每个同步路径的源只扫描一次，各目标项目在线程池中并发执行增量同步，
+        最后输出 同步路径 × 目标项目 的结果矩阵
+        """
+        targets = self.existing_targets(source_project, target_projects)
+        if not targets:
+            return
+        
+        print(f"\n🔄 开始同步: {source_project} → {', '.join(targets)}")
+        print("=" * 60)
+        
+        # 扫描源项目一次，所有目标共享快照和内容哈希缓存
+        sources = self.scan_sources(source_project)
+        hashes = {sync_path: {} for sync_path in sources}
+        if self.use_index:
+            # 在工作线程启动前加载目标索引
+            for target_project in targets:
+                self.index(target_project)
+        
+        # 所有目标共用一行进度，每个 (目标项目, 同步路径) 单独记录耗时
+        overall = ProgressReporter(f"{len(targets)} 个目标项目", live=self.progress)
+        
+        def sync_target(target_project: str) -> Dict[str, object]:
+            results = {}
+            for sync_path, source_snapshot in sources.items():
+                progress = ProgressReporter(sync_path, live=False, parent=overall)
+                try:
+                    results[sync_path] = self.sync_path(
+                        source_project, target_project, sync_path, source_snapshot, hashes[sync_path], progress
+                    )
+                except Exception as e:
+                    results[sync_path] = e
+                self.record_cost(target_project, sync_path, results[sync_path], progress)
+            return results
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="sync") as executor:
+            matrix = dict(zip(targets, executor.map(sync_target, targets)))
+        overall.finish()
+        elapsed = time.perf_counter() - start
+        # 工作线程按完成顺序记录耗时，按 目标项目 → 同步路径 的顺序排列
+        order = [(target_project, sync_path) for target_project in targets for sync_path in self.sync_paths]
+        self.path_costs.sort(key=lambda cost: order.index((cost["target_project"], cost["sync_path"])))
+        
+        self.report_matrix(matrix, len(self.sync_paths) * len(targets), elapsed)
+        self.write_summary(source_project, targets, elapsed)
+    
+    def report_matrix(self, matrix: Dict[str, Dict[str, object]], total_count: int, elapsed: float):
+        """输出多目标同步的结果矩阵、失败详情和每个目标项目的合计"""
+        print()
+        for line in self.matrix_lines(matrix):
+            print(line)
+        for target_project, results in matrix.items():
+            for sync_path, result in results.items():
+                if isinstance(result, Exception):
+                    print(f"❌ 同步失败 {target_project}: {sync_path}: {result}")
+        
+        print("\n" + "=" * 60)
+        success_count = sum(
+            1 for results in matrix.values() for result in results.values()
+            if not isinstance(result, Exception)
+        )
+        print(f"📊 同步完成: {success_count}/{total_count} 个文件夹同步成功 "
+              f"({len(matrix)} 个目标项目, {elapsed:.2f}s)")
+        for target_project, results in matrix.items():
+            totals = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "bytes": 0}
+            for result in results.values():
+                if not isinstance(result, Exception):
+                    for key in totals:
+                        totals[key] += result[key]
+            print(f"📄 {target_project}: {format_counts(totals)}, 复制 {format_bytes(totals['bytes'])}")
+        self.save_indexes()
+        self.print_copy_summary()
+        self.print_costs()
+        self.record_throughput()
+        self.print_result(success_count, total_count)
+    
+    def existing_targets(self, source_project: str, target_projects: List[str]) -> List[str]:
+        """检查源项目和目标项目是否存在，返回存在的目标项目；源项目不存在时返回空列表"""
+        source_base = self.base_path / source_project
+        if not source_base.exists():
+            print(f"❌ 源项目不存在: {source_base}")
+            return []
+        
+        targets = []
+        for target_project in target_projects:
+            if (self.base_path / target_project).exists():
+                targets.append(target_project)
+            else:
+                print(f"❌ 目标项目不存在: {self.base_path / target_project}")
+        if not targets:
+            print("❌ 没有可同步的目标项目")
+        return targets
+    
+    def scan_sources(self, source_project: str) -> Dict[str, object]:
+        """扫描源项目的所有同步路径（跳过不存在的路径），返回 {同步路径: scan_source 结果}"""
+        start = time.perf_counter()
+        sources: Dict[str, object] = {}
+        file_count = 0
+        for sync_path in self.sync_paths:
+            source_path = self.base_path / source_project / sync_path
+            if not source_path.exists():
+                print(f"⚠️  源路径不存在: {source_path}")
+                continue
+            sources[sync_path] = self.scan_source(source_project, sync_path)
+            entries = sources[sync_path]
+            if entries is None:
+                file_count += 1
+            elif self.use_index:
+                file_count += entries["files"] if is_dir_node(entries) else 1
+            else:
+                file_count += sum(state is not None for state in entries.values())
+        print(f"🔍 源扫描: {len(sources)} 个同步路径, {file_count} 个文件 ({time.perf_counter() - start:.2f}s)")
+        return sources
+    
+    def plan_path(self, source_project: str, target_project: str, sync_path: str, source,
+                  hashes: Dict[str, str] = None) -> Dict:
+        """
+        计划一个同步路径：只比较不写入，返回 sync_common.plan.plan_item
+        
+        单个文件的同步路径按所在目录生成计划项，差异中只有这个文件
+        """
+        source_path = self.base_path / source_project / sync_path
+        target_path = self.base_path / target_project / sync_path
+        labels = {"target_project": target_project, "sync_path": sync_path}
+        
+        if not source_path.is_dir():
+            delta = empty_delta()
+            source_stat = source_path.stat()
+            try:
+                target_stat = target_path.lstat()
+            except FileNotFoundError:
+                target_stat = None
+            if target_stat is not None and S_ISDIR(target_stat.st_mode):
+                # 目标中是目录：与 sync_file 一样先删除目录，再创建文件
+                delta["rmdir"].append(target_path.name)
+                target_stat = None
+            if target_stat is None:
+                delta["create"].append(source_path.name)
+                delta["bytes"] += source_stat.st_size
+            elif (source_stat.st_size, source_stat.st_mtime_ns) == (target_stat.st_size, target_stat.st_mtime_ns):
+                delta["unchanged"] += 1
+            else:
+                delta["update"].append(source_path.name)
+                delta["bytes"] += source_stat.st_size
+            return plan_item(source_path.parent, target_path.parent, delta, kind="file", **labels)
+        
+        _, target_matcher = self.ignore_matchers(source_project, sync_path)
+        if self.use_index:
+            delta = diff_nodes(source, self.index(target_project).refresh(sync_path, target_matcher))
+        else:
+            target = snapshot(target_path, target_matcher) if target_path.is_dir() else {}
+            delta = diff_trees(source_path, target_path, source, target, self.checksum, hashes)
+        return plan_item(source_path, target_path, delta, kind="tree", **labels)
+    
+    def plan_targets(self, source_project: str, target_projects: List[str]) -> Dict:
+        """
+        生成同步计划：源项目扫描一次，与每个目标项目比较，不写入任何文件
+        
+        返回 sync_common.plan.build_plan 的结果，没有可同步的目标时返回 None
+        """
+        targets = self.existing_targets(source_project, target_projects)
+        if not targets:
+            return None
+        
+        print(f"\n📋 生成同步计划: {source_project} → {', '.join(targets)}")
+        print("=" * 60)
+        sources = self.scan_sources(source_project)
+        hashes = {sync_path: {} for sync_path in sources}
+        items = [
+            self.plan_path(source_project, target_project, sync_path, source, hashes[sync_path])
+            for target_project in targets
+            for sync_path, source in sources.items()
+        ]
+        self.save_indexes()
+        return build_plan(
+            PLAN_TOOL, items, load_samples(self.throughput_log),
+            base_path=str(self.base_path), source_project=source_project, targets=targets,
+        )
+    
+    def print_plan(self, plan: Dict):
+        """输出计划的结果矩阵、合计和估算耗时"""
+        matrix: Dict[str, Dict[str, object]] = {}
+        for item in plan["items"]:
+            counts = item["counts"]
+            matrix.setdefault(item["target_project"], {})[item["sync_path"]] = {
+                "created": counts["create"], "updated": counts["update"], "deleted": counts["delete"],
+            }
+        print()
+        for line in self.matrix_lines(matrix):
+            print(line)
+        totals = plan["totals"]
+        print("\n" + "=" * 60)
+        print(f"📋 计划: 新增 {totals['create']}, 更新 {totals['update']}, 删除 {totals['delete']}, "
+              f"未变化 {totals['unchanged']}, 需要复制 {format_bytes(totals['bytes'])}")
+        print(f"⏱️  预计耗时: {format_estimate(plan)}")
+    
+    def apply_plan(self, plan: Dict) -> bool:
+        """
+        按保存的计划执行同步，不重新扫描源和目标
+        
+        每个目标项目在一个工作线程中依次执行它的计划项，全部成功时返回 True
+        """
+        targets = plan.get("targets", [])
+        print(f"\n▶️  执行同步计划: {plan.get('source_project')} → {', '.join(targets)} "
+              f"(生成于 {plan.get('created_at')})")
+        print(f"⏱️  预计耗时: {format_estimate(plan)}")
+        print("=" * 60)
+        
+        def apply_target(target_project: str) -> Dict[str, object]:
+            results = {}
+            for item in plan["items"]:
+                if item["target_project"] != target_project:
+                    continue
+                try:
+                    results[item["sync_path"]] = self.apply_item(item)
+                except Exception as e:
+                    results[item["sync_path"]] = e
+            return results
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, len(targets)), thread_name_prefix="sync") as executor:
+            matrix = dict(zip(targets, executor.map(apply_target, targets)))
+        elapsed = time.perf_counter() - start
+        self.report_matrix(matrix, len(plan["items"]), elapsed)
+        return all(
+            not isinstance(result, Exception) for results in matrix.values() for result in results.values()
+        )
+    
+    def apply_item(self, item: Dict) -> Dict[str, int]:
+        """执行一个计划项，返回 apply_delta 的统计"""
+        source_root, target_root = Path(item["source"]), Path(item["target"])
+        if item.get("kind") == "file":
+            # 单个文件通过临时文件 + rename 写入，本身就是原子的，不需要暂存整个父目录
+            return apply_delta(source_root, target_root, item["delta"], self.copy_engine)
+        if target_root.exists() and not target_root.is_dir():
+            target_root.unlink()
+        apply = stage_delta if self.staging else apply_delta
+        return apply(source_root, target_root, item["delta"], self.copy_engine)
+    
+    def pack_bundle(self, source_project: str, output: str, compression: str = "auto") -> bool:
+        """
+        把源项目的同步路径打包成同步包，之后用 unpack_bundle 应用到目标项目
+        
+        源项目按 .syncignore / --tracked-only 规则扫描一次；output 为 - 时写到标准输出，成功时返回 True
+        """
+        source_base = self.base_path / source_project
+        if not source_base.exists():
+            print(f"❌ 源项目不存在: {source_base}")
+            return False
+        
+        compression = resolve_compression(output, compression)
+        print(f"\n📦 打包同步包: {source_project} → {output} (压缩: {compression})")
+        print("=" * 60)
+        start = time.perf_counter()
+        paths = {}
+        for sync_path in self.sync_paths:
+            source_path = source_base / sync_path
+            if not source_path.exists():
+                print(f"⚠️  源路径不存在: {source_path}")
+                continue
+            source_matcher, _ = self.ignore_matchers(source_project, sync_path)
+            paths[sync_path] = snapshot(source_path, source_matcher, follow_symlinks=True) if source_path.is_dir() else None
+        try:
+            stats = write_bundle(output, source_base, paths, compression, self.ignore_patterns(source_project),
+                                 source_project=source_project, base_path=str(self.base_path))
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"❌ 打包失败: {e}")
+            return False
+        
+        bundle_size = f", 同步包 {format_bytes(os.path.getsize(output))}" if output != "-" else ""
+        print(f"✅ 已打包 {len(paths)} 个同步路径: {stats['files']} 个文件, {format_bytes(stats['bytes'])}"
+              f"{bundle_size} ({time.perf_counter() - start:.2f}s)")
+        if stats["missing"]:
+            print(f"⚠️  {stats['missing']} 个文件在扫描后、打包前被删除")
+        return True
+    
+    def unpack_bundle(self, bundle: str, target_projects: List[str]) -> bool:
+        """
+        把同步包应用到多个目标项目（基础路径下的项目），只顺序读取一次同步包
+        
+        只写入新增和变化的文件、删除源中已不存在的文件；全部成功时返回 True
+        """
+        targets = {}
+        for target_project in target_projects:
+            if (self.base_path / target_project).exists():
+                targets[target_project] = self.base_path / target_project
+            else:
+                print(f"❌ 目标项目不存在: {self.base_path / target_project}")
+        if not targets:
+            print("❌ 没有可同步的目标项目")
+            return False
+        if self.staging:
+            print("⚠️  同步包直接写入目标目录，--staging 不生效")
+        
+        print(f"\n📦 应用同步包: {bundle} → {', '.join(targets)}")
+        print("=" * 60)
+        progress = ProgressReporter(f"{len(targets)} 个目标项目", live=self.progress)
+        start = time.perf_counter()
+        try:
+            manifest, matrix = apply_bundle(bundle, targets, self.delete_excluded, progress)
+        except (OSError, RuntimeError, ValueError, tarfile.TarError) as e:
+            progress.finish()
+            print(f"❌ 无法应用同步包: {e}")
+            return False
+        progress.finish()
+        elapsed = time.perf_counter() - start
+        
+        print(f"   源项目: {manifest.get('source_project')} (打包于 {manifest.get('created_at')})")
+        self.report_matrix(matrix, len(manifest["paths"]) * len(targets), elapsed)
+        return all(
+            not isinstance(result, Exception) for results in matrix.values() for result in results.values()
+        )
+    
+    def check_targets(self, source_project: str, target_projects: List[str]) -> bool:
+        """
+        只比较不同步：用 Merkle 索引判断目标项目是否与源项目一致
+        
+        只需要一次 stat 遍历（内容变化的文件才重新计算哈希），输出差异矩阵；全部一致时返回 True
+        """
+        self.use_index = True
+        targets = self.existing_targets(source_project, target_projects)
+        if not targets:
+            return False
+        
+        print(f"\n🔎 检查同步状态: {source_project} → {', '.join(targets)}")
+        print("=" * 60)
+        sources = self.scan_sources(source_project)
+        
+        matrix = {}
+        for target_project in targets:
+            target_index = self.index(target_project)
+            results = {}
+            for sync_path, source_node in sources.items():
+                _, target_matcher = self.ignore_matchers(source_project, sync_path)
+                target_node = target_index.refresh(sync_path, target_matcher)
+                if target_node is not None and target_node["hash"] == source_node["hash"]:
+                    results[sync_path] = {"created": 0, "updated": 0, "deleted": 0}
+                elif is_dir_node(source_node):
+                    delta = diff_nodes(source_node, target_node)
+                    results[sync_path] = {
+                        "created": len(delta["create"]),
+                        "updated": len(delta["update"]),
+                        "deleted": len(delta["delete"]) + len(delta["rmdir"]),
+                    }
+                else:
+                    changed = int(target_node is not None)
+                    results[sync_path] = {"created": 1 - changed, "updated": changed, "deleted": 0}
+            matrix[target_project] = results
+        
+        print()
+        for line in self.matrix_lines(matrix):
+            print(line)
+        print("\n" + "=" * 60)
+        in_sync = True
+        for target_project, results in matrix.items():
+            differ = [path for path, result in results.items() if any(result.values())]
+            if len(results) < len(self.sync_paths) or differ:
+                in_sync = False
+            if differ:
+                print(f"⚠️  {target_project}: {len(differ)} 个同步路径有差异")
+            else:
+                print(f"✅ {target_project}: 已同步")
+        self.save_indexes()
+        return in_sync
+    
+    def watch(self, source_project: str, target_projects: List[str], debounce: float = DEFAULT_DEBOUNCE,
+              poll: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        监听源项目的同步路径，把改动批量同步到目标项目，直到 Ctrl+C
+        
+        先开始监听再完整同步一次，同步期间的改动会进入第一批；
+        之后每批改动（防抖合并后）由 propagate 同步到每个目标项目
+        """
+        targets = self.existing_targets(source_project, target_projects)
+        if not targets:
+            return
+        
+        roots = {}
+        for sync_path in self.sync_paths:
+            if (self.base_path / source_project / sync_path).exists():
+                roots[sync_path] = self.ignore_matchers(source_project, sync_path)[0]
+        watcher = create_watcher(self.base_path / source_project, roots, poll, poll_interval)
+        try:
+            self.sync_to_targets(source_project, targets)
+            print(f"\n👀 监听中 ({watcher.kind}): {source_project} 的 {len(roots)} 个同步路径 → {', '.join(targets)}")
+            print(f"   改动停止 {debounce:g}s 后同步，按 Ctrl+C 退出")
+            while True:
+                changes = watcher.collect(debounce, WATCH_MAX_DELAY)
+                self.propagate(source_project, targets, changes)
+        except KeyboardInterrupt:
+            print("\n👋 停止监听")
+        finally:
+            watcher.close()
+    
+    def propagate(self, source_project: str, target_projects: List[str],
+                  changes: Set[str]) -> Dict[str, Dict[str, object]]:
+        """
+        把一批改动同步到每个目标项目，返回 目标项目 × 同步路径 的结果矩阵
+        
+        changes 为相对源项目根目录的路径。每个同步路径只扫描改动涉及的路径（源扫描一次，所有目标共享），
+        与目标的相同路径比较后执行差异；同步路径本身有改动（新建、删除或事件丢失）时完整同步这个路径
+        """
+        grouped: Dict[str, Set[str]] = {}
+        for path in changes:
+            for sync_path in self.sync_paths:
+                if path == sync_path or path.startswith(sync_path + "/"):
+                    grouped.setdefault(sync_path, set()).add(path[len(sync_path) + 1:])
+                    break
+        
+        sources = {}
+        for sync_path, rel_paths in grouped.items():
+            source_path = self.base_path / source_project / sync_path
+            if not source_path.exists():
+                print(f"⚠️  源路径不存在: {source_path}")
+            elif "" in rel_paths:
+                sources[sync_path] = self.scan_source(source_project, sync_path)
+            else:
+                source_matcher, _ = self.ignore_matchers(source_project, sync_path)
+                sources[sync_path] = snapshot_paths(source_path, rel_paths, source_matcher, follow_symlinks=True)
+        if not sources:
+            return {}
+        hashes = {sync_path: {} for sync_path in sources}
+        
+        def propagate_target(target_project: str) -> Dict[str, object]:
+            results = {}
+            for sync_path, source in sources.items():
+                try:
+                    if "" in grouped[sync_path]:
+                        results[sync_path] = self.sync_path(
+                            source_project, target_project, sync_path, source, hashes[sync_path]
+                        )
+                    else:
+                        results[sync_path] = self.sync_changes(
+                            source_project, target_project, sync_path, grouped[sync_path], source, hashes[sync_path]
+                        )
+                except Exception as e:
+                    results[sync_path] = e
+            return results
+        
+        before = self.copy_engine.totals()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(target_projects), thread_name_prefix="sync") as executor:
+            matrix = dict(zip(target_projects, executor.map(propagate_target, target_projects)))
+        elapsed = time.perf_counter() - start
+        
+        print(f"\n🔁 {datetime.now():%H:%M:%S} {len(changes)} 个改动, {len(sources)} 个同步路径 ({elapsed:.2f}s)")
+        for target_project, results in matrix.items():
+            totals = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "bytes": 0}
+            for sync_path, result in results.items():
+                if isinstance(result, Exception):
+                    print(f"❌ 同步失败 {target_project}: {sync_path}: {result}")
+                    continue
+                for key in totals:
+                    totals[key] += result[key]
+            print(f"   {target_project}: {format_counts(totals)}, 复制 {format_bytes(totals['bytes'])}")
+        self.record_throughput(since=before)
+        return matrix
+    
+    def sync_changes(self, source_project: str, target_project: str, sync_path: str, rel_paths: Set[str],
+                     source, hashes: Dict[str, str] = None) -> Dict[str, int]:
+        """
+        只同步一个同步路径中的部分路径，统计格式同 apply_delta
+        
+        rel_paths 为相对同步路径的路径，source 为源中这些路径的 snapshot_paths 结果
+        """
+        source_path = self.base_path / source_project / sync_path
+        target_path = self.base_path / target_project / sync_path
+        _, target_matcher = self.ignore_matchers(source_project, sync_path)
+        target = snapshot_paths(target_path, rel_paths, target_matcher) if target_path.is_dir() else {}
+        delta = diff_trees(source_path, target_path, source, target, self.checksum, hashes)
+        if target_path.exists() and not target_path.is_dir():
+            target_path.unlink()
+        apply = stage_delta if self.staging else apply_delta
+        return apply(source_path, target_path, delta, self.copy_engine)
+    
+    def matrix_lines(self, matrix: Dict[str, Dict[str, object]]) -> List[str]:
+        """
+        结果矩阵：每行一个同步路径，每列一个目标项目
+        
+        单元格为 +新增 ~更新 -删除，✓ 表示没有变化，✗ 表示失败，- 表示源路径不存在
+        """
+        path_width = max(len(sync_path) for sync_path in self.sync_paths) + 2
+        widths = [max(MATRIX_CELL_WIDTH, len(target_project) + 2) for target_project in matrix]
+        # 中文每个字占两列，按显示宽度对齐
+        lines = [
+            f"{'同步路径':<{path_width - 4}}"
+            + "".join(f"{target_project:>{width}}" for target_project, width in zip(matrix, widths)),
+            "-" * (path_width + sum(widths)),
+        ]
+        for sync_path in self.sync_paths:
+            row = f"{sync_path:<{path_width}}"
+            for results, width in zip(matrix.values(), widths):
+                result = results.get(sync_path)
+                if result is None:
+                    cell = "-"
+                elif isinstance(result, Exception):
+                    cell = "✗"
+                elif result["created"] or result["updated"] or result["deleted"]:
+                    cell = f"+{result['created']} ~{result['updated']} -{result['deleted']}"
+                else:
+                    cell = "✓"
+                row += f"{cell:>{width}}"
+            lines.append(row)
+        lines.append("+新增 ~更新 -删除, ✓ 无变化, ✗ 失败, - 源路径不存在")
+        return lines
+    
     def run(self):
         """运行同步工具"""
         print("🚀 文件夹同步工具")
@@ -162,17 +986,21 @@ class FolderSyncTool:
             project_path = self.base_path / project
             status = "✅" if project_path.exists() else "❌"
             print(f"{i}. {status} {project}")
+        if len(remaining_projects) > 1:
+            print(f"{len(remaining_projects) + 1}. 📦 所有其他项目")
         print("-" * 50)
         
+        choices = remaining_projects + [ALL_TARGETS] if len(remaining_projects) > 1 else remaining_projects
         target_project = self.select_project(
             f"请选择目标项目 (从 {source_project} 同步到)", 
-            remaining_projects
+            choices
         )
+        target_projects = remaining_projects if target_project == ALL_TARGETS else [target_project]
         
         # 确认同步
         print(f"\n⚠️  确认同步操作:")
         print(f"   源项目: {source_project}")
-        print(f"   目标项目: {target_project}")
+        print(f"   目标项目: {', '.join(target_projects)}")
         print(f"   同步路径: {len(self.sync_paths)} 个文件夹")
         
         confirm = input("\n确认执行同步? (y/N): ").strip().lower()
@@ -181,7 +1009,10 @@ class FolderSyncTool:
             return
         
         # 执行同步
-        self.sync_projects(source_project, target_project)
+        if len(target_projects) > 1:
+            self.sync_to_targets(source_project, target_projects)
+        else:
+            self.sync_projects(source_project, target_project)
 
 
 def main():
@@ -199,18 +1030,191 @@ def main():
         "--target", 
         help="目标项目名称 (跳过交互选择)"
     )
+    parser.add_argument(
+        "--targets",
+        help=f"多个目标项目，逗号分隔；{ALL_TARGETS} 表示除源项目外的所有项目。源只扫描一次，并发同步到每个目标"
+    )
+    parser.add_argument(
+        "--copy-strategy",
+        choices=STRATEGIES,
+        default="auto",
+        help="文件复制策略: reflink / hardlink / kernel / buffered，auto 自动检测 (默认: auto)"
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="使用 Merkle 索引比较源和目标 (保存在项目根目录的 .sync-index.json)，跳过哈希相同的子树"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="只检查目标项目是否与源项目一致，不同步；有差异时退出码为 1"
+    )
+    parser.add_argument(
+        "--staging",
+        action="store_true",
+        help="先在同级临时目录中准备好新的目录树，再用 rename 整体替换目标同步路径 (适合正在运行开发服务器的项目)"
+    )
+    parser.add_argument(
+        "--tracked-only",
+        action="store_true",
+        help="只同步源项目中 git 跟踪的文件 (git ls-files)，与 .syncignore 规则同时生效"
+    )
+    parser.add_argument(
+        "--delete-excluded",
+        action="store_true",
+        help="同时删除目标中被 .syncignore 忽略的文件 (默认保持不变)"
+    )
+    parser.add_argument(
+        "--plan",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="只生成同步计划 (JSON) 不写入: 新增 / 更新 / 删除 / 未变化的文件数、字节数和估算耗时；未指定 FILE 时输出到标准输出"
+    )
+    parser.add_argument(
+        "--apply",
+        metavar="FILE",
+        help="执行 --plan 保存的计划，不重新扫描"
+    )
+    parser.add_argument(
+        "--throughput-log",
+        default=DEFAULT_THROUGHPUT_LOG,
+        help=f"复制吞吐量记录 (JSONL)，用于 --plan 估算耗时，空字符串表示不记录 (默认: {DEFAULT_THROUGHPUT_LOG})"
+    )
+    parser.add_argument(
+        "--bundle",
+        metavar="FILE",
+        help="把源项目的同步路径打包成同步包 (tar 流)，不同步；- 表示输出到标准输出"
+    )
+    parser.add_argument(
+        "--unbundle",
+        metavar="FILE",
+        help="把同步包应用到 --target / --targets (基础路径可以与打包时不同)；- 表示从标准输入读取"
+    )
+    parser.add_argument(
+        "--compression",
+        choices=COMPRESSIONS,
+        default="auto",
+        help="--bundle 的压缩方式，auto 按扩展名选择: .tar.gz / .tgz 为 gzip，.tar.zst / .tzst 为 zstd，其他不压缩 (默认: auto)"
+    )
+    parser.add_argument(
+        "--no-progress",
+        action="store_true",
+        help="不实时输出复制进度 (文件/s、MB/s、剩余时间)"
+    )
+    parser.add_argument(
+        "--summary",
+        metavar="FILE",
+        help="把本次运行每个同步路径的耗时、字节数和文件数以 JSON 追加到 FILE (每次运行一行)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="完整同步一次后监听源项目的同步路径 (inotify，不可用时轮询)，改动合并成批后只同步改动的文件，Ctrl+C 退出"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"--watch: 改动停止多少秒后同步一批 (默认: {DEFAULT_DEBOUNCE})"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="--watch: 不使用 inotify，始终轮询"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"--watch: 轮询间隔（秒） (默认: {DEFAULT_POLL_INTERVAL})"
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="大小相同但 mtime 不同的文件比较内容哈希，内容相同时只修正 mtime、不重新复制"
+    )
     
     args = parser.parse_args()
     
+    # 计划中保存的是绝对路径，执行时不需要基础路径
+    if args.apply:
+        try:
+            plan = load_plan(args.apply, PLAN_TOOL)
+        except (OSError, ValueError) as e:
+            print(f"❌ 无法加载计划: {e}")
+            sys.exit(2)
+        tool = FolderSyncTool(plan.get("base_path", args.base_path), copy_strategy=args.copy_strategy,
+                              staging=args.staging, throughput_log=args.throughput_log)
+        sys.exit(0 if tool.apply_plan(plan) else 1)
+    
     # 检查基础路径是否存在
     if not Path(args.base_path).exists():
         print(f"❌ 基础路径不存在: {args.base_path}")
         sys.exit(1)
     
-    tool = FolderSyncTool(args.base_path)
+    tool = FolderSyncTool(args.base_path, copy_strategy=args.copy_strategy, checksum=args.checksum,
+                          use_index=args.index, staging=args.staging,
+                          tracked_only=args.tracked_only, delete_excluded=args.delete_excluded,
+                          throughput_log=args.throughput_log, progress=not args.no_progress,
+                          summary_log=args.summary)
+    
+    if args.bundle:
+        if not args.source:
+            print("❌ --bundle 需要指定 --source")
+            sys.exit(2)
+        # 同步包输出到标准输出时，进度和摘要改为输出到标准错误
+        output = sys.stderr if args.bundle == "-" else sys.stdout
+        with contextlib.redirect_stdout(output):
+            success = tool.pack_bundle(args.source, args.bundle, args.compression)
+        sys.exit(0 if success else 1)
+    
+    if args.unbundle:
+        if not (args.target or args.targets):
+            print("❌ --unbundle 需要指定 --target / --targets")
+            sys.exit(2)
+        targets = [name.strip() for name in (args.targets or args.target).split(",") if name.strip()]
+        sys.exit(0 if tool.unpack_bundle(args.unbundle, tool.resolve_targets(args.source or "", targets)) else 1)
+    
+    if args.plan:
+        if not (args.source and (args.target or args.targets)):
+            print("❌ --plan 需要同时指定 --source 和 --target / --targets")
+            sys.exit(2)
+        targets = [name.strip() for name in (args.targets or args.target).split(",") if name.strip()]
+        # 计划输出到标准输出时，进度和摘要改为输出到标准错误
+        output = sys.stderr if args.plan == "-" else sys.stdout
+        with contextlib.redirect_stdout(output):
+            plan = tool.plan_targets(args.source, tool.resolve_targets(args.source, targets))
+            if plan is None:
+                sys.exit(1)
+            tool.print_plan(plan)
+        write_plan(plan, args.plan)
+        if args.plan != "-":
+            print(f"💾 计划已保存: {args.plan} (使用 --apply {args.plan} 执行)")
+        return
+    
+    if args.watch:
+        if not (args.source and (args.target or args.targets)):
+            print("❌ --watch 需要同时指定 --source 和 --target / --targets")
+            sys.exit(2)
+        targets = [name.strip() for name in (args.targets or args.target).split(",") if name.strip()]
+        tool.watch(args.source, tool.resolve_targets(args.source, targets), args.debounce,
+                   poll=args.poll, poll_interval=args.poll_interval)
+        return
+    
+    if args.check:
+        if not (args.source and (args.target or args.targets)):
+            print("❌ --check 需要同时指定 --source 和 --target / --targets")
+            sys.exit(2)
+        targets = [name.strip() for name in (args.targets or args.target).split(",") if name.strip()]
+        sys.exit(0 if tool.check_targets(args.source, tool.resolve_targets(args.source, targets)) else 1)
     
     # 如果提供了源和目标参数，直接同步
-    if args.source and args.target:
+    if args.source and args.targets:
+        targets = [name.strip() for name in args.targets.split(",") if name.strip()]
+        tool.sync_to_targets(args.source, tool.resolve_targets(args.source, targets))
+    elif args.source and args.target:
         tool.sync_projects(args.source, args.target)
     else:
         # 交互式运行